@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+
+"""
+Agendamento de execuções atrasadas sem bloquear quem agenda.
+
+O decorator `atrasar(segundos)` de `decorators_guide.py` chama `time.sleep`:
+a thread que chamou fica parada durante todo o atraso. Aqui o atraso é
+registrado em um agendador e a chamada retorna na hora, com uma `Tarefa`
+que pode ser consultada ou cancelada.
+
+- `Agendador`: roda de temporizadores (hashed timer wheel) com uma única
+  thread em segundo plano. Inserir e cancelar são O(1): cada slot da roda é
+  um dicionário, e a tarefa sabe em qual slot está. Atrasos maiores que uma
+  volta completa guardam quantas voltas ainda faltam.
+- `AgendadorAsync`: a versão para asyncio, usando o `call_later` do próprio
+  event loop.
+- `atrasar`: o decorator, que devolve uma `Tarefa` (ou `TarefaAsync` para
+  corrotinas) em vez de esperar.
+"""
+
+import asyncio
+import inspect
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future
+from functools import wraps
+from typing import Any, Callable, Optional
+
+# Estados de uma `Tarefa`.
+PENDENTE, EXECUTANDO, CONCLUIDA, CANCELADA = "pendente", "executando", "concluida", "cancelada"
+
+
+class Tarefa:
+    """Uma chamada agendada em um `Agendador`.
+
+    O `Future` só é criado se alguém pedir por `futuro` ou `resultado()`, para
+    que agendar continue barato quando o resultado não interessa.
+    """
+
+    __slots__ = ("funcao", "args", "kwargs", "prazo", "rodadas", "slot", "estado",
+                 "_agendador", "_resultado", "_excecao", "_futuro")
+
+    def __init__(self, agendador: "Agendador", funcao: Callable, args: tuple, kwargs: dict, prazo: float):
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.prazo = prazo
+        self.rodadas = 0
+        self.slot = None
+        self.estado = PENDENTE
+        self._agendador = agendador
+        self._resultado = None
+        self._excecao = None
+        self._futuro = None
+
+    def cancelar(self) -> bool:
+        """Cancela a tarefa se ela ainda não começou. Retorna True se cancelou."""
+        return self._agendador._cancelar(self)
+
+    @property
+    def cancelada(self) -> bool:
+        return self.estado == CANCELADA
+
+    def concluida(self) -> bool:
+        return self.estado in (CONCLUIDA, CANCELADA)
+
+    @property
+    def futuro(self) -> Future:
+        """Um `concurrent.futures.Future` ligado a esta tarefa."""
+        with self._agendador._condicao:
+            if self._futuro is None:
+                self._futuro = Future()
+                if self.estado == CONCLUIDA:
+                    self._entregar(self._futuro)
+                elif self.estado == CANCELADA:
+                    self._futuro.cancel()
+            return self._futuro
+
+    def resultado(self, timeout: Optional[float] = None) -> Any:
+        """Espera a execução e retorna o valor (ou levanta a exceção da função)."""
+        return self.futuro.result(timeout)
+
+    def _entregar(self, futuro: Future) -> None:
+        if self._excecao is not None:
+            futuro.set_exception(self._excecao)
+        else:
+            futuro.set_result(self._resultado)
+
+    def _executar(self) -> None:
+        try:
+            self._resultado = self.funcao(*self.args, **self.kwargs)
+        except BaseException as exc:
+            self._excecao = exc
+        with self._agendador._condicao:
+            self.estado = CONCLUIDA
+            futuro = self._futuro
+            self.funcao = self.args = self.kwargs = None  # Libera referências.
+        if futuro is not None:
+            self._entregar(futuro)
+
+    def __repr__(self):
+        return f"<Tarefa {self.estado} prazo={self.prazo:.3f}>"
+
+
+class Agendador:
+    """Roda de temporizadores com uma thread em segundo plano.
+
+    Args:
+        resolucao (float): Duração de um tique, em segundos. Tarefas disparam
+            no primeiro tique depois do prazo (atraso máximo de ~1 tique).
+        slots (int): Número de slots da roda; uma volta dura `slots * resolucao`.
+        executor (Executor | None): Onde executar as funções. Sem executor,
+            elas rodam na própria thread do agendador; funções demoradas
+            atrasam as seguintes, então prefira um `ThreadPoolExecutor`.
+    """
+
+    def __init__(self, resolucao: float = 0.001, slots: int = 1024, executor: Optional[Executor] = None):
+        if resolucao <= 0 or slots < 1:
+            raise ValueError("`resolucao` deve ser positiva e `slots` pelo menos 1.")
+        self.resolucao = resolucao
+        self.executor = executor
+        self._slots = [{} for _ in range(slots)]
+        self._inicio = time.monotonic()
+        self._tique = 0  # Próximo tique a processar.
+        self._pendentes = 0
+        self._condicao = threading.Condition()
+        self._parado = False
+        self._thread = None
+
+    def __len__(self) -> int:
+        return self._pendentes
+
+    # --- Agendar e cancelar ------------------------------------------------
+
+    def agendar(self, atraso: float, funcao: Callable, *args, **kwargs) -> Tarefa:
+        """Executa `funcao(*args, **kwargs)` daqui a `atraso` segundos. O(1)."""
+        prazo = time.monotonic() + atraso
+        tarefa = Tarefa(self, funcao, args, kwargs, prazo)
+        with self._condicao:
+            if self._parado:
+                raise RuntimeError("O agendador foi parado.")
+            if self._thread is None:
+                self._iniciar_thread()
+            if self._pendentes == 0:
+                self._avancar_ocioso()
+            alvo = max(self._tique, math.ceil((prazo - self._inicio) / self.resolucao))
+            n = len(self._slots)
+            tarefa.rodadas = (alvo - self._tique) // n
+            tarefa.slot = self._slots[alvo % n]
+            tarefa.slot[tarefa] = None
+            self._pendentes += 1
+            self._condicao.notify()
+        return tarefa
+
+    def _cancelar(self, tarefa: Tarefa) -> bool:
+        with self._condicao:
+            if tarefa.estado != PENDENTE:
+                return False
+            del tarefa.slot[tarefa]
+            tarefa.slot = None
+            tarefa.estado = CANCELADA
+            tarefa.funcao = tarefa.args = tarefa.kwargs = None
+            self._pendentes -= 1
+            futuro = tarefa._futuro
+        if futuro is not None:
+            futuro.cancel()
+        return True
+
+    # --- Thread da roda ----------------------------------------------------
+
+    def _iniciar_thread(self) -> None:
+        self._thread = threading.Thread(target=self._rodar, name="agendador", daemon=True)
+        self._thread.start()
+
+    def _avancar_ocioso(self) -> None:
+        """Sem tarefas, pula direto para o tique atual em vez de percorrer os vazios."""
+        self._tique = max(self._tique, int((time.monotonic() - self._inicio) / self.resolucao))
+
+    def _rodar(self) -> None:
+        slots = self._slots
+        n = len(slots)
+        while True:
+            vencidas = []
+            with self._condicao:
+                while not self._parado and self._pendentes == 0:
+                    self._condicao.wait()
+                if self._parado:
+                    return
+                atual = int((time.monotonic() - self._inicio) / self.resolucao)
+                while self._tique <= atual and self._pendentes:
+                    slot = slots[self._tique % n]
+                    for tarefa in list(slot):
+                        if tarefa.rodadas:
+                            tarefa.rodadas -= 1
+                        else:
+                            del slot[tarefa]
+                            tarefa.slot = None
+                            tarefa.estado = EXECUTANDO
+                            vencidas.append(tarefa)
+                    self._tique += 1
+                self._pendentes -= len(vencidas)
+                if self._pendentes == 0:
+                    self._avancar_ocioso()
+                elif not vencidas:
+                    # Dorme até o próximo slot ocupado (no máximo uma volta).
+                    distancia = next(
+                        (d for d in range(n) if slots[(self._tique + d) % n]), n
+                    )
+                    espera = self._inicio + (self._tique + distancia) * self.resolucao - time.monotonic()
+                    if espera > 0:
+                        self._condicao.wait(espera)
+
+            for tarefa in vencidas:
+                if self.executor is None:
+                    tarefa._executar()
+                else:
+                    self.executor.submit(tarefa._executar)
+
+    def parar(self, cancelar_pendentes: bool = True) -> None:
+        """Para a thread; por padrão, cancela as tarefas que ainda não rodaram."""
+        with self._condicao:
+            pendentes = [t for slot in self._slots for t in slot] if cancelar_pendentes else []
+        for tarefa in pendentes:
+            tarefa.cancelar()
+        with self._condicao:
+            self._parado = True
+            self._condicao.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class TarefaAsync:
+    """Uma chamada agendada no event loop; pode ser aguardada com `await`."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, atraso: float, funcao: Callable, args, kwargs):
+        self.futuro = loop.create_future()
+        self._loop = loop
+        self._tarefa = None
+        self._handle = loop.call_later(atraso, self._disparar, funcao, args, kwargs)
+
+    def _disparar(self, funcao, args, kwargs):
+        if self.futuro.done():
+            return
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException as exc:
+            self.futuro.set_exception(exc)
+            return
+        if inspect.isawaitable(resultado):
+            self._tarefa = asyncio.ensure_future(resultado)
+            self._tarefa.add_done_callback(self._encadear)
+        else:
+            self.futuro.set_result(resultado)
+
+    def _encadear(self, tarefa: asyncio.Future) -> None:
+        if self.futuro.done():
+            return
+        if tarefa.cancelled():
+            self.futuro.cancel()
+        elif tarefa.exception() is not None:
+            self.futuro.set_exception(tarefa.exception())
+        else:
+            self.futuro.set_result(tarefa.result())
+
+    def cancelar(self) -> bool:
+        """Cancela o disparo (ou a corrotina, se já começou)."""
+        self._handle.cancel()
+        if self._tarefa is not None and not self._tarefa.done():
+            self._tarefa.cancel()
+        return self.futuro.cancel()
+
+    def __await__(self):
+        return self.futuro.__await__()
+
+
+class AgendadorAsync:
+    """Agenda chamadas no event loop em execução (via `loop.call_later`)."""
+
+    def agendar(self, atraso: float, funcao: Callable, *args, **kwargs) -> TarefaAsync:
+        """Executa `funcao` (função comum ou corrotina) daqui a `atraso` segundos."""
+        return TarefaAsync(asyncio.get_running_loop(), atraso, funcao, args, kwargs)
+
+
+_AGENDADOR_PADRAO = None
+_TRAVA_PADRAO = threading.Lock()
+
+
+def agendador_padrao() -> Agendador:
+    """Agendador compartilhado usado por `atrasar` (criado no primeiro uso)."""
+    global _AGENDADOR_PADRAO
+    if _AGENDADOR_PADRAO is None:
+        with _TRAVA_PADRAO:
+            if _AGENDADOR_PADRAO is None:
+                _AGENDADOR_PADRAO = Agendador()
+    return _AGENDADOR_PADRAO
+
+
+def atrasar(segundos: float, agendador: Optional[Agendador] = None):
+    """Decorator que agenda a função para daqui a `segundos`, sem bloquear.
+
+    Cada chamada retorna imediatamente uma `Tarefa` (com `resultado()` e
+    `cancelar()`). Em corrotinas, retorna uma `TarefaAsync`, que pode ser
+    aguardada com `await` e precisa de um event loop em execução.
+    """
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            agendador_async = AgendadorAsync()
+
+            @wraps(func)
+            def wrapper_async(*args, **kwargs) -> TarefaAsync:
+                return agendador_async.agendar(segundos, func, *args, **kwargs)
+            return wrapper_async
+
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> Tarefa:
+            return (agendador or agendador_padrao()).agendar(segundos, func, *args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+if __name__ == "__main__":
+    print("--- Agendamento sem bloqueio ---")
+
+    @atrasar(0.1)
+    def execucao_atrasada(mensagem):
+        return f"Executado: {mensagem}"
+
+    inicio = time.perf_counter()
+    tarefa = execucao_atrasada("olá")
+    print(f"1. `atrasar` retornou em {(time.perf_counter() - inicio) * 1e6:.0f} µs: {tarefa}")
+    print(f"   {tarefa.resultado()} após {time.perf_counter() - inicio:.3f}s")
+
+    cancelavel = execucao_atrasada("nunca")
+    print(f"2. Cancelada antes de rodar? {cancelavel.cancelar()} -> {cancelavel}")
+
+    @atrasar(0.05)
+    async def lembrete(texto):
+        return texto.upper()
+
+    async def demonstrar_async():
+        print(f"3. Corrotina agendada: {await lembrete('lembrete async')}")
+
+    asyncio.run(demonstrar_async())
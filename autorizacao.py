@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+
+"""
+Decisões de autorização em cache, com consultas em lote.
+
+O `login_necessario` de `decorators_guide.py` olha `usuario.get("logado")` a
+cada chamada. Na prática essa verificação é uma consulta de sessão e de
+permissões cara (banco, serviço de identidade) e roda milhares de vezes em
+uma rajada de requisições, quase sempre para os mesmos usuários.
+
+- `Credenciais`: o que a consulta devolve para um usuário (logado, papéis e
+  permissões).
+- `Autorizador`: guarda as credenciais por usuário em um `CacheLimitado` com
+  TTL, permite invalidar por usuário ou por papel e junta as falhas que
+  chegam juntas em uma única consulta em lote. Acertos e falhas são
+  cronometrados em histogramas de `latencias.py`.
+- `login_necessario`, `permissao_necessaria` e `papel_necessario`: os
+  decorators, como métodos do `Autorizador`.
+- `ArmazemEmMemoria`: armazém de permissões local com latência artificial,
+  para demonstrações e benchmarks.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+from functools import wraps
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+from latencias import REGISTRO, RegistroDeLatencias
+from memoizacao import CacheLimitado
+
+Credenciais = namedtuple("Credenciais", ["logado", "papeis", "permissoes"])
+
+# Usuário que a consulta não conhece.
+NEGADO = Credenciais(False, frozenset(), frozenset())
+
+EstatisticasAutorizacao = namedtuple(
+    "EstatisticasAutorizacao", ["acertos", "falhas", "consultas", "usuarios_consultados", "tamanho"]
+)
+
+# Sentinela para diferenciar "não está no cache" de qualquer valor guardado.
+_AUSENTE = object()
+
+
+def _identificar_padrao(usuario) -> Hashable:
+    """`usuario["id"]` (ou `usuario["nome"]`) para dicionários; o próprio valor caso contrário.
+
+    Raises:
+        ValueError: Se o dicionário não tiver nem `id` nem `nome`: sem uma
+            chave própria, usuários diferentes dividiriam a mesma decisão.
+    """
+    if isinstance(usuario, dict):
+        for campo in ("id", "nome"):
+            valor = usuario.get(campo)
+            if valor is not None:
+                return valor
+        raise ValueError(
+            f"Usuário sem 'id' nem 'nome': {usuario!r}. Informe `identificar` ao criar o `Autorizador`."
+        )
+    return usuario
+
+
+class _Lote:
+    """Usuários que esperam a mesma consulta em lote."""
+
+    __slots__ = ("ids", "cheio")
+
+    def __init__(self):
+        self.ids = []
+        self.cheio = threading.Event()
+
+
+class Autorizador:
+    """Cache de credenciais por usuário, na frente de uma consulta em lote.
+
+    Um acerto não pega trava: só lê a entrada do cache e confere o prazo.
+    Quando várias threads erram o cache ao mesmo tempo, a primeira abre um
+    lote e espera até `janela` segundos (ou até o lote ter `max_lote`
+    usuários, quando ele é fechado e a próxima falha abre outro); as outras
+    só entram no lote. Uma única chamada a `consultar`
+    resolve todos, e cada usuário é consultado uma vez mesmo com chamadas
+    simultâneas.
+
+    Uma invalidação durante uma consulta impede que o resultado dela seja
+    guardado: quem estava esperando recebe a resposta, mas a próxima chamada
+    consulta de novo.
+
+    Args:
+        consultar (Callable): Recebe uma lista de ids e retorna um dicionário
+            `{id: Credenciais}`. Ids ausentes da resposta recebem `NEGADO`.
+        ttl (float): Segundos que uma decisão fica no cache.
+        maxsize (int | None): Número máximo de usuários no cache.
+        janela (float): Quanto o primeiro de um lote espera por outros, em segundos.
+        max_lote (int): Tamanho que fecha o lote antes da `janela`.
+        identificar (Callable | None): Extrai o id do argumento `usuario`.
+        nome (str): Prefixo das séries de latência.
+        registro (RegistroDeLatencias | None): Onde registrar as latências;
+            padrão `latencias.REGISTRO`.
+    """
+
+    def __init__(
+        self,
+        consultar: Callable[[list], Dict[Hashable, Credenciais]],
+        ttl: float = 30.0,
+        maxsize: Optional[int] = 10_000,
+        janela: float = 0.001,
+        max_lote: int = 256,
+        identificar: Optional[Callable] = None,
+        nome: str = "autorizacao",
+        registro: Optional[RegistroDeLatencias] = None,
+    ):
+        if janela < 0:
+            raise ValueError("`janela` não pode ser negativa.")
+        if max_lote < 1:
+            raise ValueError("`max_lote` deve ser pelo menos 1.")
+        self.consultar = consultar
+        self.janela = janela
+        self.max_lote = max_lote
+        self.identificar = identificar or _identificar_padrao
+        self._cache = CacheLimitado(maxsize=maxsize, ttl=ttl, politica="ttl")
+        # Entradas `(credenciais, expira_em)`, lidas sem trava nos acertos.
+        self._dados = self._cache._dados
+        # Acertos sem trava: `+=` entre threads pode perder alguma contagem.
+        self._acertos = 0
+        self._trava = threading.Lock()
+        self._em_voo = {}
+        self._lote = None
+        # Incrementada a cada invalidação; consultas iniciadas antes não são guardadas.
+        self._geracao = 0
+        self._papeis_de = {}
+        self._por_papel = {}
+        self._consultas = 0
+        self._consultados = 0
+        registro = registro or REGISTRO
+        self.latencias_acerto = registro.serie(f"{nome}.acerto")
+        self.latencias_falha = registro.serie(f"{nome}.falha")
+        self.latencias_consulta = registro.serie(f"{nome}.consulta")
+
+    # --- Leitura -------------------------------------------------------------
+
+    def credenciais(self, usuario_id: Hashable) -> Credenciais:
+        """As credenciais de `usuario_id`, do cache ou de uma consulta em lote."""
+        inicio = time.perf_counter_ns()
+        # `get` num dicionário é atômico; expirar e contar falhas fica com a trava.
+        entrada = self._dados.get(usuario_id)
+        if entrada is not None and entrada[1] > time.monotonic():
+            self._acertos += 1
+            self.latencias_acerto.registrar(time.perf_counter_ns() - inicio)
+            return entrada[0]
+        with self._trava:
+            valor = self._cache.obter(usuario_id, _AUSENTE)
+            if valor is not _AUSENTE:
+                self.latencias_acerto.registrar(time.perf_counter_ns() - inicio)
+                return valor
+            futuro = self._em_voo.get(usuario_id)
+            lote = lider = None
+            if futuro is None:
+                futuro = self._em_voo[usuario_id] = Future()
+                lote = self._lote
+                lider = lote is None
+                if lider:
+                    lote = self._lote = _Lote()
+                lote.ids.append(usuario_id)
+                if len(lote.ids) >= self.max_lote:
+                    # Cheio: as próximas falhas abrem outro lote em vez de aumentar este.
+                    self._lote = None
+                    lote.cheio.set()
+
+        if lider:
+            lote.cheio.wait(self.janela)
+            with self._trava:
+                if self._lote is lote:
+                    self._lote = None
+                ids = list(lote.ids)
+                futuros = [self._em_voo[i] for i in ids]
+            self._resolver(ids, futuros)
+        try:
+            return futuro.result()
+        finally:
+            self.latencias_falha.registrar(time.perf_counter_ns() - inicio)
+
+    def carregar(self, usuarios_ids: Iterable[Hashable]) -> Dict[Hashable, Credenciais]:
+        """Resolve vários usuários de uma vez, com uma só consulta para os que faltam.
+
+        Útil no começo de uma rajada, quando os usuários já são conhecidos.
+        Não espera a `janela`.
+        """
+        resultado, esperando, ids, futuros = {}, {}, [], []
+        with self._trava:
+            for usuario_id in dict.fromkeys(usuarios_ids):
+                valor = self._cache.obter(usuario_id, _AUSENTE)
+                if valor is not _AUSENTE:
+                    resultado[usuario_id] = valor
+                elif usuario_id in self._em_voo:
+                    esperando[usuario_id] = self._em_voo[usuario_id]
+                else:
+                    futuro = self._em_voo[usuario_id] = Future()
+                    ids.append(usuario_id)
+                    futuros.append(futuro)
+                    esperando[usuario_id] = futuro
+        if ids:
+            self._resolver(ids, futuros)
+        for usuario_id, futuro in esperando.items():
+            resultado[usuario_id] = futuro.result()
+        return resultado
+
+    def _resolver(self, ids: list, futuros: list) -> None:
+        """Consulta `ids` de uma vez e entrega o resultado (ou a exceção) aos `futuros`."""
+        with self._trava:
+            geracao = self._geracao
+        inicio = time.perf_counter_ns()
+        try:
+            respostas = self.consultar(ids)
+        except BaseException as exc:
+            with self._trava:
+                for usuario_id in ids:
+                    del self._em_voo[usuario_id]
+            for futuro in futuros:
+                futuro.set_exception(exc)
+            return
+        finally:
+            self.latencias_consulta.registrar(time.perf_counter_ns() - inicio)
+
+        credenciais = [respostas.get(usuario_id, NEGADO) for usuario_id in ids]
+        with self._trava:
+            self._consultas += 1
+            self._consultados += len(ids)
+            guardar = geracao == self._geracao
+            for usuario_id, valor in zip(ids, credenciais):
+                del self._em_voo[usuario_id]
+                if guardar:
+                    self._guardar(usuario_id, valor)
+        for futuro, valor in zip(futuros, credenciais):
+            futuro.set_result(valor)
+
+    def _guardar(self, usuario_id: Hashable, valor: Credenciais) -> None:
+        """Guarda no cache e no índice por papel. Chamado com a trava."""
+        self._cache.guardar(usuario_id, valor)
+        self._desindexar(usuario_id)
+        self._papeis_de[usuario_id] = valor.papeis
+        for papel in valor.papeis:
+            self._por_papel.setdefault(papel, set()).add(usuario_id)
+        # O cache expira entradas sozinho; o índice é podado de vez em quando.
+        maxsize = self._cache.maxsize
+        if maxsize is not None and len(self._papeis_de) > 2 * maxsize:
+            for antigo in [i for i in self._papeis_de if i not in self._cache._dados]:
+                self._desindexar(antigo)
+
+    def _desindexar(self, usuario_id: Hashable) -> None:
+        for papel in self._papeis_de.pop(usuario_id, ()):
+            usuarios = self._por_papel.get(papel)
+            if usuarios is not None:
+                usuarios.discard(usuario_id)
+                if not usuarios:
+                    del self._por_papel[papel]
+
+    # --- Decisões ------------------------------------------------------------
+
+    def permitido(self, usuario, permissao: Optional[str] = None, papel: Optional[str] = None) -> bool:
+        """True se `usuario` está logado e tem a `permissao` e o `papel` pedidos."""
+        credenciais = self.credenciais(self.identificar(usuario))
+        return (
+            credenciais.logado
+            and (permissao is None or permissao in credenciais.permissoes)
+            and (papel is None or papel in credenciais.papeis)
+        )
+
+    def verificar(self, usuario, permissao: Optional[str] = None, papel: Optional[str] = None) -> None:
+        """Como `permitido`, mas levanta `PermissionError` com o motivo da recusa."""
+        credenciais = self.credenciais(self.identificar(usuario))
+        if not credenciais.logado:
+            raise PermissionError("Acesso negado. Usuário não está logado.")
+        if permissao is not None and permissao not in credenciais.permissoes:
+            raise PermissionError(f"Acesso negado. Falta a permissão {permissao!r}.")
+        if papel is not None and papel not in credenciais.papeis:
+            raise PermissionError(f"Acesso negado. Falta o papel {papel!r}.")
+
+    # --- Decorators ----------------------------------------------------------
+
+    def login_necessario(
+        self, func: Optional[Callable] = None, *, permissao: Optional[str] = None, papel: Optional[str] = None
+    ):
+        """Exige que o primeiro argumento (`usuario`) esteja logado.
+
+        Pode ser usado como `@autorizador.login_necessario` ou
+        `@autorizador.login_necessario(permissao="relatorios.ler")`.
+        """
+
+        def decorator(f):
+            verificar = self.verificar
+
+            @wraps(f)
+            def wrapper(usuario, *args, **kwargs):
+                verificar(usuario, permissao, papel)
+                return f(usuario, *args, **kwargs)
+
+            wrapper.autorizador = self
+            return wrapper
+
+        if func is None:
+            return decorator
+        return decorator(func)
+
+    def permissao_necessaria(self, permissao: str) -> Callable[[Callable], Callable]:
+        """Exige login e a `permissao`."""
+        return self.login_necessario(permissao=permissao)
+
+    def papel_necessario(self, papel: str) -> Callable[[Callable], Callable]:
+        """Exige login e o `papel`."""
+        return self.login_necessario(papel=papel)
+
+    # --- Invalidação ---------------------------------------------------------
+
+    def invalidar_usuario(self, usuario_id: Hashable) -> bool:
+        """Descarta a decisão de um usuário (ex: logout). Retorna True se ela estava no cache."""
+        with self._trava:
+            self._geracao += 1
+            self._desindexar(usuario_id)
+            return self._cache.remover(usuario_id)
+
+    def invalidar_papel(self, papel: str) -> int:
+        """Descarta as decisões de todos os usuários com `papel`. Retorna quantos."""
+        with self._trava:
+            self._geracao += 1
+            usuarios = list(self._por_papel.get(papel, ()))
+            for usuario_id in usuarios:
+                self._desindexar(usuario_id)
+                self._cache.remover(usuario_id)
+        return len(usuarios)
+
+    def invalidar_tudo(self) -> None:
+        """Esvazia o cache."""
+        with self._trava:
+            self._geracao += 1
+            self._cache.limpar()
+            self._acertos = 0
+            self._papeis_de.clear()
+            self._por_papel.clear()
+
+    def estatisticas(self) -> EstatisticasAutorizacao:
+        """Acertos e falhas do cache, consultas feitas e usuários consultados."""
+        with self._trava:
+            info = self._cache.info()
+            return EstatisticasAutorizacao(
+                self._acertos + info.acertos, info.falhas, self._consultas, self._consultados, info.tamanho
+            )
+
+
+class ArmazemEmMemoria:
+    """Armazém de sessões e permissões local, com latência artificial.
+
+    Cada chamada a `consultar` dorme `latencia` segundos, não importa quantos
+    usuários peça, como uma ida e volta a um banco. As permissões de um
+    usuário são a união das permissões dos seus papéis.
+
+    Args:
+        latencia (float): Segundos de espera por consulta.
+    """
+
+    def __init__(self, latencia: float = 0.005):
+        self.latencia = latencia
+        self.usuarios = {}
+        self.papeis = {}
+        self.consultas = 0
+        self._trava = threading.Lock()
+
+    def definir_papel(self, papel: str, permissoes: Iterable[str]) -> None:
+        with self._trava:
+            self.papeis[papel] = frozenset(permissoes)
+
+    def definir_usuario(self, usuario_id: Hashable, logado: bool = True, papeis: Iterable[str] = ()) -> None:
+        with self._trava:
+            self.usuarios[usuario_id] = (logado, frozenset(papeis))
+
+    def consultar(self, ids: list) -> Dict[Hashable, Credenciais]:
+        time.sleep(self.latencia)
+        with self._trava:
+            self.consultas += 1
+            resultado = {}
+            for usuario_id in ids:
+                if usuario_id not in self.usuarios:
+                    continue
+                logado, papeis = self.usuarios[usuario_id]
+                permissoes = frozenset().union(*(self.papeis.get(papel, ()) for papel in papeis))
+                resultado[usuario_id] = Credenciais(logado, papeis, permissoes)
+            return resultado
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("--- Autorização com cache ---")
+    armazem = ArmazemEmMemoria(latencia=0.02)
+    armazem.definir_papel("leitor", {"painel.ver"})
+    armazem.definir_papel("editor", {"painel.ver", "painel.editar"})
+    armazem.definir_usuario("Ana", papeis={"editor"})
+    armazem.definir_usuario("Beto", logado=False)
+    for i in range(50):
+        armazem.definir_usuario(f"usuario{i}", papeis={"leitor"})
+
+    autorizador = Autorizador(armazem.consultar, ttl=60, janela=0.005)
+
+    @autorizador.login_necessario
+    def painel_secreto(usuario):
+        return f"Bem-vindo ao painel secreto, {usuario['nome']}!"
+
+    @autorizador.permissao_necessaria("painel.editar")
+    def editar_painel(usuario):
+        return "editado"
+
+    print(f"1. {painel_secreto({'nome': 'Ana'})}")
+    try:
+        painel_secreto({"nome": "Beto"})
+    except PermissionError as e:
+        print(f"2. {e}")
+
+    with ThreadPoolExecutor(max_workers=50) as executor:
+        list(executor.map(lambda i: painel_secreto({"nome": f"usuario{i}"}), range(50)))
+    print(f"3. 50 usuários novos ao mesmo tempo: {armazem.consultas - 2} consulta(s) em lote")
+
+    for _ in range(1000):
+        painel_secreto({"nome": "Ana"})
+    print(f"4. Mais 1000 chamadas da Ana, nenhuma consulta nova: {armazem.consultas} no total")
+
+    armazem.definir_papel("leitor", {"painel.ver", "painel.editar"})
+    print(f"5. Permissões do papel 'leitor' mudaram; {autorizador.invalidar_papel('leitor')} decisões descartadas")
+    print(f"   usuario7 agora pode editar: {editar_painel({'nome': 'usuario7'})}")
+    print(f"6. {autorizador.estatisticas()}")
+    print(REGISTRO.formatar())
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks dos módulos de apoio.
+
+Cada benchmark é um script executável a partir da raiz do repositório:
+
+    python3 -m benchmarks.bench_memoizacao
+
+Os guias (`*_guide.py`) imprimem exemplos ao serem importados; por isso os
+benchmarks carregam deles apenas as definições necessárias (veja `_guias.py`).
+"""
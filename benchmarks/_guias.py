@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+"""Carrega funções e classes dos guias sem executar o corpo do script."""
+
+import ast
+from pathlib import Path
+from types import SimpleNamespace
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def carregar(guia, *nomes):
+    """Executa apenas os `import` e as definições `nomes` de um guia.
+
+    Os guias são aulas interativas: importá-los executa dezenas de `print`.
+    Aqui a árvore sintática do arquivo é filtrada, mantendo somente as
+    importações e os `def`/`class` pedidos, na ordem em que aparecem.
+
+    Args:
+        guia (str): Nome do arquivo do guia, ex: "decorators_guide.py".
+        *nomes (str): Nomes das funções/classes a carregar.
+
+    Returns:
+        SimpleNamespace: Um objeto com um atributo para cada nome pedido.
+
+    Raises:
+        NameError: Se algum nome não for definido no guia.
+    """
+    caminho = RAIZ / guia
+    arvore = ast.parse(caminho.read_text(encoding="utf-8"), filename=str(caminho))
+    definicoes = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    arvore.body = [
+        no
+        for no in arvore.body
+        if isinstance(no, (ast.Import, ast.ImportFrom))
+        or (isinstance(no, definicoes) and no.name in nomes)
+    ]
+    namespace = {"__name__": f"guia_{caminho.stem}"}
+    exec(compile(arvore, str(caminho), "exec"), namespace)
+
+    faltando = [nome for nome in nomes if nome not in namespace]
+    if faltando:
+        raise NameError(f"{guia} não define: {', '.join(faltando)}")
+    return SimpleNamespace(**{nome: namespace[nome] for nome in nomes})
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""Utilitários de medição compartilhados pelos benchmarks."""
+
+import statistics
+import time
+
+
+def medir(funcao, repeticoes=5):
+    """Executa `funcao()` `repeticoes` vezes e retorna a mediana, em segundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos)
+
+
+def imprimir_tabela(cabecalho, linhas):
+    """Imprime uma tabela simples com colunas alinhadas."""
+    linhas = [[str(celula) for celula in linha] for linha in linhas]
+    larguras = [
+        max(len(str(titulo)), *(len(linha[i]) for linha in linhas))
+        for i, titulo in enumerate(cabecalho)
+    ]
+    print("  ".join(str(titulo).ljust(largura) for titulo, largura in zip(cabecalho, larguras)))
+    print("  ".join("-" * largura for largura in larguras))
+    for linha in linhas:
+        print("  ".join(celula.ljust(largura) for celula, largura in zip(linha, larguras)))
+
+
+def calibrar(laco, alvo_ns=20_000_000):
+    """Menor número de iterações (potência de 2) em que `laco(n)` leva pelo menos `alvo_ns`."""
+    n = 1
+    while True:
+        inicio = time.perf_counter_ns()
+        laco(n)
+        if time.perf_counter_ns() - inicio >= alvo_ns or n >= 1 << 30:
+            return n
+        n *= 2
+
+
+def amostrar_ns(laco, n, amostras=15):
+    """Nanossegundos por iteração em `amostras` execuções de `laco(n)`."""
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter_ns()
+        laco(n)
+        tempos.append((time.perf_counter_ns() - inicio) / n)
+    return tempos
+
+
+def mediana_e_mad(valores):
+    """Mediana e desvio absoluto mediano (MAD), pouco sensíveis a rodadas atípicas."""
+    mediana = statistics.median(valores)
+    return mediana, statistics.median(abs(v - mediana) for v in valores)
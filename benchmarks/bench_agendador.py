@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: rotatividade de temporizadores no `Agendador`.
+
+Uso:
+    python3 -m benchmarks.bench_agendador [--temporizadores 100000]
+
+1. Rotatividade: agenda `--temporizadores` tarefas com atrasos aleatórios
+   entre 1 s e 1 h (a maioria dá várias voltas na roda) e cancela todas.
+   Compara com `threading.Timer`, que cria uma thread por temporizador
+   (medido só para 1000, pois 100 mil threads não são viáveis).
+2. Pontualidade: 2000 tarefas entre 10 e 200 ms; mede o atraso do disparo
+   em relação ao prazo (p50/p99/máximo).
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from agendador import Agendador
+from latencias import Histograma
+
+from ._medicao import imprimir_tabela
+
+
+def nada():
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--temporizadores", type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.temporizadores
+    aleatorio = random.Random(1)
+    atrasos = [aleatorio.uniform(1, 3600) for _ in range(n)]
+
+    agendador = Agendador()
+    inicio = time.perf_counter()
+    tarefas = [agendador.agendar(atraso, nada) for atraso in atrasos]
+    insercao = (time.perf_counter() - inicio) / n
+    pendentes = len(agendador)
+    aleatorio.shuffle(tarefas)
+    inicio = time.perf_counter()
+    for tarefa in tarefas:
+        tarefa.cancelar()
+    cancelamento = (time.perf_counter() - inicio) / n
+    assert len(agendador) == 0
+
+    temporizadores = [threading.Timer(atraso, nada) for atraso in atrasos[:1000]]
+    inicio = time.perf_counter()
+    for t in temporizadores:
+        t.start()
+    insercao_timer = (time.perf_counter() - inicio) / len(temporizadores)
+    inicio = time.perf_counter()
+    for t in temporizadores:
+        t.cancel()
+    for t in temporizadores:
+        t.join()
+    cancelamento_timer = (time.perf_counter() - inicio) / len(temporizadores)
+
+    print(f"{n} temporizadores pendentes ao mesmo tempo: {pendentes}\n")
+    imprimir_tabela(
+        ["implementação", "agendar (µs)", "cancelar (µs)"],
+        [
+            ["Agendador (roda)", f"{insercao * 1e6:.2f}", f"{cancelamento * 1e6:.2f}"],
+            ["threading.Timer (1000)", f"{insercao_timer * 1e6:.2f}", f"{cancelamento_timer * 1e6:.2f}"],
+        ],
+    )
+
+    atrasos_disparo = Histograma()
+    restantes = threading.Semaphore(0)
+    quantidade = 2000
+
+    def registrar(prazo):
+        atrasos_disparo.registrar(max(0, int((time.monotonic() - prazo) * 1e9)))
+        restantes.release()
+
+    for _ in range(quantidade):
+        atraso = aleatorio.uniform(0.01, 0.2)
+        agendador.agendar(atraso, registrar, time.monotonic() + atraso)
+    for _ in range(quantidade):
+        restantes.acquire()
+    resumo = atrasos_disparo.resumo()
+    print(f"\nPontualidade (resolução {agendador.resolucao * 1e3:.0f} ms): "
+          f"p50 {resumo.p50 / 1e6:.2f} ms, p99 {resumo.p99 / 1e6:.2f} ms, máx {resumo.maximo / 1e6:.2f} ms")
+    agendador.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: sobrecarga do `cronometrar` com amostragem.
+
+Uso:
+    python3 -m benchmarks.bench_amostragem [--chamadas 500000]
+
+Mede o custo por chamada de uma função trivial sem decorator e com o
+`cronometrar` desligado, amostrando 1% das chamadas, amostrando por taxa
+(1000 amostras/s) e medindo 100% das chamadas. Também mostra quanto a
+contagem extrapolada se afasta do número real de chamadas.
+"""
+
+import argparse
+
+from latencias import RegistroDeLatencias, cronometrar
+
+from ._medicao import imprimir_tabela, medir
+
+
+def somar(a, b):
+    return a + b
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=500_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    faixa = range(args.chamadas)
+
+    def custo(funcao):
+        def laco():
+            for i in faixa:
+                funcao(i, 1)
+        return medir(laco, args.repeticoes) / args.chamadas
+
+    base = custo(somar)
+    linhas = [["sem decorator", f"{base * 1e9:.0f}", "-", "-"]]
+
+    desligada = cronometrar(somar, registro=RegistroDeLatencias())
+    desligada.amostragem.desativar()
+    cenarios = [
+        ("desligado", desligada),
+        ("amostragem 1%", cronometrar(somar, registro=RegistroDeLatencias(), amostragem=100)),
+        ("taxa 1000/s", cronometrar(somar, registro=RegistroDeLatencias(), taxa=1000)),
+        ("100%", cronometrar(somar, registro=RegistroDeLatencias())),
+    ]
+    for nome, funcao in cenarios:
+        tempo = custo(funcao)
+        contagem = funcao.latencias.histograma().contagem
+        if contagem:
+            reais = args.chamadas * args.repeticoes
+            erro = f"{abs(contagem - reais) / reais:.2%}"
+        else:
+            erro = "-"
+        linhas.append([f"cronometrar, {nome}", f"{tempo * 1e9:.0f}", f"{(tempo - base) * 1e9:.0f}", erro])
+
+    print(f"{args.chamadas} chamadas, mediana de {args.repeticoes} repetições\n")
+    imprimir_tabela(["cenário", "ns/chamada", "sobrecarga (ns)", "erro da contagem"], linhas)
+
+
+if __name__ == "__main__":
+    main()
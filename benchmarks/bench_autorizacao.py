@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: rajadas de chamadas protegidas por login, com e sem cache de decisões.
+
+Uso:
+    python3 -m benchmarks.bench_autorizacao [--chamadas 2000] [--usuarios 50]
+
+O armazém é um `ArmazemEmMemoria` com latência artificial por consulta. A
+versão "guia" é o `login_necessario` de `decorators_guide.py` com a
+verificação trocada pela consulta ao armazém, como seria em produção: uma
+consulta por chamada. A versão com `Autorizador` guarda as decisões e junta
+as falhas simultâneas em lotes. Cada rajada dispara `--chamadas` chamadas de
+`--threads` threads, distribuídas entre `--usuarios` usuários.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from autorizacao import ArmazemEmMemoria, Autorizador
+from latencias import RegistroDeLatencias
+
+from ._medicao import imprimir_tabela
+
+
+def login_necessario_do_guia(armazem):
+    """O decorator do guia, com `usuario.get("logado")` trocado pela consulta ao armazém."""
+
+    def login_necessario(func):
+        @wraps(func)
+        def wrapper(usuario, *args, **kwargs):
+            credenciais = armazem.consultar([usuario["nome"]]).get(usuario["nome"])
+            if credenciais is not None and credenciais.logado:
+                return func(usuario, *args, **kwargs)
+            else:
+                raise PermissionError("Acesso negado. Usuário não está logado.")
+        return wrapper
+
+    return login_necessario
+
+
+def rajada(painel, chamadas, usuarios, threads):
+    pedidos = [{"nome": f"usuario{i % usuarios}"} for i in range(chamadas)]
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(painel, pedidos))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=2000)
+    parser.add_argument("--usuarios", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latencia", type=float, default=0.002)
+    args = parser.parse_args()
+
+    armazem = ArmazemEmMemoria(latencia=args.latencia)
+    for i in range(args.usuarios):
+        armazem.definir_usuario(f"usuario{i}")
+
+    def painel(usuario):
+        return usuario["nome"]
+
+    linhas = []
+    duracao = rajada(login_necessario_do_guia(armazem)(painel), args.chamadas, args.usuarios, args.threads)
+    linhas.append(["guia (consulta por chamada)", "fria", f"{duracao * 1e3:.0f}", armazem.consultas])
+
+    registro = RegistroDeLatencias()
+    autorizador = Autorizador(armazem.consultar, ttl=60, registro=registro)
+    protegido = autorizador.login_necessario(painel)
+    for fase in ("fria", "quente"):
+        armazem.consultas = 0
+        duracao = rajada(protegido, args.chamadas, args.usuarios, args.threads)
+        linhas.append(["Autorizador", fase, f"{duracao * 1e3:.0f}", armazem.consultas])
+
+    autorizador.invalidar_tudo()
+    armazem.consultas = 0
+    inicio = time.perf_counter()
+    autorizador.carregar(f"usuario{i}" for i in range(args.usuarios))
+    rajada(protegido, args.chamadas, args.usuarios, args.threads)
+    duracao = time.perf_counter() - inicio
+    linhas.append(["Autorizador + carregar()", "fria", f"{duracao * 1e3:.0f}", armazem.consultas])
+
+    print(f"{args.chamadas} chamadas, {args.usuarios} usuários, {args.threads} threads, "
+          f"{args.latencia * 1e3:.1f} ms por consulta\n")
+    imprimir_tabela(["versão", "cache", "rajada (ms)", "consultas"], linhas)
+    print(f"\n{autorizador.estatisticas()}")
+    print(registro.formatar())
+
+
+if __name__ == "__main__":
+    main()
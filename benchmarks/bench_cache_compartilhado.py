@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: `CacheCompartilhado` x caches por processo em um `ProcessPoolExecutor`.
+
+Uso:
+    python3 -m benchmarks.bench_cache_compartilhado [--trabalhadores 1 4 16] [--chamadas 20000]
+
+Todos os trabalhadores recebem a mesma sequência de chaves (distribuição
+enviesada, com poucas chaves muito populares). Com caches por processo, cada
+trabalhador precisa calcular cada chave pela primeira vez; com o cache
+compartilhado, a primeira vez de um trabalhador aquece a tabela para todos.
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cache_compartilhado import CacheCompartilhado
+from memoizacao import memoizar
+
+from ._medicao import imprimir_tabela
+
+LOTE = 500
+
+_funcao = None
+
+
+def custo(x):
+    """Trabalho de CPU simulado."""
+    return sum(i * i for i in range(x % 97 + 1000))
+
+
+def iniciar(cache):
+    global _funcao
+    if cache is None:
+        _funcao = memoizar(maxsize=None)(custo)
+    else:
+        _funcao = memoizar(armazenamento=cache)(custo)
+
+
+def processar_lote(chaves):
+    antes = _funcao.cache_info()
+    for chave in chaves:
+        _funcao(chave)
+    depois = _funcao.cache_info()
+    return depois.acertos - antes.acertos, depois.falhas - antes.falhas
+
+
+def executar(trabalhadores, chaves, cache):
+    lotes = [chaves[i : i + LOTE] for i in range(0, len(chaves), LOTE)]
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=trabalhadores, initializer=iniciar, initargs=(cache,)) as executor:
+        resultados = list(executor.map(processar_lote, lotes))
+    duracao = time.perf_counter() - inicio
+    acertos = sum(a for a, _ in resultados)
+    falhas = sum(f for _, f in resultados)
+    return acertos / max(acertos + falhas, 1), len(chaves) / duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--trabalhadores", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--chamadas", type=int, default=20_000)
+    parser.add_argument("--universo", type=int, default=2_000, help="número de chaves distintas")
+    args = parser.parse_args()
+
+    aleatorio = random.Random(42)
+    # Enviesada: as chaves baixas aparecem muito mais que as altas.
+    chaves = [int(args.universo * aleatorio.random() ** 3) for _ in range(args.chamadas)]
+
+    linhas = []
+    for trabalhadores in args.trabalhadores:
+        taxa, vazao = executar(trabalhadores, chaves, None)
+        linhas.append([trabalhadores, "por processo", f"{taxa:.1%}", f"{vazao:,.0f}"])
+        with CacheCompartilhado(slots=args.universo * 2) as cache:
+            taxa, vazao = executar(trabalhadores, chaves, cache)
+        linhas.append([trabalhadores, "compartilhado", f"{taxa:.1%}", f"{vazao:,.0f}"])
+
+    print(f"{args.chamadas} chamadas, {args.universo} chaves possíveis\n")
+    imprimir_tabela(["trabalhadores", "cache", "taxa de acerto", "chamadas/s"], linhas)
+
+
+if __name__ == "__main__":
+    main()
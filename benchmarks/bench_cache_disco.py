@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: leituras e escritas do `CacheEmDisco`.
+
+Uso:
+    python3 -m benchmarks.bench_cache_disco [--entradas 2000]
+
+Mede, por operação:
+    - acerto na camada em memória x acerto no `cache` do guia (dicionário puro);
+    - acerto no disco (camada em memória desligada);
+    - escrita transacional;
+    - leitura depois de reabrir o arquivo (simulando um reinício).
+"""
+
+import argparse
+import contextlib
+import os
+import tempfile
+
+from cache_disco import CacheEmDisco
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+ACERTOS = 100_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entradas", type=int, default=2_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    n = args.entradas
+    linhas = []
+
+    guia = carregar("decorators_guide.py", "cache")
+    dobro_guia = guia.cache(lambda x: x * 2)
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        dobro_guia(7)
+
+    def acertos_guia():
+        for _ in range(ACERTOS):
+            dobro_guia(7)
+
+    # O tempo do guia inclui a chamada ao wrapper e duas consultas ao dict;
+    # é a referência para a leitura da camada em memória.
+    referencia = medir(acertos_guia, args.repeticoes) / ACERTOS
+    linhas.append(["cache do guia (wrapper + dict)", f"{referencia * 1e9:.0f} ns"])
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "bench.sqlite")
+
+        with CacheEmDisco(caminho, maxentradas=None, memoria=128) as cache:
+            cache.guardar((7,), 14)
+            obter = cache.obter
+
+            def acertos_memoria():
+                for _ in range(ACERTOS):
+                    obter((7,))
+
+            tempo = medir(acertos_memoria, args.repeticoes) / ACERTOS
+            linhas.append(["CacheEmDisco.obter, acerto em memória", f"{tempo * 1e9:.0f} ns"])
+
+            def escritas():
+                cache.limpar()
+                for i in range(n):
+                    cache.guardar((i,), {"valor": i})
+
+            tempo = medir(escritas, args.repeticoes) / n
+            linhas.append(["guardar (transação por escrita)", f"{tempo * 1e6:.1f} µs"])
+
+        with CacheEmDisco(caminho, maxentradas=None, memoria=0) as cache:
+
+            def leituras_disco():
+                for i in range(n):
+                    cache.obter((i,))
+
+            tempo = medir(leituras_disco, args.repeticoes) / n
+            linhas.append(["obter, acerto no disco após reabrir", f"{tempo * 1e6:.1f} µs"])
+            assert cache.obter((n - 1,)) == {"valor": n - 1}
+
+        with CacheEmDisco(caminho, maxentradas=n // 2, memoria=0) as cache:
+            cache.guardar(("extra",), 0)
+            linhas.append(["limpeza LRU (maxentradas=n/2)", f"{cache.info().tamanho} entradas restantes"])
+
+    print(f"{n} entradas, mediana de {args.repeticoes} repetições\n")
+    imprimir_tabela(["operação", "custo"], linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: custo de montar a chave de cache por formato de chamada.
+
+Uso:
+    python3 -m benchmarks.bench_chaves [--chamadas 200000]
+
+Compara o construtor de `chaves.py` com a chave ingênua
+`(args, tuple(sorted(kwargs.items())))` reconstruída a cada chamada.
+"""
+
+import argparse
+
+from chaves import criar_construtor_de_chave
+
+from ._medicao import imprimir_tabela, medir
+
+
+def criar_relatorio(titulo, autor="Equipe", logger=None, **dados):
+    return titulo
+
+
+def chave_ingenua(args, kwargs):
+    return (args, tuple(sorted(kwargs.items())))
+
+
+FORMATOS = [
+    ("fibonacci(30)", (30,), {}, {}),
+    ("multiplicar(5, 4)", (5, 4), {}, {}),
+    ("formatar_nome('joão', 'silva')", ("joão", "silva"), {}, {}),
+    ("criar_relatorio(**3 kwargs)", (), {"titulo": "Vendas", "autor": "Ana", "mes": 3}, {}),
+    ("f([1, 2, 3], {'a': 1}) congelando", ([1, 2, 3], {"a": 1}), {}, {"congelar": True}),
+    ("f((1, 2), 3) congelar=True (hashable)", ((1, 2), 3), {}, {"congelar": True}),
+    ("criar_relatorio('V', logger=...) ignorando", ("V",), {"logger": print}, {"ignorar": ["logger"]}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    linhas = []
+    for nome, posicionais, nomeados, opcoes in FORMATOS:
+        construir = criar_construtor_de_chave(criar_relatorio, **opcoes)
+        faixa = range(args.chamadas)
+
+        def especializado():
+            for _ in faixa:
+                construir(posicionais, nomeados)
+
+        def ingenuo():
+            for _ in faixa:
+                chave_ingenua(posicionais, nomeados)
+
+        tempo = medir(especializado, args.repeticoes) / args.chamadas
+        if opcoes.get("congelar") and not opcoes.get("ignorar") and nome.endswith("congelando"):
+            referencia = "n/a (não hashable)"
+        else:
+            referencia = f"{medir(ingenuo, args.repeticoes) / args.chamadas * 1e9:.0f}"
+        linhas.append([nome, f"{tempo * 1e9:.0f}", referencia])
+
+    print(f"Custo por chamada, mediana de {args.repeticoes} repetições\n")
+    imprimir_tabela(["formato", "chaves.py (ns)", "ingênua (ns)"], linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: `ContadorDeChamadas` por thread x contador com trava x versão do guia.
+
+Uso:
+    python3 -m benchmarks.bench_contadores [--threads 1 2 4 8 16 32 64] [--chamadas 400000]
+
+Para cada número de threads, o mesmo total de chamadas é dividido entre
+elas. São medidos o custo médio por chamada e se o contador final bate
+com o número real de chamadas.
+
+Observação: no CPython com GIL, só uma thread executa bytecode por vez, então
+a vazão total não cresce com o número de threads. O que o contador por
+thread garante é um custo por chamada constante (sem disputa de trava) e uma
+contagem exata; o contador do guia perde incrementos.
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import threading
+import time
+
+from contadores import ContadorDeChamadas
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela
+
+
+class ContadorComTrava:
+    """Referência: um único contador protegido por `threading.Lock`."""
+
+    def __init__(self, func):
+        self.func = func
+        self.num_chamadas = 0
+        self._trava = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._trava:
+            self.num_chamadas += 1
+        return self.func(*args, **kwargs)
+
+
+def vazia():
+    return None
+
+
+def disparar(contador, threads, chamadas_por_thread):
+    barreira = threading.Barrier(threads + 1)
+
+    def trabalhar():
+        barreira.wait()
+        for _ in range(chamadas_por_thread):
+            contador()
+
+    trabalhadores = [threading.Thread(target=trabalhar) for _ in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    barreira.wait()
+    inicio = time.perf_counter()
+    for t in trabalhadores:
+        t.join()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--chamadas", type=int, default=400_000)
+    args = parser.parse_args()
+
+    # Troca de thread mais frequente, para o `+=` do guia mostrar a corrida.
+    sys.setswitchinterval(1e-6)
+    guia = carregar("decorators_guide.py", "ContadorDeChamadas")
+    versoes = [
+        ("guia (print)", guia.ContadorDeChamadas, lambda c: c.num_chamadas),
+        ("com trava", ContadorComTrava, lambda c: c.num_chamadas),
+        ("por thread", ContadorDeChamadas, lambda c: c.instantaneo().chamadas),
+    ]
+
+    linhas = []
+    with open(os.devnull, "w") as nulo:
+        for threads in args.threads:
+            por_thread = args.chamadas // threads
+            total = por_thread * threads
+            for nome, classe, ler in versoes:
+                contador = classe(vazia)
+                with contextlib.redirect_stdout(nulo):
+                    duracao = disparar(contador, threads, por_thread)
+                contado = ler(contador)
+                linhas.append([
+                    threads,
+                    nome,
+                    f"{duracao / total * 1e9:.0f}",
+                    f"{total / duracao:,.0f}",
+                    "exata" if contado == total else f"perdeu {total - contado}",
+                ])
+
+    imprimir_tabela(["threads", "contador", "ns/chamada", "chamadas/s", "contagem"], linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: sobrecarga por chamada de cada decorator dos guias.
+
+Uso:
+    python3 -m benchmarks.bench_decoradores [--saida bench_decoradores.json]
+                                            [--comparar anterior.json] [--tolerancia 0.25]
+
+Mede `cronometrar`, `debug_info`, `decorator_flexivel`, `inspeciona_args`,
+`ContadorDeChamadas`, `LimiteDeChamadas`, `UltimoResultado` e `cache` (de
+`decorators_guide.py`) e `validar_tipos` (de `funcoes_guide.py`), carregados
+sem executar o corpo dos guias, contra a mesma função sem decorator.
+
+Cada caso roda num laço de `perf_counter_ns` calibrado para durar
+`--alvo-ms`; as amostras dos casos são intercaladas (uma rodada de cada por
+vez), para que variações de frequência da CPU atinjam todos igualmente. A
+tabela mostra mediana e MAD (desvio absoluto mediano) em ns por chamada e a
+sobrecarga sobre a linha de base. Os decorators que fazem `print` escrevem
+em `os.devnull`.
+
+O resultado vai para um JSON. Com `--comparar`, cada sobrecarga é conferida
+contra a do arquivo anterior: é regressão quando cresce mais que
+`--tolerancia` (fração) e mais que 3 MADs. Havendo regressão, o processo
+termina com código 1.
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import sys
+from itertools import repeat
+
+from ._guias import carregar
+from ._medicao import amostrar_ns, calibrar, imprimir_tabela, mediana_e_mad
+
+DECORATORS = (
+    "cronometrar", "debug_info", "decorator_flexivel", "inspeciona_args",
+    "ContadorDeChamadas", "LimiteDeChamadas", "UltimoResultado", "cache",
+)
+
+
+def multiplicar(a, b):
+    return a * b
+
+
+def identidade(n):
+    return n
+
+
+def criar_laco(funcao, args):
+    def laco(n):
+        for _ in repeat(None, n):
+            funcao(*args)
+    return laco
+
+
+def montar_casos():
+    """(nome, função, argumentos, linha de base, faz print) para cada caso."""
+    guia = carregar("decorators_guide.py", *DECORATORS)
+    validar_tipos = carregar("funcoes_guide.py", "validar_tipos").validar_tipos
+    dois, um = (5, 4), (5,)
+    return [
+        ("sem decorator", multiplicar, dois, None, False),
+        ("sem decorator (1 arg)", identidade, um, None, False),
+        ("cronometrar", guia.cronometrar(multiplicar), dois, "sem decorator", True),
+        ("debug_info", guia.debug_info(multiplicar), dois, "sem decorator", True),
+        ("decorator_flexivel", guia.decorator_flexivel(multiplicar), dois, "sem decorator", True),
+        ("inspeciona_args", guia.inspeciona_args(multiplicar), dois, "sem decorator", True),
+        ("ContadorDeChamadas", guia.ContadorDeChamadas(multiplicar), dois, "sem decorator", True),
+        ("LimiteDeChamadas", guia.LimiteDeChamadas(limite=sys.maxsize)(multiplicar), dois, "sem decorator", False),
+        ("UltimoResultado", guia.UltimoResultado(multiplicar), dois, "sem decorator", False),
+        ("validar_tipos", validar_tipos(int, int)(multiplicar), dois, "sem decorator", False),
+        ("cache (acerto)", guia.cache(identidade), um, "sem decorator (1 arg)", True),
+    ]
+
+
+def medir_casos(casos, alvo_ns, amostras):
+    """Mediana e MAD (ns por chamada) de cada caso, com amostras intercaladas."""
+    lacos = {nome: criar_laco(funcao, args) for nome, funcao, args, _, _ in casos}
+    for laco in lacos.values():
+        laco(100)  # Aquecimento (e a primeira chamada do `cache`, que calcula).
+    iteracoes = {nome: calibrar(laco, alvo_ns) for nome, laco in lacos.items()}
+    tempos = {nome: [] for nome in lacos}
+    for _ in range(amostras):
+        for nome, laco in lacos.items():
+            tempos[nome].extend(amostrar_ns(laco, iteracoes[nome], 1))
+    return {nome: (*mediana_e_mad(valores), iteracoes[nome]) for nome, valores in tempos.items()}
+
+
+def comparar(atual, anterior, tolerancia):
+    """Linhas da comparação com um JSON anterior e se houve regressão."""
+    linhas = []
+    regressao = False
+    for nome, novo in atual.items():
+        velho = anterior.get(nome)
+        if velho is None or novo["base"] is None:
+            continue
+        diferenca = novo["sobrecarga_ns"] - velho["sobrecarga_ns"]
+        ruido = 3 * max(novo["mad_ns"], velho["mad_ns"])
+        piorou = diferenca > tolerancia * max(velho["sobrecarga_ns"], 0) and diferenca > ruido
+        regressao = regressao or piorou
+        linhas.append([
+            nome, f"{velho['sobrecarga_ns']:.1f}", f"{novo['sobrecarga_ns']:.1f}", f"{diferenca:+.1f}",
+            "REGRESSÃO" if piorou else "ok",
+        ])
+    return linhas, regressao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--alvo-ms", type=float, default=20.0)
+    parser.add_argument("--amostras", type=int, default=15)
+    parser.add_argument("--saida", default="bench_decoradores.json")
+    parser.add_argument("--comparar", metavar="JSON")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    args = parser.parse_args()
+
+    casos = montar_casos()
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        medidas = medir_casos(casos, int(args.alvo_ms * 1e6), args.amostras)
+
+    resultados = {}
+    linhas = []
+    for nome, _, _, base, imprime in casos:
+        mediana, mad, iteracoes = medidas[nome]
+        sobrecarga = mediana - medidas[base][0] if base else 0.0
+        resultados[nome] = {
+            "mediana_ns": round(mediana, 2), "mad_ns": round(mad, 2), "sobrecarga_ns": round(sobrecarga, 2),
+            "base": base, "print": imprime, "iteracoes": iteracoes, "amostras": args.amostras,
+        }
+        linhas.append([
+            nome, f"{mediana:.1f}", f"{mad:.1f}", f"{sobrecarga:+.1f}" if base else "-",
+            f"{mediana / medidas[base][0]:.1f}x" if base else "-", "sim" if imprime else "",
+        ])
+
+    print(f"Python {platform.python_version()}; {args.amostras} amostras por caso, "
+          f"laços de ~{args.alvo_ms:.0f} ms; ns por chamada\n")
+    imprimir_tabela(["decorator", "mediana", "MAD", "sobrecarga", "relativo", "print"], linhas)
+
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump({
+            "data": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementacao": platform.python_implementation(),
+            "plataforma": platform.platform(),
+            "resultados": resultados,
+        }, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)["resultados"]
+        linhas, regressao = comparar(resultados, anterior, args.tolerancia)
+        print(f"\nComparação com {args.comparar} (sobrecarga em ns; tolerância {args.tolerancia:.0%} e 3 MADs):\n")
+        imprimir_tabela(["decorator", "anterior", "atual", "diferença", "situação"], linhas)
+        if regressao:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: pilha de decorators aninhados x wrapper fundido, profundidades 1 a 8.
+
+Uso:
+    python3 -m benchmarks.bench_fusao [--chamadas 200000]
+
+Cada camada chama um gancho barato. A versão aninhada usa decorators
+escritos à mão, no estilo dos guias (`@wraps` + `*args, **kwargs`), um por
+camada; a fundida usa `fusao.fundir` com os mesmos ganchos. Dois tipos de
+camada:
+    - "antes": só um gancho antes da chamada (como `log_decorator`);
+    - "finally": código depois da chamada, com `try/finally` (como o fim
+      de `timer_decorator`); na fusão, o gancho `finalmente`.
+"""
+
+import argparse
+from functools import wraps
+
+from fusao import Aspecto, fundir
+
+from ._medicao import imprimir_tabela, medir
+
+
+def somar(a, b):
+    return a + b
+
+
+def gancho(func, args, kwargs):
+    return None
+
+
+def gancho_final(func, args, kwargs, estado):
+    return None
+
+
+def decorator_antes(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        gancho(func, args, kwargs)
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def decorator_finally(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            gancho_final(func, args, kwargs, None)
+    return wrapper
+
+
+def custo_por_chamada(funcao, chamadas, repeticoes):
+    faixa = range(chamadas)
+
+    def laco():
+        for _ in faixa:
+            funcao(1, 2)
+
+    return medir(laco, repeticoes) / chamadas
+
+
+def empilhar(decorator, profundidade):
+    funcao = somar
+    for _ in range(profundidade):
+        funcao = decorator(funcao)
+    return funcao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    chamadas, repeticoes = args.chamadas, args.repeticoes
+
+    tipos = {
+        "antes": (decorator_antes, lambda: Aspecto(antes=gancho)),
+        "finally": (decorator_finally, lambda: Aspecto(finalmente=gancho_final)),
+    }
+    base = custo_por_chamada(somar, chamadas, repeticoes)
+    linhas = []
+    for tipo, (decorator, criar_aspecto) in tipos.items():
+        for profundidade in range(1, 9):
+            aninhada = custo_por_chamada(empilhar(decorator, profundidade), chamadas, repeticoes)
+            fundida = custo_por_chamada(
+                fundir(*(criar_aspecto() for _ in range(profundidade)))(somar), chamadas, repeticoes
+            )
+            linhas.append([
+                tipo, profundidade, f"{(aninhada - base) * 1e9:.0f}", f"{(fundida - base) * 1e9:.0f}",
+                f"{(aninhada - base) / (fundida - base):.1f}x",
+            ])
+
+    print(f"Sobrecarga sobre somar(1, 2) ({base * 1e9:.0f} ns), mediana de {repeticoes} repetições\n")
+    imprimir_tabela(["camada", "profundidade", "aninhada (ns)", "fundida (ns)", "ganho"], linhas)
+
+
+if __name__ == "__main__":
+    main()
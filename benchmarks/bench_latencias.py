@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: custo por chamada do `cronometrar` de `latencias.py`.
+
+Uso:
+    python3 -m benchmarks.bench_latencias [--chamadas 200000] [--threads 8]
+
+Compara uma função vazia sem decorator, com o `cronometrar` do guia (que
+imprime a cada chamada; a saída vai para /dev/null) e com o `cronometrar`
+baseado em histograma. Depois verifica, com várias threads, que nenhuma
+chamada se perde e que os percentis batem com os valores exatos.
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import threading
+
+from latencias import Histograma, RegistroDeLatencias, cronometrar
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+
+def vazia():
+    return None
+
+
+def custo_por_chamada(funcao, chamadas, repeticoes):
+    faixa = range(chamadas)
+
+    def laco():
+        for _ in faixa:
+            funcao()
+
+    return medir(laco, repeticoes) / chamadas
+
+
+def verificar_threads(threads, chamadas):
+    registro = RegistroDeLatencias()
+    funcao = cronometrar(vazia, registro=registro, nome="vazia")
+
+    def trabalhar():
+        for _ in range(chamadas):
+            funcao()
+
+    trabalhadores = [threading.Thread(target=trabalhar) for _ in range(threads)]
+    for t in trabalhadores:
+        t.start()
+    for t in trabalhadores:
+        t.join()
+    contagem = registro.relatorio()["vazia"].contagem
+    assert contagem == threads * chamadas, f"esperava {threads * chamadas}, registrou {contagem}"
+    return contagem
+
+
+def verificar_precisao():
+    aleatorio = random.Random(7)
+    valores = [int(aleatorio.lognormvariate(10, 1.5)) for _ in range(100_000)]
+    histograma = Histograma()
+    for valor in valores:
+        histograma.registrar(valor)
+    valores.sort()
+    pior = 0.0
+    for p, aproximado in zip((50, 90, 99, 99.9), histograma.percentis()):
+        exato = valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+        pior = max(pior, abs(aproximado - exato) / exato)
+    return pior
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    guia = carregar("decorators_guide.py", "cronometrar")
+    base = custo_por_chamada(vazia, args.chamadas, args.repeticoes)
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        do_guia = custo_por_chamada(guia.cronometrar(vazia), args.chamadas, args.repeticoes)
+    histograma = custo_por_chamada(
+        cronometrar(vazia, registro=RegistroDeLatencias()), args.chamadas, args.repeticoes
+    )
+
+    linhas = [
+        ["sem decorator", f"{base * 1e9:.0f}", "-"],
+        ["cronometrar do guia (print)", f"{do_guia * 1e9:.0f}", f"{(do_guia - base) * 1e9:.0f}"],
+        ["latencias.cronometrar", f"{histograma * 1e9:.0f}", f"{(histograma - base) * 1e9:.0f}"],
+    ]
+    print(f"Função vazia, {args.chamadas} chamadas, mediana de {args.repeticoes} repetições\n")
+    imprimir_tabela(["versão", "ns/chamada", "sobrecarga (ns)"], linhas)
+
+    contagem = verificar_threads(args.threads, args.chamadas // args.threads)
+    print(f"\n{args.threads} threads: {contagem} chamadas registradas, nenhuma perdida.")
+    print(f"Maior erro relativo dos percentis: {verificar_precisao():.2%}")
+
+
+if __name__ == "__main__":
+    main()
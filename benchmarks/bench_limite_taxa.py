@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: vazão de aquisições do `Limitador` e precisão do limite.
+
+Uso:
+    python3 -m benchmarks.bench_limite_taxa [--aquisicoes 200000]
+
+1. Vazão: `tentar_adquirir` com um limite alto o bastante para nunca negar,
+   com chave global e com 1000 chaves, nos dois algoritmos e em `async`.
+   A meta é sustentar bem mais de 100 mil aquisições por segundo.
+2. Precisão: `adquirir` bloqueante a 1000/s durante ~0,5 s, conferindo a
+   taxa efetivamente obtida.
+"""
+
+import argparse
+import asyncio
+import time
+
+from limite_taxa import Limitador, criar_algoritmo
+
+from ._medicao import imprimir_tabela, medir
+
+LIMITE_ALTO = 10**9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--aquisicoes", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+    n = args.aquisicoes
+
+    linhas = []
+    for algoritmo in ("balde", "janela"):
+        for chaves in (1, 1000):
+            # A janela guarda um instante por chamada: limite = aquisições da rodada.
+            limite = LIMITE_ALTO if algoritmo == "balde" else n * (args.repeticoes + 1)
+            limitador = Limitador(criar_algoritmo(algoritmo, limite, 1.0))
+            sequencia = [i % chaves for i in range(n)] if chaves > 1 else [None] * n
+
+            def rodada():
+                tentar = limitador.tentar_adquirir
+                for chave in sequencia:
+                    tentar(chave)
+
+            duracao = medir(rodada, args.repeticoes)
+            linhas.append([algoritmo, chaves, "sync", f"{n / duracao:,.0f}"])
+
+    limitador = Limitador(criar_algoritmo("balde", LIMITE_ALTO, 1.0))
+
+    async def rodada_async():
+        adquirir = limitador.adquirir_async
+        for _ in range(n):
+            await adquirir()
+
+    duracao = medir(lambda: asyncio.run(rodada_async()), args.repeticoes)
+    linhas.append(["balde", 1, "async", f"{n / duracao:,.0f}"])
+
+    print(f"{n} aquisições, mediana de {args.repeticoes} repetições\n")
+    imprimir_tabela(["algoritmo", "chaves", "api", "aquisições/s"], linhas)
+
+    print()
+    for algoritmo in ("balde", "janela"):
+        limitador = Limitador(criar_algoritmo(algoritmo, 100, 0.1))  # 1000/s
+        for _ in range(100):
+            limitador.tentar_adquirir()  # Esgota a rajada inicial.
+        inicio = time.monotonic()
+        for _ in range(500):
+            limitador.adquirir()
+        taxa = 500 / (time.monotonic() - inicio)
+        print(f"Precisão ({algoritmo}): alvo 1000/s, obtido {taxa:,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: latência por chamada de quem registra, `print` x `log_em_fila`.
+
+Uso:
+    python3 -m benchmarks.bench_log_em_fila [--chamadas 20000] [--threads 8]
+
+O destino simula um stdout ou disco lento: cada `write` dorme
+`--atraso-write` segundos. O `meu_log` do guia faz um `print` (dois
+`write`) por chamada, então cada thread paga esse atraso. As versões de
+`log_em_fila.py` só enfileiram; a escritora paga um `write` por lote. A
+tabela mostra a latência por chamada vista pelos produtores (p50, p99 e
+máximo) e quantas mensagens cada política descartou.
+"""
+
+import argparse
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from log_em_fila import FilaDeLog, meu_log
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela
+
+
+class DestinoLento:
+    """Arquivo de texto falso em que cada `write` demora."""
+
+    def __init__(self, atraso):
+        self.atraso = atraso
+        self.escritas = 0
+        self._trava = threading.Lock()
+
+    def write(self, texto):
+        with self._trava:  # Como um descritor de arquivo: uma escrita por vez.
+            time.sleep(self.atraso)
+            self.escritas += 1
+        return len(texto)
+
+    def flush(self):
+        pass
+
+
+def funcao_log_padrao(x):
+    return x
+
+
+def disparar(funcao, chamadas, threads):
+    """Latências (ns) de cada chamada, de `threads` threads ao mesmo tempo."""
+    por_thread = chamadas // threads
+    barreira = threading.Barrier(threads)
+    relogio = time.perf_counter_ns
+
+    def produzir(_):
+        tempos = []
+        barreira.wait()
+        for i in range(por_thread):
+            inicio = relogio()
+            funcao(i)
+            tempos.append(relogio() - inicio)
+        return tempos
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencias = sorted(t for tempos in executor.map(produzir, range(threads)) for t in tempos)
+    return latencias
+
+
+def resumir(nome, latencias, descartadas="-"):
+    return [
+        nome,
+        f"{latencias[len(latencias) // 2] / 1e3:.1f}",
+        f"{latencias[int(len(latencias) * 0.99)] / 1e3:.1f}",
+        f"{latencias[-1] / 1e3:.1f}",
+        descartadas,
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--atraso-write", type=float, default=0.00005)
+    parser.add_argument("--capacidade", type=int, default=10_000)
+    args = parser.parse_args()
+
+    linhas = [resumir("sem log", disparar(funcao_log_padrao, args.chamadas, args.threads))]
+
+    # O guia usa `print`: as chamadas medidas são só as do guia, com stdout lento.
+    guia = carregar("decorators_guide.py", "meu_log").meu_log
+    lento = DestinoLento(args.atraso_write)
+    with contextlib.redirect_stdout(lento):
+        linhas.append(resumir("meu_log do guia (print)",
+                              disparar(guia(funcao_log_padrao), args.chamadas, args.threads)))
+
+    for politica in ("descartar", "bloquear"):
+        lento = DestinoLento(args.atraso_write)
+        fila = FilaDeLog(destino=lento, capacidade=args.capacidade, politica=politica, intervalo=0.01)
+        decorada = meu_log(funcao_log_padrao, fila=fila)
+        latencias = disparar(decorada, args.chamadas, args.threads)
+        fila.parar()
+        estatisticas = fila.estatisticas()
+        linhas.append(resumir(f"log_em_fila ({politica})", latencias, estatisticas.descartadas))
+        assert estatisticas.escritas + estatisticas.descartadas == args.chamadas // args.threads * args.threads
+
+    print(f"{args.chamadas} chamadas de {args.threads} threads; cada write leva "
+          f"{args.atraso_write * 1e6:.0f} µs; fila de {args.capacidade}\n")
+    imprimir_tabela(["versão", "p50 (µs)", "p99 (µs)", "máx (µs)", "descartadas"], linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: vazão de chamadas escalares com `@lote`, variando tamanho e prazo.
+
+Uso:
+    python3 -m benchmarks.bench_lotes [--chamadas 4000] [--threads 64]
+
+O backend simulado cobra um custo fixo por chamada (`--fixo`, uma ida e
+volta) mais um custo pequeno por item (`--por-item`), com `time.sleep`, e
+atende no máximo `--conexoes` chamadas ao mesmo tempo (como um pool de
+conexões). A linha "direto" chama o backend com um item por vez, como
+`calcula_algo(x)` faz hoje. As demais usam `@lote`, com um executor de
+`--conexoes` threads, para cada combinação de `max_itens` e `max_espera`, e
+mostram a vazão, a latência por chamada vista por quem chamou e o tamanho
+médio dos lotes.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from latencias import RegistroDeLatencias
+from lotes import lote
+
+from ._medicao import imprimir_tabela
+
+
+def criar_backend(fixo, por_item, conexoes):
+    semaforo = threading.Semaphore(conexoes)
+
+    def backend(xs):
+        with semaforo:
+            time.sleep(fixo + por_item * len(xs))
+        return [x * 10 for x in xs]
+    return backend
+
+
+def disparar(funcao, chamadas, threads):
+    """Chama `funcao` `chamadas` vezes de `threads` threads; retorna vazão e latências."""
+    latencias = []
+
+    def chamar(x):
+        inicio = time.perf_counter()
+        resultado = funcao(x)
+        latencias.append(time.perf_counter() - inicio)
+        return resultado
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        resultados = list(executor.map(chamar, range(chamadas)))
+    duracao = time.perf_counter() - inicio
+    assert resultados == [x * 10 for x in range(chamadas)], "resultado incorreto"
+    latencias.sort()
+    return chamadas / duracao, statistics.median(latencias), latencias[int(len(latencias) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=4000)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--fixo", type=float, default=0.001)
+    parser.add_argument("--por-item", type=float, default=0.00001)
+    parser.add_argument("--conexoes", type=int, default=4)
+    args = parser.parse_args()
+
+    backend = criar_backend(args.fixo, args.por_item, args.conexoes)
+    vazao, p50, p99 = disparar(lambda x: backend([x])[0], args.chamadas, args.threads)
+    linhas = [["direto", "-", "-", f"{vazao:,.0f}", f"{p50 * 1e3:.2f}", f"{p99 * 1e3:.2f}", "1.0"]]
+
+    for max_itens in (1, 8, 32, 128):
+        for max_espera in (0.0005, 0.002, 0.010):
+            with ThreadPoolExecutor(max_workers=args.conexoes) as executor:
+                agrupada = lote(backend, max_itens=max_itens, max_espera=max_espera,
+                                executor=executor, registro=RegistroDeLatencias())
+                vazao, p50, p99 = disparar(agrupada, args.chamadas, args.threads)
+                agrupada.parar()
+            media = agrupada.estatisticas().media_por_lote
+            linhas.append([
+                "@lote", max_itens, f"{max_espera * 1e3:.1f}", f"{vazao:,.0f}",
+                f"{p50 * 1e3:.2f}", f"{p99 * 1e3:.2f}", f"{media:.1f}",
+            ])
+
+    print(f"{args.chamadas} chamadas de {args.threads} threads; backend: {args.fixo * 1e3:.1f} ms por chamada "
+          f"+ {args.por_item * 1e6:.0f} µs por item, {args.conexoes} conexões\n")
+    imprimir_tabela(
+        ["versão", "max_itens", "max_espera (ms)", "chamadas/s", "p50 (ms)", "p99 (ms)", "itens/lote"], linhas
+    )
+
+
+if __name__ == "__main__":
+    main()
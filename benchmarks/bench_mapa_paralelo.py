@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: `processar` do guia x `mapa_paralelo.processar` com 1 a N trabalhadores.
+
+Uso:
+    python3 -m benchmarks.bench_mapa_paralelo [--itens 200000] [--max-trabalhadores N]
+
+Três cargas, cada uma no modo que `modo="auto"` escolheria para ela:
+
+- cpu: uma função Python que só faz contas (processos);
+- hash: `sha256` de 64 KiB, que libera a GIL (threads);
+- io: uma espera de 1 ms, como uma chamada de rede (threads).
+
+A coluna "guia" é a list comprehension do `processar` de `funcoes_guide.py`;
+as outras mostram o tempo e o ganho com 1, 2, ... `--max-trabalhadores`
+trabalhadores (padrão: o de threads,
+`mapa_paralelo.trabalhadores_padrao("threads")`). A carga "io" usa menos itens,
+porque em série ela só espera.
+"""
+
+import argparse
+import hashlib
+import os
+import time
+
+import mapa_paralelo
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+BLOCO_HASH = bytes(64 * 1024)
+
+
+def trabalho_cpu(x):
+    total = 0
+    for i in range(100):
+        total += (x * i) % 7
+    return total
+
+
+def trabalho_hash(x):
+    return hashlib.sha256(BLOCO_HASH).digest()[x % 32]
+
+
+def trabalho_io(x):
+    time.sleep(0.001)
+    return x
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--itens", type=int, default=200_000)
+    parser.add_argument("--max-trabalhadores", type=int, default=mapa_paralelo.trabalhadores_padrao("threads"))
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    processar_guia = carregar("funcoes_guide.py", "processar").processar
+    cargas = [
+        ("cpu", trabalho_cpu, args.itens),
+        ("hash", trabalho_hash, args.itens // 20),
+        ("io", trabalho_io, args.itens // 400),
+    ]
+    contagens = sorted({1, *range(2, args.max_trabalhadores + 1, 2), args.max_trabalhadores})
+
+    linhas = []
+    for nome, func, itens in cargas:
+        dados = list(range(itens))
+        modo = mapa_paralelo.escolher_modo(func)
+        if nome != "cpu":
+            modo = "threads"  # Funções Python com I/O ou C: threads, não processos.
+        esperado = processar_guia(dados, func)
+        base = medir(lambda: processar_guia(dados, func), args.repeticoes)
+        linha = [nome, modo, itens, f"{base * 1e3:.0f}"]
+        for trabalhadores in contagens:
+            opcoes = {"modo": modo, "trabalhadores": trabalhadores}
+            # A primeira rodada cria o pool (e os processos) e confere a ordem.
+            assert mapa_paralelo.processar(dados, func, **opcoes) == esperado
+            tempo = medir(lambda: mapa_paralelo.processar(dados, func, **opcoes), args.repeticoes)
+            linha.append(f"{tempo * 1e3:.0f} ({base / tempo:.1f}x)")
+        linhas.append(linha)
+
+    print(f"{os.cpu_count()} núcleos; mediana de {args.repeticoes} repetições, em ms (ganho sobre o guia)\n")
+    imprimir_tabela(["carga", "modo", "itens", "guia"] + [f"{n} trab." for n in contagens], linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: `memoizar` x `cache` do guia x `functools.lru_cache` em Fibonacci.
+
+Uso:
+    python3 -m benchmarks.bench_memoizacao [--n 400] [--repeticoes 7]
+
+Dois cenários:
+    - frio: cache vazio, calcula fibonacci(n) (n falhas + ~n acertos);
+    - quente: fibonacci(n) já calculado, mede 100 mil acertos.
+"""
+
+import argparse
+import contextlib
+import functools
+import os
+
+from memoizacao import memoizar
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+ACERTOS_QUENTES = 100_000
+
+
+def criar_fibonacci(decorator):
+    @decorator
+    def fibonacci(n):
+        if n < 2:
+            return n
+        return fibonacci(n - 1) + fibonacci(n - 2)
+    return fibonacci
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=400)
+    parser.add_argument("--repeticoes", type=int, default=7)
+    args = parser.parse_args()
+
+    guia = carregar("decorators_guide.py", "cache")
+    decorators = {
+        "cache (guia)": guia.cache,
+        "lru_cache(maxsize=None)": functools.lru_cache(maxsize=None),
+        "lru_cache(maxsize=128)": functools.lru_cache(maxsize=128),
+        "memoizar(maxsize=None)": memoizar(maxsize=None),
+        "memoizar(maxsize=128)": memoizar(maxsize=128),
+        "memoizar(ttl=60)": memoizar(ttl=60),
+        "memoizar(maxbytes=1MiB)": memoizar(maxsize=None, maxbytes=1 << 20),
+    }
+
+    linhas = []
+    # O `cache` do guia imprime a cada falha; a saída é descartada.
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for nome, decorator in decorators.items():
+            frio = medir(lambda: criar_fibonacci(decorator)(args.n), args.repeticoes)
+
+            fib = criar_fibonacci(decorator)
+            fib(args.n)
+
+            def quente():
+                for _ in range(ACERTOS_QUENTES):
+                    fib(args.n)
+
+            por_acerto = medir(quente, args.repeticoes) / ACERTOS_QUENTES
+            linhas.append([nome, f"{frio * 1e6:.1f}", f"{por_acerto * 1e9:.0f}"])
+
+    print(f"Fibonacci(n={args.n}), mediana de {args.repeticoes} repetições\n")
+    imprimir_tabela(["decorator", "frio (µs)", "acerto (ns)"], linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: `memoizar_async` com milhares de awaits simultâneos.
+
+Uso:
+    python3 -m benchmarks.bench_memoizacao_async [--awaits 10000] [--chaves 10]
+
+Cenários:
+    1. frio: `--awaits` corrotinas aguardam `--chaves` chaves ao mesmo tempo;
+       cada chave deve ser calculada uma única vez;
+    2. quente: os mesmos awaits com tudo já no cache;
+    3. cancelamento: todos os awaits de uma chave são cancelados e a tarefa
+       compartilhada deve ser cancelada junto.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from memoizacao import memoizar_async
+
+ATRASO = 0.05
+
+
+async def executar(awaits, chaves):
+    calculos = Counter()
+    canceladas = []
+
+    @memoizar_async(maxsize=None)
+    async def consulta(chave):
+        calculos[chave] += 1
+        try:
+            await asyncio.sleep(ATRASO)
+        except asyncio.CancelledError:
+            canceladas.append(chave)
+            raise
+        return chave * 2
+
+    pedidos = [i % chaves for i in range(awaits)]
+
+    inicio = time.perf_counter()
+    resultados = await asyncio.gather(*(consulta(chave) for chave in pedidos))
+    frio = time.perf_counter() - inicio
+    assert resultados == [chave * 2 for chave in pedidos]
+    assert set(calculos.values()) == {1}, f"chave calculada mais de uma vez: {calculos}"
+    calculos_frios = sum(calculos.values())
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(consulta(chave) for chave in pedidos))
+    quente = time.perf_counter() - inicio
+
+    esperas = [asyncio.ensure_future(consulta(-1)) for _ in range(1000)]
+    await asyncio.sleep(0)
+    for espera in esperas:
+        espera.cancel()
+    await asyncio.gather(*esperas, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert canceladas == [-1], "a tarefa compartilhada não foi cancelada"
+
+    print(f"{awaits} awaits em {chaves} chaves")
+    print(f"  frio:   {frio * 1e3:8.1f} ms ({calculos_frios} cálculos; atraso da função {ATRASO * 1e3:.0f} ms)")
+    print(f"  quente: {quente * 1e3:8.1f} ms ({quente / awaits * 1e6:.2f} µs por await)")
+    print(f"  cancelamento: 1000 awaits cancelados -> tarefa cancelada? {canceladas == [-1]}")
+    print(f"  {consulta.cache_info()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--awaits", type=int, default=10_000)
+    parser.add_argument("--chaves", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(executar(args.awaits, args.chaves))
+
+
+if __name__ == "__main__":
+    main()
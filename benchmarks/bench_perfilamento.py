@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: custo por chamada de `@perfilar` com e sem amostragem.
+
+Uso:
+    python3 -m benchmarks.bench_perfilamento [--amostras 15]
+
+Uma função pequena (`multiplicar`) é chamada em laços de `perf_counter_ns`
+calibrados: sem decorator, com `@perfilar` desligado, amostrando 1 a cada
+10 000 e 1 a cada 100 chamadas, e perfilando todas. As chamadas fora da
+amostra só pagam a contagem regressiva; a última linha mostra o preço de
+ligar o `cProfile` em toda chamada.
+"""
+
+import argparse
+from itertools import repeat
+
+from perfilamento import perfilar
+
+from ._medicao import amostrar_ns, calibrar, imprimir_tabela, mediana_e_mad
+
+
+def multiplicar(a, b):
+    return a * b
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--alvo-ms", type=float, default=20.0)
+    parser.add_argument("--amostras", type=int, default=15)
+    args = parser.parse_args()
+
+    desligado = perfilar(multiplicar)
+    desligado.amostragem.desativar()
+    casos = [
+        ("sem decorator", multiplicar),
+        ("perfilar desligado", desligado),
+        ("perfilar 1/10000", perfilar(amostragem=10_000)(multiplicar)),
+        ("perfilar 1/100", perfilar(amostragem=100)(multiplicar)),
+        ("perfilar todas", perfilar(multiplicar)),
+    ]
+
+    def criar_laco(funcao):
+        def laco(n):
+            for _ in repeat(None, n):
+                funcao(5, 4)
+        return laco
+
+    lacos = [(nome, criar_laco(funcao)) for nome, funcao in casos]
+    iteracoes = {nome: calibrar(laco, int(args.alvo_ms * 1e6)) for nome, laco in lacos}
+    tempos = {nome: [] for nome, _ in lacos}
+    for _ in range(args.amostras):
+        for nome, laco in lacos:
+            tempos[nome].extend(amostrar_ns(laco, iteracoes[nome], 1))
+
+    base = mediana_e_mad(tempos["sem decorator"])[0]
+    linhas = []
+    for nome, funcao in casos:
+        mediana, mad = mediana_e_mad(tempos[nome])
+        perfiladas = funcao.perfil.amostras if hasattr(funcao, "perfil") else "-"
+        linhas.append([nome, f"{mediana:.1f}", f"{mad:.1f}", f"{mediana - base:+.1f}", perfiladas])
+
+    print(f"{args.amostras} amostras por caso, laços de ~{args.alvo_ms:.0f} ms; ns por chamada\n")
+    imprimir_tabela(["versão", "mediana", "MAD", "sobrecarga", "chamadas perfiladas"], linhas)
+
+
+if __name__ == "__main__":
+    main()
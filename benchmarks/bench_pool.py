@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: vazão de consultas em função do tamanho do pool de conexões.
+
+Uso:
+    python3 -m benchmarks.bench_pool [--threads 32] [--consultas 20] [--latencia 0.005]
+
+Um banco falso leva `--latencia` segundos por consulta (com `time.sleep` ou
+`asyncio.sleep`, como a espera de rede de um banco real) e 20 ms para abrir
+uma conexão. `--threads` threads fazem `--consultas` consultas cada.
+
+1. Uma única conexão compartilhada com trava (o `Singleton` do guia).
+2. `PoolDeConexoes` com máximo de 1 a 32 conexões.
+3. `PoolDeConexoesAsync` com o mesmo número de tarefas concorrentes.
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from recursos import PoolDeConexoes, PoolDeConexoesAsync, Singleton
+
+from ._medicao import imprimir_tabela
+
+LATENCIA_CONEXAO = 0.02
+
+
+class ConexaoFalsa:
+    def __init__(self, latencia):
+        self.latencia = latencia
+        self.trava = threading.Lock()
+
+    def consultar(self, sql):
+        time.sleep(self.latencia)
+        return sql
+
+    async def consultar_async(self, sql):
+        await asyncio.sleep(self.latencia)
+        return sql
+
+
+def conectar(latencia):
+    time.sleep(LATENCIA_CONEXAO)
+    return ConexaoFalsa(latencia)
+
+
+async def conectar_async(latencia):
+    await asyncio.sleep(LATENCIA_CONEXAO)
+    return ConexaoFalsa(latencia)
+
+
+def vazao_threads(threads, consultas, executar):
+    def trabalhador(_):
+        for i in range(consultas):
+            executar(i)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(trabalhador, range(threads)))
+    return threads * consultas / (time.perf_counter() - inicio)
+
+
+def vazao_async(tarefas, consultas, latencia, maximo):
+    async def rodar():
+        fabrica = lambda: conectar_async(latencia)
+        async with PoolDeConexoesAsync(fabrica, minimo=1, maximo=maximo) as pool:
+            async def trabalhador():
+                for i in range(consultas):
+                    async with pool.conexao() as db:
+                        await db.consultar_async(i)
+
+            inicio = time.perf_counter()
+            await asyncio.gather(*(trabalhador() for _ in range(tarefas)))
+            return tarefas * consultas / (time.perf_counter() - inicio)
+
+    return asyncio.run(rodar())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--consultas", type=int, default=20)
+    parser.add_argument("--latencia", type=float, default=0.005)
+    args = parser.parse_args()
+    threads, consultas, latencia = args.threads, args.consultas, args.latencia
+
+    conexao_unica = Singleton(conectar)
+
+    def consultar_singleton(i):
+        db = conexao_unica(latencia)
+        with db.trava:  # Uma conexão real não aceita consultas simultâneas.
+            return db.consultar(i)
+
+    base = vazao_threads(threads, consultas, consultar_singleton)
+    linhas = [["Singleton + trava", 1, f"{base:,.0f}", "1.0x", "-"]]
+
+    for maximo in (1, 2, 4, 8, 16, 32):
+        pool = PoolDeConexoes(lambda: conectar(latencia), minimo=1, maximo=maximo)
+
+        def consultar_pool(i):
+            with pool.conexao() as db:
+                return db.consultar(i)
+
+        vazao = vazao_threads(threads, consultas, consultar_pool)
+        vazao_assincrona = vazao_async(threads, consultas, latencia, maximo)
+        linhas.append([
+            "PoolDeConexoes", maximo, f"{vazao:,.0f}", f"{vazao / base:.1f}x", f"{vazao_assincrona:,.0f}",
+        ])
+        pool.fechar()
+
+    print(f"{threads} clientes x {consultas} consultas de {latencia * 1e3:.0f} ms "
+          f"(teto com 1 conexão: {1 / latencia:,.0f}/s)\n")
+    imprimir_tabela(["implementação", "conexões", "consultas/s", "ganho", "async (consultas/s)"], linhas)
+
+
+if __name__ == "__main__":
+    main()
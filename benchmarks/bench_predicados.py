@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: `filter(lambda ...)` x predicados compilados, sobre 10^7 inteiros.
+
+Uso:
+    python3 -m benchmarks.bench_predicados [--elementos 10000000]
+
+Dois filtros: o `criar_verificador_de_limite` do guia (`x < limite`) e uma
+combinação (`x > 10 and x % 2 == 0`). A linha de base é `filter` com a
+closure do guia ou com uma lambda; os predicados de `predicados.py` filtram
+a mesma lista (list comprehension gerada), um `array.array("q")` e, se o
+NumPy estiver instalado, um `ndarray` (máscara vetorial).
+"""
+
+import argparse
+import array
+import random
+
+from predicados import acima, criar_verificador_de_limite, np, par
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--elementos", type=int, default=10_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    aleatorio = random.Random(0)
+    lista = [aleatorio.randrange(1000) for _ in range(args.elementos)]
+    arranjo = array.array("q", lista)
+    ndarray = np.frombuffer(arranjo, dtype="q") if np is not None else None
+
+    guia = carregar("decorators_guide.py", "criar_verificador_de_limite").criar_verificador_de_limite
+    casos = [
+        ("x < 500 (guia)", guia(500), criar_verificador_de_limite(500)),
+        ("x > 10 and x % 2 == 0", lambda x: x > 10 and x % 2 == 0, acima(10) & par()),
+    ]
+
+    linhas = []
+    for nome, closure, predicado in casos:
+        esperado = list(filter(closure, lista))
+        assert predicado.filtrar(lista) == esperado
+        assert predicado.filtrar(arranjo).tolist() == esperado
+
+        base = medir(lambda: list(filter(closure, lista)), args.repeticoes)
+        em_lista = medir(lambda: predicado.filtrar(lista), args.repeticoes)
+        em_array = medir(lambda: predicado.filtrar(arranjo), args.repeticoes)
+        em_numpy = medir(lambda: predicado.filtrar(ndarray), args.repeticoes) if np is not None else None
+        linhas.append([
+            nome,
+            f"{base * 1e3:.0f}",
+            f"{em_lista * 1e3:.0f} ({base / em_lista:.1f}x)",
+            f"{em_array * 1e3:.0f} ({base / em_array:.1f}x)",
+            f"{em_numpy * 1e3:.0f} ({base / em_numpy:.0f}x)" if em_numpy is not None else "-",
+        ])
+
+    print(f"{args.elementos} inteiros, mediana de {args.repeticoes} repetições, em ms "
+          f"(NumPy {'disponível' if np is not None else 'ausente'})\n")
+    imprimir_tabela(["filtro", "filter(closure)", "lista", "array.array", "numpy"], linhas)
+
+
+if __name__ == "__main__":
+    main()
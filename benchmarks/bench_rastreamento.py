@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: custo por chamada do `rastrear` de `rastreamento.py`.
+
+Uso:
+    python3 -m benchmarks.bench_rastreamento [--chamadas 200000]
+
+Compara `multiplicar_debug(a, b)` sem decorator, com o `debug_info` do guia
+(dois `print` por chamada; a saída vai para /dev/null) e com `rastrear` em
+cada profundidade de captura. O custo do rastreador não depende do tamanho
+do buffer: a tabela mostra capacidades de 64 e 65536 registros. Por fim,
+mede quanto custa formatar um despejo completo (pago só quando alguém pede).
+"""
+
+import argparse
+import contextlib
+import io
+import os
+
+from rastreamento import CAPTURA_COPIAS, CAPTURA_NOME, CAPTURA_REFERENCIAS, Rastreador
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+
+def multiplicar_debug(a, b):
+    return a * b
+
+
+def custo_por_chamada(funcao, chamadas, repeticoes):
+    faixa = range(chamadas)
+    lista = [1, 2, 3]
+
+    def laco():
+        for _ in faixa:
+            funcao(lista, 2)
+
+    return medir(laco, repeticoes) / chamadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=200_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    chamadas, repeticoes = args.chamadas, args.repeticoes
+
+    guia = carregar("decorators_guide.py", "debug_info")
+    base = custo_por_chamada(multiplicar_debug, chamadas, repeticoes)
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        do_guia = custo_por_chamada(guia.debug_info(multiplicar_debug), chamadas, repeticoes)
+    linhas = [
+        ["sem decorator", "-", f"{base * 1e9:.0f}", "-"],
+        ["debug_info do guia (print)", "-", f"{do_guia * 1e9:.0f}", f"{(do_guia - base) * 1e9:.0f}"],
+    ]
+
+    nomes = {CAPTURA_NOME: "nome", CAPTURA_REFERENCIAS: "referências", CAPTURA_COPIAS: "cópias"}
+    for captura, descricao in nomes.items():
+        for capacidade in (64, 65536):
+            rastreador = Rastreador(capacidade=capacidade, captura=captura)
+            custo = custo_por_chamada(rastreador.decorar(multiplicar_debug), chamadas, repeticoes)
+            linhas.append([f"rastrear ({descricao})", capacidade, f"{custo * 1e9:.0f}", f"{(custo - base) * 1e9:.0f}"])
+
+    print(f"{chamadas} chamadas, mediana de {repeticoes} repetições\n")
+    imprimir_tabela(["versão", "capacidade", "ns/chamada", "sobrecarga (ns)"], linhas)
+
+    saida = io.StringIO()
+    despejo = medir(lambda: rastreador.despejar(saida), 3)
+    print(f"\nDespejo de {rastreador.capacidade} registros (formatação adiada): {despejo * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: despacho de rotas com `rotas.Registro` x varredura de funções marcadas.
+
+Uso:
+    python3 -m benchmarks.bench_rotas [--rotas 10000]
+
+Gera `--rotas` handlers em rotas como `/api/recurso123/{id}/acao4`, em
+duas versões. A varredura é o que se faz com funções marcadas pelo
+`AdicionarAtributo` do guia: percorrer todas e comparar rota e versão,
+segmento a segmento. O `Registro` mede três momentos: o registro (o que o
+import paga), a compilação da trie (paga uma vez, no primeiro despacho) e o
+despacho em si.
+"""
+
+import argparse
+import random
+import time
+
+from rotas import Registro
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+VERSOES = ("1.0", "2.0")
+
+
+def gerar_caminhos(quantidade):
+    caminhos = []
+    for i in range(quantidade // len(VERSOES)):
+        caminhos.append(f"/api/recurso{i // 8}/{{id}}/acao{i % 8}")
+    return caminhos
+
+
+def varrer(funcoes, caminho, versao):
+    """Despacho por varredura linear, comparando os segmentos de cada rota."""
+    segmentos = caminho.strip("/").split("/")
+    for funcao in funcoes:
+        if funcao.versao != versao:
+            continue
+        padrao = funcao.rota.strip("/").split("/")
+        if len(padrao) != len(segmentos):
+            continue
+        parametros = {}
+        for esperado, valor in zip(padrao, segmentos):
+            if esperado.startswith("{"):
+                parametros[esperado[1:-1]] = valor
+            elif esperado != valor:
+                break
+        else:
+            return funcao, parametros
+    raise LookupError(caminho)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rotas", type=int, default=10_000)
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    caminhos = gerar_caminhos(args.rotas)
+    handlers = []
+    for caminho in caminhos:
+        for versao in VERSOES:
+            def handler(id):
+                return id
+            handlers.append((caminho, versao, handler))
+
+    AdicionarAtributo = carregar("decorators_guide.py", "AdicionarAtributo").AdicionarAtributo
+    inicio = time.perf_counter()
+    marcadas = [AdicionarAtributo("rota", c)(AdicionarAtributo("versao", v)(h)) for c, v, h in handlers]
+    marcar = time.perf_counter() - inicio
+
+    registro = Registro()
+    inicio = time.perf_counter()
+    for caminho, versao, handler in handlers:
+        registro.rota(caminho, versao)(handler)
+    registrar = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    registro.compilar()
+    compilar = time.perf_counter() - inicio
+
+    aleatorio = random.Random(0)
+    consultas = [
+        (caminho.replace("{id}", str(aleatorio.randrange(1000))), aleatorio.choice(VERSOES))
+        for caminho in aleatorio.choices(caminhos, k=args.consultas)
+    ]
+    for caminho, versao in consultas[:50]:
+        assert registro.despachar(caminho, versao).handler is varrer(marcadas, caminho, versao)[0]
+
+    despachar = registro.despachar
+    trie = medir(lambda: [despachar(c, v) for c, v in consultas], args.repeticoes) / len(consultas)
+    amostra = consultas[:200]
+    linear = medir(lambda: [varrer(marcadas, c, v) for c, v in amostra], 1) / len(amostra)
+
+    print(f"{len(handlers)} handlers ({len(caminhos)} rotas x {len(VERSOES)} versões)\n")
+    imprimir_tabela(
+        ["abordagem", "registro (ms)", "compilação (ms)", "despacho (µs)"],
+        [
+            ["AdicionarAtributo + varredura", f"{marcar * 1e3:.1f}", "-", f"{linear * 1e6:.1f}"],
+            ["Registro (trie)", f"{registrar * 1e3:.1f}", f"{compilar * 1e3:.1f}", f"{trie * 1e6:.2f}"],
+        ],
+    )
+    print(f"\nDespacho {linear / trie:.0f}x mais rápido; registro custa "
+          f"{registrar / len(handlers) * 1e6:.2f} µs por handler.")
+
+
+if __name__ == "__main__":
+    main()
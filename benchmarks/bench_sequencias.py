@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: `fibonacci` dos guias x `sequencias.py`, até ~10^6 dígitos.
+
+Uso:
+    python3 -m benchmarks.bench_sequencias [--max-digitos 1000000]
+
+As versões dos guias (recursivas com memoização) são medidas com o cache
+vazio a cada repetição, até estourarem o limite de recursão. O laço
+iterativo `a, b = b, a + b` entra como referência até 10^5. As versões de
+`sequencias.py` seguem até F(n) ter `--max-digitos` dígitos
+(n ≈ dígitos / log10(φ)).
+"""
+
+import argparse
+import contextlib
+import math
+import os
+
+from sequencias import fibonacci, fibonacci_matriz, fibonacci_muitos
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+LOG10_PHI = math.log10((1 + 5 ** 0.5) / 2)
+
+
+def iterativo(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def versao_do_guia(guia, nome_decorator):
+    """Uma função que recria o `fibonacci` do guia (cache vazio) e calcula F(n)."""
+    decorator = getattr(carregar(guia, nome_decorator), nome_decorator)
+
+    def calcular(n):
+        @decorator
+        def fib(k):
+            if k < 2:
+                return k
+            return fib(k - 1) + fib(k - 2)
+
+        return fib(n)
+
+    return calcular
+
+
+def tempo(funcao, n, repeticoes):
+    try:
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            return f"{medir(lambda: funcao(n), repeticoes) * 1e3:.3f}"
+    except RecursionError:
+        return "RecursionError"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-digitos", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    guia_decorators = versao_do_guia("decorators_guide.py", "cache")
+    guia_funcoes = versao_do_guia("funcoes_guide.py", "cache_decorator")
+
+    ns = [10, 100, 400, 1000, 10_000, 100_000, 1_000_000]
+    ns = [n for n in ns if n * LOG10_PHI < args.max_digitos]
+    ns.append(int(args.max_digitos / LOG10_PHI))
+
+    linhas = []
+    for n in ns:
+        guias = n <= 10_000
+        linhas.append([
+            n,
+            int(n * LOG10_PHI) + 1,
+            tempo(guia_decorators, n, args.repeticoes) if guias else "-",
+            tempo(guia_funcoes, n, args.repeticoes) if guias else "-",
+            tempo(iterativo, n, args.repeticoes) if n <= 100_000 else "-",
+            tempo(fibonacci_matriz, n, args.repeticoes),
+            tempo(fibonacci, n, args.repeticoes),
+        ])
+
+    print(f"Mediana de {args.repeticoes} repetições, em ms\n")
+    imprimir_tabela(
+        ["n", "dígitos", "guia decorators", "guia funções", "iterativo", "matriz", "duplicação"], linhas
+    )
+
+    muitos = list(range(0, 200_000, 100))
+    lote = medir(lambda: fibonacci_muitos(muitos), args.repeticoes)
+    separados = medir(lambda: [fibonacci(n) for n in muitos], args.repeticoes)
+    print(f"\n{len(muitos)} índices de 0 a 200000: fibonacci_muitos {lote * 1e3:.1f} ms, "
+          f"um por um {separados * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
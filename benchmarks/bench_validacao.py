@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: custo por chamada da validação de tipos.
+
+Uso:
+    python3 -m benchmarks.bench_validacao [--chamadas 500000]
+
+Compara, em `multiplicar(a, b)` e `somar_inteiros(a, b)`:
+    - a função sem decorator;
+    - `validar_tipos` de `funcoes_guide.py` e `esperar_tipo` de
+      `decorators_guide.py`;
+    - as versões compiladas de `validacao.py`, com argumentos posicionais e
+      nomeados;
+    - as versões compiladas com a validação desligada (que devolvem a função
+      original, como acontece sob `python -O` ou com `VALIDAR_TIPOS=0`).
+"""
+
+import argparse
+
+import validacao
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+
+def multiplicar(a, b):
+    return a * b
+
+
+def somar_inteiros(a, b):
+    return a + b
+
+
+def custo_por_chamada(chamar, chamadas, repeticoes):
+    faixa = range(chamadas)
+
+    def laco():
+        for _ in faixa:
+            chamar()
+
+    return medir(laco, repeticoes) / chamadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chamadas", type=int, default=500_000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    guia_funcoes = carregar("funcoes_guide.py", "validar_tipos")
+    guia_decorators = carregar("decorators_guide.py", "esperar_tipo")
+
+    validacao.definir_validacao(True)
+    compilado_args = validacao.validar_tipos(int, int)(multiplicar)
+    compilado_ret = validacao.esperar_tipo(int)(somar_inteiros)
+    validacao.definir_validacao(False)
+    desligado_args = validacao.validar_tipos(int, int)(multiplicar)
+    desligado_ret = validacao.esperar_tipo(int)(somar_inteiros)
+    assert desligado_args is multiplicar and desligado_ret is somar_inteiros
+
+    casos = [
+        ("sem decorator", "posicional", lambda: multiplicar(5, 4)),
+        ("validar_tipos (guia)", "posicional", lambda f=guia_funcoes.validar_tipos(int, int)(multiplicar): f(5, 4)),
+        ("validar_tipos compilado", "posicional", lambda: compilado_args(5, 4)),
+        ("validar_tipos compilado", "nomeado", lambda: compilado_args(5, b=4)),
+        ("validar_tipos desligado", "posicional", lambda: desligado_args(5, 4)),
+        ("sem decorator", "retorno", lambda: somar_inteiros(1, 2)),
+        ("esperar_tipo (guia)", "retorno", lambda f=guia_decorators.esperar_tipo(int)(somar_inteiros): f(1, 2)),
+        ("esperar_tipo compilado", "retorno", lambda: compilado_ret(1, 2)),
+        ("esperar_tipo desligado", "retorno", lambda: desligado_ret(1, 2)),
+    ]
+    base = {}
+    linhas = []
+    for nome, chamada, chamar in casos:
+        custo = custo_por_chamada(chamar, args.chamadas, args.repeticoes)
+        if nome == "sem decorator":
+            base[chamada] = custo
+        referencia = base.get(chamada, base["posicional"])
+        linhas.append([nome, chamada, f"{custo * 1e9:.0f}", f"{(custo - referencia) * 1e9:+.0f}"])
+
+    print("O `validar_tipos` do guia só aceita *args, por isso não há linha \"nomeado\" para ele.\n")
+    imprimir_tabela(["implementação", "chamada", "ns/chamada", "sobrecarga (ns)"], linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: funções escalares dos guias em laço x `@vetorizar`, sobre 10^6 elementos.
+
+Uso:
+    python3 -m benchmarks.bench_vetorizacao [--elementos 1000000]
+
+Para cada função, compara o laço Python que os pipelines fazem hoje
+(`[f(x) for x in dados]`) com a versão `@vetorizar` recebendo a lista
+inteira, um `array.array` e, se o NumPy estiver instalado, um `ndarray`.
+Sem NumPy, as colunas "numpy" ficam vazias e a vetorização usa os laços
+compilados.
+"""
+
+import argparse
+import array
+import random
+
+from vetorizacao import np, vetorizar
+
+from ._guias import carregar
+from ._medicao import imprimir_tabela, medir
+
+FUNCOES = ("somar", "area_circulo", "eh_maior_de_idade", "calcular_preco_final", "potencia", "calcular_volume")
+
+# Argumentos de cada função: "x" é a coluna de dados; o resto é escalar.
+CHAMADAS = {
+    "somar": ("x", 5),
+    "area_circulo": ("x",),
+    "eh_maior_de_idade": ("x",),
+    "calcular_preco_final": ("x", 0.2),
+    "potencia": ("x", 2),
+    "calcular_volume": ("x", "x", 2.0),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--elementos", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    guia = carregar("funcoes_guide.py", *FUNCOES)
+    aleatorio = random.Random(0)
+    lista = [aleatorio.uniform(0, 100) for _ in range(args.elementos)]
+    arranjo = array.array("d", lista)
+    ndarray = np.asarray(lista) if np is not None else None
+
+    linhas = []
+    for nome in FUNCOES:
+        escalar = getattr(guia, nome)
+        vetorial = vetorizar(escalar)
+        modelo = CHAMADAS[nome]
+
+        def argumentos(dados):
+            return [dados if a == "x" else a for a in modelo]
+
+        def laco():
+            if len(modelo) == 1:
+                return [escalar(x) for x in lista]
+            resto = modelo[1:]
+            if "x" in resto:
+                return [escalar(x, x, *resto[1:]) for x in lista]
+            return [escalar(x, *resto) for x in lista]
+
+        assert vetorial(*argumentos(lista)) == laco()
+        base = medir(laco, args.repeticoes)
+        em_lista = medir(lambda: vetorial(*argumentos(lista)), args.repeticoes)
+        em_array = medir(lambda: vetorial(*argumentos(arranjo)), args.repeticoes)
+        em_numpy = medir(lambda: vetorial(*argumentos(ndarray)), args.repeticoes) if np is not None else None
+        linhas.append([
+            nome,
+            "expressão" if vetorial.expressao else "map",
+            f"{base * 1e3:.0f}",
+            f"{em_lista * 1e3:.0f} ({base / em_lista:.1f}x)",
+            f"{em_array * 1e3:.0f} ({base / em_array:.1f}x)",
+            f"{em_numpy * 1e3:.1f} ({base / em_numpy:.0f}x)" if em_numpy is not None else "-",
+        ])
+
+    print(f"{args.elementos} elementos, mediana de {args.repeticoes} repetições, em ms "
+          f"(NumPy {'disponível' if np is not None else 'ausente'})\n")
+    imprimir_tabela(["função", "kernel", "laço Python", "lista", "array.array", "numpy"], linhas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark: voo único em `memoizar_concorrente` x `memoizar`.
+
+Uso:
+    python3 -m benchmarks.bench_voo_unico [--threads 32] [--chaves 8]
+
+Todas as threads esperam numa barreira e então chamam uma função lenta com as
+mesmas chaves ao mesmo tempo. O script mostra quantos cálculos cada decorator
+fez e quanto demorou. As garantias (um cálculo por chave, exceções repassadas
+a todos e fora do cache) são conferidas em `tests/test_voo_unico.py`.
+"""
+
+import argparse
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from memoizacao import memoizar, memoizar_concorrente
+
+ATRASO = 0.05
+
+
+def disparar(decorator, threads, chaves):
+    """Dispara `threads` chamadas por chave ao mesmo tempo e conta os cálculos."""
+    execucoes = Counter()
+    trava = threading.Lock()
+
+    @decorator
+    def lenta(chave):
+        with trava:
+            execucoes[chave] += 1
+        time.sleep(ATRASO)
+        return chave * 10
+
+    barreira = threading.Barrier(threads)
+
+    def chamar(chave):
+        barreira.wait()
+        return chave, lenta(chave)
+
+    pedidos = [i % chaves for i in range(threads)]
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        resultados = list(executor.map(chamar, pedidos))
+    duracao = time.perf_counter() - inicio
+
+    corretos = sum(valor == chave * 10 for chave, valor in resultados)
+    return execucoes, duracao, corretos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--chaves", type=int, default=8)
+    args = parser.parse_args()
+
+    for nome, decorator in (
+        ("memoizar (sem voo único)", memoizar),
+        ("memoizar_concorrente", memoizar_concorrente),
+    ):
+        execucoes, duracao, corretos = disparar(decorator, args.threads, args.chaves)
+        print(f"{nome}: {sum(execucoes.values())} cálculos para {args.chaves} chaves "
+              f"({args.threads} threads, {duracao * 1e3:.0f} ms, {corretos} resultados corretos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache de resultados em memória compartilhada entre processos.
+
+Com um `ProcessPoolExecutor`, cada processo trabalhador aquece sua própria
+cópia do dicionário de memoização: a memória é multiplicada pelo número de
+núcleos e cada cópia só vê os próprios acertos. `CacheCompartilhado` coloca
+uma única tabela hash em um bloco `multiprocessing.shared_memory`, que todos
+os processos anexam e que `memoizacao.memoizar` aceita como `armazenamento`.
+
+Formato do bloco:
+    - Cabeçalho: assinatura, número de slots, tamanhos máximos de chave e de
+      valor, e quantos slots estão ocupados.
+    - Slots de tamanho fixo, endereçamento aberto com sondagem linear. Cada
+      slot guarda um contador de sequência, o hash da chave, os tamanhos e os
+      bytes da chave e do valor (ambos em `pickle`).
+
+Leituras não usam trava (seqlock): o escritor deixa o contador ímpar enquanto
+grava; o leitor copia o slot e confere se o contador continuou o mesmo e par.
+Escritas são serializadas por uma `multiprocessing.Lock`. Quando todas as
+posições de sondagem estão ocupadas por outras chaves, o slot de origem é
+sobrescrito (despejo), então a tabela nunca fica cheia.
+"""
+
+import hashlib
+import pickle
+import struct
+import sys
+from multiprocessing import Lock, shared_memory
+from typing import Any, Hashable
+
+from chaves import serializar_chave
+from memoizacao import CacheInfo, memoizar
+
+_ASSINATURA = b"MCC1"
+# assinatura, slots, tamanho máximo da chave, do valor, slots ocupados
+_CABECALHO = struct.Struct("<4sIIIQ")
+# sequência, hash da chave, tamanho da chave, tamanho do valor
+_SLOT = struct.Struct("<QQII")
+
+# Quantas vezes o leitor tenta de novo quando pega um slot sendo escrito.
+TENTATIVAS_LEITURA = 4
+
+
+def _hash_estavel(dados: bytes) -> int:
+    """Hash de 64 bits igual em todos os processos (`hash()` é randomizado)."""
+    valor = int.from_bytes(hashlib.blake2b(dados, digest_size=8).digest(), "little")
+    return valor or 1  # 0 marca slot vazio.
+
+
+class CacheCompartilhado:
+    """Tabela hash de tamanho fixo em memória compartilhada.
+
+    Crie no processo principal e passe o objeto aos trabalhadores (por
+    exemplo, em `initargs` do `ProcessPoolExecutor`): ao ser desserializado,
+    ele se anexa ao mesmo bloco de memória.
+
+    Args:
+        slots (int): Número de slots; arredondado para a próxima potência de 2.
+        tam_chave (int): Tamanho máximo da chave serializada, em bytes.
+        tam_valor (int): Tamanho máximo do valor serializado, em bytes.
+            Chaves ou valores maiores simplesmente não são guardados.
+        sondagens (int): Quantos slots consecutivos uma chave pode ocupar.
+    """
+
+    def __init__(self, slots: int = 4096, tam_chave: int = 64, tam_valor: int = 256, sondagens: int = 8):
+        slots = 1 << (max(slots, 1) - 1).bit_length()
+        tamanho = _CABECALHO.size + slots * (_SLOT.size + tam_chave + tam_valor)
+        self._shm = shared_memory.SharedMemory(create=True, size=tamanho)
+        _CABECALHO.pack_into(self._shm.buf, 0, _ASSINATURA, slots, tam_chave, tam_valor, 0)
+        self._trava = Lock()
+        self._dono = True
+        self._configurar(sondagens)
+
+    def _configurar(self, sondagens: int) -> None:
+        assinatura, slots, tam_chave, tam_valor, _ = _CABECALHO.unpack_from(self._shm.buf, 0)
+        if assinatura != _ASSINATURA:
+            raise ValueError(f"O bloco {self._shm.name!r} não é um CacheCompartilhado.")
+        self.slots = slots
+        self.tam_chave = tam_chave
+        self.tam_valor = tam_valor
+        self.sondagens = min(sondagens, slots)
+        self._mascara = slots - 1
+        self._tam_slot = _SLOT.size + tam_chave + tam_valor
+        # Contadores locais a cada processo.
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.rejeitados = 0
+
+    @property
+    def nome(self) -> str:
+        return self._shm.name
+
+    # --- Serialização entre processos ----------------------------------------
+
+    def __getstate__(self):
+        return {"nome": self._shm.name, "trava": self._trava, "sondagens": self.sondagens}
+
+    def __setstate__(self, estado):
+        self._shm = shared_memory.SharedMemory(name=estado["nome"])
+        if sys.version_info < (3, 13):
+            # Antes do 3.13, anexar também registra o bloco no resource tracker,
+            # que tentaria apagá-lo de novo quando o processo trabalhador saísse.
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._trava = estado["trava"]
+        self._dono = False
+        self._configurar(estado["sondagens"])
+
+    # --- Leitura -------------------------------------------------------------
+
+    def _deslocamento(self, posicao: int) -> int:
+        return _CABECALHO.size + posicao * self._tam_slot
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        """Lê a chave sem trava; retorna `padrao` se não estiver na tabela."""
+        chave_bytes = serializar_chave(chave)
+        h = _hash_estavel(chave_bytes)
+        buf = self._shm.buf
+        for sondagem in range(self.sondagens):
+            inicio = self._deslocamento((h + sondagem) & self._mascara)
+            for _ in range(TENTATIVAS_LEITURA):
+                seq, h_slot, tam_chave, tam_valor = _SLOT.unpack_from(buf, inicio)
+                if seq & 1:
+                    continue  # Escrita em andamento: tenta de novo.
+                if h_slot == 0:
+                    self.falhas += 1
+                    return padrao  # Slot vazio encerra a sondagem.
+                if h_slot != h:
+                    break
+                dados = bytes(buf[inicio + _SLOT.size : inicio + self._tam_slot])
+                if _SLOT.unpack_from(buf, inicio)[0] != seq:
+                    continue  # O slot mudou durante a cópia.
+                if dados[:tam_chave] != chave_bytes:
+                    break
+                self.acertos += 1
+                return pickle.loads(dados[self.tam_chave : self.tam_chave + tam_valor])
+            else:
+                break  # Escritor ocupado demais: trata como falha.
+        self.falhas += 1
+        return padrao
+
+    # --- Escrita -------------------------------------------------------------
+
+    def guardar(self, chave: Hashable, valor: Any) -> None:
+        """Grava a chave; se a sondagem estiver cheia, sobrescreve o slot de origem."""
+        chave_bytes = serializar_chave(chave)
+        valor_bytes = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(chave_bytes) > self.tam_chave or len(valor_bytes) > self.tam_valor:
+            self.rejeitados += 1
+            return
+        h = _hash_estavel(chave_bytes)
+        buf = self._shm.buf
+        with self._trava:
+            alvo = None
+            for sondagem in range(self.sondagens):
+                inicio = self._deslocamento((h + sondagem) & self._mascara)
+                seq, h_slot, tam_chave, _ = _SLOT.unpack_from(buf, inicio)
+                if h_slot == 0:
+                    alvo, novo = inicio, True
+                    break
+                if h_slot == h and bytes(buf[inicio + _SLOT.size : inicio + _SLOT.size + tam_chave]) == chave_bytes:
+                    alvo, novo = inicio, False
+                    break
+            if alvo is None:
+                alvo, novo = self._deslocamento(h & self._mascara), False
+                self.despejos += 1
+
+            seq = _SLOT.unpack_from(buf, alvo)[0]
+            struct.pack_into("<Q", buf, alvo, seq + 1)  # Ímpar: leitores esperam.
+            corpo = alvo + _SLOT.size
+            buf[corpo : corpo + len(chave_bytes)] = chave_bytes
+            corpo += self.tam_chave
+            buf[corpo : corpo + len(valor_bytes)] = valor_bytes
+            _SLOT.pack_into(buf, alvo, seq + 2, h, len(chave_bytes), len(valor_bytes))
+            if novo:
+                self._somar_ocupados(1)
+
+    def _somar_ocupados(self, delta: int) -> None:
+        ocupados = _CABECALHO.unpack_from(self._shm.buf, 0)[4]
+        struct.pack_into("<Q", self._shm.buf, _CABECALHO.size - 8, ocupados + delta)
+
+    # --- Manutenção ----------------------------------------------------------
+
+    def limpar(self) -> None:
+        """Esvazia a tabela para todos os processos e zera os contadores locais."""
+        with self._trava:
+            buf = self._shm.buf
+            for posicao in range(self.slots):
+                inicio = self._deslocamento(posicao)
+                seq = _SLOT.unpack_from(buf, inicio)[0]
+                _SLOT.pack_into(buf, inicio, seq + 2 if seq % 2 == 0 else seq + 1, 0, 0, 0)
+            self._somar_ocupados(-_CABECALHO.unpack_from(buf, 0)[4])
+        self.acertos = self.falhas = self.despejos = self.rejeitados = 0
+
+    def info(self) -> CacheInfo:
+        """Acertos/falhas/despejos deste processo; tamanho e bytes da tabela inteira."""
+        ocupados = _CABECALHO.unpack_from(self._shm.buf, 0)[4]
+        return CacheInfo(self.acertos, self.falhas, self.despejos, ocupados, self.slots, self._shm.size)
+
+    def fechar(self) -> None:
+        """Desanexa este processo; o criador também apaga o bloco."""
+        self._shm.close()
+        if self._dono:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+# --- Demonstração ---------------------------------------------------------------
+# No nível do módulo: com "spawn" e "forkserver" (o padrão no macOS e no
+# Windows), os trabalhadores importam o módulo e recebem as funções por `pickle`.
+
+_funcao = None
+
+
+def _quadrado_lento(x):
+    return sum(i * i for i in range(x * 1000))
+
+
+def _iniciar(cache):
+    global _funcao
+    _funcao = memoizar(armazenamento=cache)(_quadrado_lento)
+
+
+def _calcular(x):
+    return _funcao(x)
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ProcessPoolExecutor
+
+    print("--- Cache em memória compartilhada ---")
+
+    with CacheCompartilhado(slots=1024) as cache:
+        with ProcessPoolExecutor(max_workers=2, initializer=_iniciar, initargs=(cache,)) as executor:
+            list(executor.map(_calcular, range(50)))
+        print(f"1. Depois dos trabalhadores: {cache.info().tamanho} resultados na tabela")
+        _iniciar(cache)
+        _calcular(10)
+        print(f"2. O processo principal reaproveita: {cache.info()}")
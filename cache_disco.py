@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache de memoização persistente em disco (SQLite).
+
+O dicionário do `cache` de `decorators_guide.py` vive só na memória do
+processo: a cada reinício todos os resultados são recalculados. Este módulo
+oferece um armazenamento para `memoizacao.memoizar` que sobrevive a reinícios,
+usando apenas a biblioteca padrão:
+
+- Os valores são gravados em uma tabela SQLite, serializados com `pickle`
+  (padrão) ou `json`.
+- Cada função ganha seu próprio espaço de nomes: um hash do nome qualificado
+  e do código-fonte. Mudou o código, mudou o espaço de nomes, e resultados
+  antigos deixam de ser usados.
+- Cada escrita acontece em uma transação, então um processo interrompido no
+  meio nunca deixa uma entrada pela metade.
+- O disco tem um limite de entradas; ao estourar, as menos acessadas
+  recentemente são apagadas em lote (LRU).
+- Um acerto no disco não escreve nada na hora: o novo instante de acesso
+  fica pendente e vai para o banco junto com os outros, numa transação só
+  (a cada `LOTE_ACESSOS` acertos, `INTERVALO_ACESSOS` segundos, antes de
+  uma limpeza e ao fechar).
+- Uma camada pequena em memória fica na frente do disco; um acerto nela
+  custa uma consulta a dicionário, como no `cache` do guia.
+"""
+
+import hashlib
+import inspect
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from chaves import serializar_chave
+from memoizacao import CacheInfo, memoizar
+
+_AUSENTE = object()
+
+FORMATOS = ("pickle", "json")
+
+# Fração extra apagada em cada limpeza, para não limpar a cada inserção.
+FOLGA_LIMPEZA = 0.1
+
+# Instantes de acesso pendentes: gravados ao juntar este número ou a cada
+# este intervalo (segundos), o que vier primeiro.
+LOTE_ACESSOS = 256
+INTERVALO_ACESSOS = 5.0
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS entradas (
+    namespace TEXT NOT NULL,
+    chave BLOB NOT NULL,
+    valor BLOB NOT NULL,
+    acesso REAL NOT NULL,
+    PRIMARY KEY (namespace, chave)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entradas_acesso ON entradas (namespace, acesso);
+"""
+
+
+def namespace_de(func: Callable) -> str:
+    """Retorna o espaço de nomes de `func`: hash do nome qualificado e do código."""
+    try:
+        codigo = inspect.getsource(func).encode("utf-8")
+    except (OSError, TypeError):
+        # Sem código-fonte disponível (ex: função criada com `exec`).
+        codigo = func.__code__.co_code
+    hasher = hashlib.sha256()
+    hasher.update(f"{func.__module__}.{func.__qualname__}".encode("utf-8"))
+    hasher.update(codigo)
+    return hasher.hexdigest()[:32]
+
+
+class CacheEmDisco:
+    """Armazenamento SQLite com camada em memória, compatível com `memoizar`.
+
+    Args:
+        caminho (str): Arquivo do banco SQLite (criado se não existir).
+        namespace (str): Separa as entradas de funções diferentes no mesmo arquivo.
+        maxentradas (int | None): Limite de entradas no disco para este namespace.
+        memoria (int): Tamanho da camada em memória (0 desativa).
+        formato (str): "pickle" (qualquer objeto) ou "json" (portável e legível).
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        namespace: str = "padrao",
+        maxentradas: Optional[int] = 10_000,
+        memoria: int = 128,
+        formato: str = "pickle",
+    ):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconhecido: {formato!r}. Use um de {FORMATOS}.")
+        self.caminho = caminho
+        self.namespace = namespace
+        self.maxentradas = maxentradas
+        self.memoria = memoria
+        self.formato = formato
+        if formato == "pickle":
+            self._codificar = lambda valor: pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+            self._decodificar = pickle.loads
+        else:
+            self._codificar = lambda valor: json.dumps(valor).encode("utf-8")
+            self._decodificar = json.loads
+
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        with self._conexao:
+            self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.executescript(_ESQUEMA)
+        self._total = self._contar()
+        self._acessos = {}
+        self._gravacao_acessos = time.monotonic()
+
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.despejos = 0
+        self._memoria = {}
+        self.obter = self._criar_obter()
+
+    # --- Leitura -----------------------------------------------------------
+
+    def _criar_obter(self):
+        """Monta `obter` como closure: o acerto em memória não passa por `self`.
+
+        A camada em memória não reordena entradas no acerto (despejo FIFO): o
+        acerto fica em uma única consulta ao dicionário. A ordem LRU completa
+        é mantida no disco.
+        """
+        buscar = self._memoria.get
+        ler_disco = self._ler_disco
+
+        def obter(chave: Hashable, padrao: Any = None) -> Any:
+            valor = buscar(chave, _AUSENTE)
+            if valor is _AUSENTE:
+                return ler_disco(chave, padrao)
+            self.acertos_memoria += 1
+            return valor
+
+        return obter
+
+    def _ler_disco(self, chave: Hashable, padrao: Any) -> Any:
+        chave_bytes = serializar_chave(chave)
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT valor FROM entradas WHERE namespace = ? AND chave = ?",
+                (self.namespace, chave_bytes),
+            ).fetchone()
+            if linha is None:
+                self.falhas += 1
+                return padrao
+            self._acessos[chave_bytes] = time.time()
+            if (len(self._acessos) >= LOTE_ACESSOS
+                    or time.monotonic() - self._gravacao_acessos >= INTERVALO_ACESSOS):
+                self._gravar_acessos()
+        valor = self._decodificar(linha[0])
+        self.acertos_disco += 1
+        self._guardar_em_memoria(chave, valor)
+        return valor
+
+    # --- Escrita -----------------------------------------------------------
+
+    def _gravar_acessos(self) -> None:
+        """Grava os instantes de acesso pendentes numa transação (chamado com a trava)."""
+        self._gravacao_acessos = time.monotonic()
+        if not self._acessos:
+            return
+        pendentes = [(acesso, self.namespace, chave) for chave, acesso in self._acessos.items()]
+        self._acessos.clear()
+        with self._conexao:
+            self._conexao.executemany(
+                "UPDATE entradas SET acesso = ? WHERE namespace = ? AND chave = ?", pendentes
+            )
+
+    def guardar(self, chave: Hashable, valor: Any) -> None:
+        """Grava `valor` no disco (em uma transação) e na camada em memória."""
+        # A serialização acontece fora da transação: se falhar, nada é gravado.
+        chave_bytes = serializar_chave(chave)
+        valor_bytes = self._codificar(valor)
+        with self._trava:
+            self._acessos.pop(chave_bytes, None)
+            with self._conexao:
+                # `INSERT OR REPLACE` conta 1 linha mesmo quando só substitui.
+                existia = self._conexao.execute(
+                    "SELECT 1 FROM entradas WHERE namespace = ? AND chave = ?",
+                    (self.namespace, chave_bytes),
+                ).fetchone()
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO entradas (namespace, chave, valor, acesso) "
+                    "VALUES (?, ?, ?, ?)",
+                    (self.namespace, chave_bytes, valor_bytes, time.time()),
+                )
+            if existia is None:
+                self._total += 1
+            if self.maxentradas is not None and self._total > self.maxentradas:
+                self._limpar_excesso()
+        self._guardar_em_memoria(chave, valor)
+
+    def _guardar_em_memoria(self, chave: Hashable, valor: Any) -> None:
+        if self.memoria <= 0:
+            return
+        memoria = self._memoria
+        memoria.pop(chave, None)
+        memoria[chave] = valor
+        while len(memoria) > self.memoria:
+            del memoria[next(iter(memoria))]  # O dict preserva a ordem de inserção.
+
+    def _limpar_excesso(self) -> None:
+        """Apaga as entradas acessadas há mais tempo (chamado com a trava)."""
+        # `_total` é uma estimativa local; outros processos podem ter gravado.
+        self._gravar_acessos()
+        self._total = self._contar()
+        excesso = self._total - self.maxentradas
+        if excesso <= 0:
+            return
+        quantidade = excesso + int(self.maxentradas * FOLGA_LIMPEZA)
+        with self._conexao:
+            cursor = self._conexao.execute(
+                "DELETE FROM entradas WHERE namespace = ? AND chave IN ("
+                "SELECT chave FROM entradas WHERE namespace = ? ORDER BY acesso LIMIT ?)",
+                (self.namespace, self.namespace, quantidade),
+            )
+        self.despejos += cursor.rowcount
+        self._total -= cursor.rowcount
+
+    def _contar(self) -> int:
+        return self._conexao.execute(
+            "SELECT COUNT(*) FROM entradas WHERE namespace = ?", (self.namespace,)
+        ).fetchone()[0]
+
+    # --- Manutenção --------------------------------------------------------
+
+    def limpar(self) -> None:
+        """Apaga as entradas deste namespace (memória e disco) e zera as estatísticas."""
+        with self._trava:
+            self._acessos.clear()
+            with self._conexao:
+                self._conexao.execute("DELETE FROM entradas WHERE namespace = ?", (self.namespace,))
+            self._total = 0
+        self._memoria.clear()
+        self.acertos_memoria = self.acertos_disco = self.falhas = self.despejos = 0
+
+    def info(self) -> CacheInfo:
+        """Estatísticas no formato de `memoizar`; acertos somam memória e disco."""
+        return CacheInfo(
+            self.acertos_memoria + self.acertos_disco,
+            self.falhas,
+            self.despejos,
+            self._total,
+            self.maxentradas,
+            0,
+        )
+
+    def fechar(self) -> None:
+        """Grava os acessos pendentes e fecha a conexão com o banco."""
+        with self._trava:
+            self._gravar_acessos()
+            self._conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def memoizar_em_disco(
+    caminho: str,
+    *,
+    maxentradas: Optional[int] = 10_000,
+    memoria: int = 128,
+    formato: str = "pickle",
+    congelar: bool = False,
+    ignorar: Iterable[str] = (),
+):
+    """Decorator de memoização persistente: `memoizar` com um `CacheEmDisco`.
+
+    O namespace é calculado a partir da função decorada (`namespace_de`).
+    A função decorada ganha `cache_info()`, `cache_clear()` e `armazenamento`.
+    """
+
+    def decorator(f):
+        armazenamento = CacheEmDisco(
+            caminho,
+            namespace=namespace_de(f),
+            maxentradas=maxentradas,
+            memoria=memoria,
+            formato=formato,
+        )
+        return memoizar(armazenamento=armazenamento, congelar=congelar, ignorar=ignorar)(f)
+
+    return decorator
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    print("--- Cache persistente em disco ---")
+    caminho = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+
+    def criar_funcao():
+        @memoizar_em_disco(caminho, maxentradas=100)
+        def relatorio_caro(mes, detalhado=False):
+            time.sleep(0.05)
+            return {"mes": mes, "detalhado": detalhado}
+        return relatorio_caro
+
+    relatorio_caro = criar_funcao()
+    inicio = time.perf_counter()
+    relatorio_caro(3, detalhado=True)
+    print(f"1. Primeira execução: {time.perf_counter() - inicio:.3f}s")
+
+    relatorio_caro.armazenamento.fechar()
+    relatorio_caro = criar_funcao()  # Simula um novo processo.
+    inicio = time.perf_counter()
+    relatorio_caro(3, detalhado=True)
+    print(f"2. Depois de \"reiniciar\": {time.perf_counter() - inicio:.4f}s (lido do disco)")
+    print(f"   {relatorio_caro.cache_info()}")
+    relatorio_caro.armazenamento.fechar()
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+"""
+Construção de chaves de cache para funções memoizadas.
+
+O `cache` de `decorators_guide.py` só aceita um argumento posicional `n`.
+Aqui a chamada inteira (`*args` e `**kwargs`) vira uma chave hashable:
+
+- Caminho rápido: um único argumento `int`/`str` é usado como a própria chave,
+  e argumentos apenas posicionais viram a tupla `args` sem cópia.
+- Argumentos nomeados são ordenados, então `f(a=1, b=2)` e `f(b=2, a=1)`
+  compartilham a mesma entrada.
+- `congelar=True` converte listas, dicionários e conjuntos em tuplas e
+  frozensets (com o tipo original marcado, para `[1, 2]` não colidir com `(1, 2)`).
+- `ignorar` lista parâmetros que não fazem parte da chave (ex: um logger).
+
+O construtor é especializado uma única vez, ao decorar a função, para que as
+chamadas paguem apenas pelo que foi configurado.
+"""
+
+import inspect
+import pickle
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+# Separa os posicionais dos nomeados dentro da chave (mesma ideia do `functools`).
+_MARCA_KWARGS = (object(),)
+
+# Tipos cujo valor pode ser usado diretamente como chave sem ambiguidade.
+TIPOS_RAPIDOS = {int, str}
+
+ConstrutorDeChave = Callable[[Tuple[Any, ...], Dict[str, Any]], Hashable]
+
+
+def congelar_valor(valor: Any) -> Hashable:
+    """Converte recursivamente `valor` em uma versão hashable.
+
+    Raises:
+        TypeError: Se encontrar um objeto não hashable que não sabe converter.
+    """
+    tipo = type(valor)
+    if tipo is tuple:
+        return tuple(congelar_valor(item) for item in valor)
+    if tipo is list:
+        return (list, tuple(congelar_valor(item) for item in valor))
+    if tipo is dict:
+        return (dict, frozenset((chave, congelar_valor(item)) for chave, item in valor.items()))
+    if tipo is set:
+        return (set, frozenset(congelar_valor(item) for item in valor))
+    if tipo is bytearray:
+        return (bytearray, bytes(valor))
+    hash(valor)  # Levanta TypeError para tipos não suportados.
+    return valor
+
+
+def _canonizar(valor: Any) -> Any:
+    """Ordena o conteúdo de frozensets para a chave ser a mesma entre processos.
+
+    A ordem de iteração de um frozenset de strings muda a cada processo
+    (hash randomizado), e o `pickle` grava essa ordem.
+    """
+    if type(valor) is tuple:
+        return tuple(_canonizar(item) for item in valor)
+    if type(valor) is frozenset:
+        return (frozenset, tuple(sorted((_canonizar(item) for item in valor), key=repr)))
+    return valor
+
+
+def serializar_chave(chave: Hashable) -> bytes:
+    """Converte uma chave de cache em bytes estáveis entre processos e execuções.
+
+    Usado pelos armazenamentos fora da memória do processo (disco, memória
+    compartilhada), onde a chave precisa ser comparada byte a byte.
+    """
+    return pickle.dumps(_canonizar(chave), protocol=4)
+
+
+def _chave_base(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+    if kwargs:
+        return args + _MARCA_KWARGS + tuple(sorted(kwargs.items()))
+    if len(args) == 1 and type(args[0]) in TIPOS_RAPIDOS:
+        return args[0]
+    return args
+
+
+# Construtor usado quando não há `congelar` nem `ignorar`.
+CHAVE_PADRAO = _chave_base
+
+
+def _posicoes(func: Callable, nomes: Iterable[str]) -> Dict[str, Optional[int]]:
+    """Mapeia cada nome ignorado para sua posição (ou `None` se for só nomeado)."""
+    parametros = inspect.signature(func).parameters
+    posicoes = {}
+    for nome in nomes:
+        if nome not in parametros:
+            raise ValueError(f"'{func.__qualname__}' não tem o parâmetro {nome!r}.")
+        parametro = parametros[nome]
+        if parametro.kind in (parametro.VAR_POSITIONAL, parametro.VAR_KEYWORD):
+            raise ValueError(f"Não é possível ignorar {nome!r}: use nomes de parâmetros simples.")
+        if parametro.kind == parametro.KEYWORD_ONLY:
+            posicoes[nome] = None
+        else:
+            posicoes[nome] = list(parametros).index(nome)
+    return posicoes
+
+
+def criar_construtor_de_chave(
+    func: Optional[Callable] = None,
+    *,
+    congelar: bool = False,
+    ignorar: Iterable[str] = (),
+) -> ConstrutorDeChave:
+    """Cria uma função `construir(args, kwargs) -> chave` especializada.
+
+    Args:
+        func (Callable | None): A função memoizada; obrigatória quando `ignorar`
+            é usado, para descobrir a posição de cada parâmetro.
+        congelar (bool): Se True, argumentos não hashable são congelados com
+            `congelar_valor()` em vez de causar `TypeError`.
+        ignorar (Iterable[str]): Nomes de parâmetros fora da chave.
+
+    Returns:
+        ConstrutorDeChave: A função que monta a chave de cada chamada.
+    """
+    ignorar = tuple(ignorar)
+    if not ignorar and not congelar:
+        return CHAVE_PADRAO
+
+    construir = _chave_base
+
+    if congelar:
+        def construir_congelando(args, kwargs, _base=construir):
+            chave = _base(args, kwargs)
+            try:
+                hash(chave)
+            except TypeError:
+                args = tuple(congelar_valor(arg) for arg in args)
+                kwargs = {nome: congelar_valor(valor) for nome, valor in kwargs.items()}
+                chave = _base(args, kwargs)
+            return chave
+
+        construir = construir_congelando
+
+    if ignorar:
+        if func is None:
+            raise ValueError("`ignorar` exige a função, para mapear os nomes dos parâmetros.")
+        posicoes = _posicoes(func, ignorar)
+        indices = frozenset(i for i in posicoes.values() if i is not None)
+        nomes = frozenset(posicoes)
+
+        def construir_ignorando(args, kwargs, _base=construir):
+            if indices:
+                args = tuple([arg for i, arg in enumerate(args) if i not in indices])
+            if kwargs and not nomes.isdisjoint(kwargs):
+                kwargs = {nome: valor for nome, valor in kwargs.items() if nome not in nomes}
+            return _base(args, kwargs)
+
+        construir = construir_ignorando
+
+    return construir
+
+
+if __name__ == "__main__":
+    print("--- Construção de chaves ---")
+    construir = criar_construtor_de_chave()
+    print(f"1. f(5) -> {construir((5,), {})!r}")
+    print(f"2. f(5, 4) -> {construir((5, 4), {})!r}")
+    print(f"3. f(b=2, a=1) == f(a=1, b=2)? "
+          f"{construir((), {'b': 2, 'a': 1}) == construir((), {'a': 1, 'b': 2})}")
+
+    construir = criar_construtor_de_chave(congelar=True)
+    print(f"4. Congelando f([1, 2], {{'x': 1}}) -> {construir(([1, 2], {'x': 1}), {})!r}")
+
+    def relatorio(dados, logger=None):
+        return dados
+
+    construir = criar_construtor_de_chave(relatorio, ignorar=["logger"])
+    print(f"5. Ignorando `logger`: {construir(('vendas', print), {})!r}")
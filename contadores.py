@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+Contadores de chamadas sem disputa entre threads.
+
+O `ContadorDeChamadas` de `decorators_guide.py` faz `self.num_chamadas += 1`
+e imprime a cada chamada. Com várias threads o `+=` perde incrementos (ler,
+somar e gravar não é uma operação atômica), e o `print` deixa tudo lento.
+
+Esta versão:
+    - mantém um contador por thread (cada thread só escreve no seu), somados
+      apenas na leitura, sem trava no caminho quente;
+    - separa sucessos de erros e calcula quantas chamadas estão em andamento;
+    - não imprime nada; `instantaneo()` devolve os números de uma vez, barato
+      o suficiente para ser chamado por um coletor de métricas.
+"""
+
+import threading
+import types
+from collections import namedtuple
+from functools import update_wrapper
+from typing import Callable
+
+Instantaneo = namedtuple("Instantaneo", ["chamadas", "sucessos", "erros", "em_andamento"])
+
+# Posições na lista de cada thread.
+_ENTRADAS, _SUCESSOS, _ERROS = 0, 1, 2
+
+
+class ContadorDeChamadas:
+    """Decorator de classe que conta chamadas, sucessos, erros e concorrência.
+
+    Exemplo:
+        @ContadorDeChamadas
+        def consultar(id_usuario): ...
+
+        consultar.instantaneo()  # Instantaneo(chamadas=..., sucessos=..., ...)
+    """
+
+    def __init__(self, func: Callable):
+        update_wrapper(self, func)
+        self.func = func
+        self._local = threading.local()
+        self._fatias = []
+        self._trava = threading.Lock()
+
+    def _nova_fatia(self) -> list:
+        fatia = self._local.fatia = [0, 0, 0]
+        with self._trava:
+            self._fatias.append(fatia)
+        return fatia
+
+    def __call__(self, *args, **kwargs):
+        try:
+            fatia = self._local.fatia
+        except AttributeError:
+            fatia = self._nova_fatia()
+        fatia[_ENTRADAS] += 1
+        try:
+            resultado = self.func(*args, **kwargs)
+        except BaseException:
+            fatia[_ERROS] += 1
+            raise
+        fatia[_SUCESSOS] += 1
+        return resultado
+
+    def __get__(self, instancia, dono=None):
+        # Permite decorar métodos: `obj.metodo` vira um método ligado ao contador.
+        if instancia is None:
+            return self
+        return types.MethodType(self, instancia)
+
+    def instantaneo(self) -> Instantaneo:
+        """Soma os contadores de todas as threads.
+
+        Os valores de cada thread são lidos sem trava, então uma chamada que
+        termina durante a leitura pode aparecer como "em andamento".
+        """
+        with self._trava:
+            fatias = list(self._fatias)
+        entradas = sucessos = erros = 0
+        for fatia in fatias:
+            entradas += fatia[_ENTRADAS]
+            sucessos += fatia[_SUCESSOS]
+            erros += fatia[_ERROS]
+        return Instantaneo(entradas, sucessos, erros, max(entradas - sucessos - erros, 0))
+
+    @property
+    def num_chamadas(self) -> int:
+        """Total de chamadas (mesmo nome do atributo do guia)."""
+        return self.instantaneo().chamadas
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("--- Contadores de chamadas ---")
+
+    @ContadorDeChamadas
+    def dividir(a, b):
+        return a / b
+
+    dividir(10, 2)
+    try:
+        dividir(1, 0)
+    except ZeroDivisionError:
+        pass
+    print(f"1. Sucessos e erros separados: {dividir.instantaneo()}")
+
+    @ContadorDeChamadas
+    def funcao_contada():
+        pass
+
+    def chamar_muitas_vezes(_):
+        for _ in range(10_000):
+            funcao_contada()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(chamar_muitas_vezes, range(8)))
+    print(f"2. 8 threads x 10000 chamadas: {funcao_contada.num_chamadas} contadas")
@@ -96,6 +96,7 @@ pares = list(filter(lambda x: x % 2 == 0, numeros))
 print(f"2. `filter` como função de ordem superior: {pares}")
 
 # 3. Criando nossa própria função de ordem superior
+# (Para milhões de itens, em blocos paralelos, veja `mapa_paralelo.aplicar_operacao`.)
 def aplicar_operacao(lista, operacao):
     return [operacao(item) for item in lista]
 
@@ -103,6 +104,7 @@ dobrados = aplicar_operacao([1, 2, 3], lambda x: x * 2)
 print(f"3. Nossa HOF para dobrar números: {dobrados}")
 
 # 4. Função que retorna uma função (Factory Function)
+# (Para filtrar listas grandes, veja os predicados compilados de `predicados.py`.)
 def criar_verificador_de_limite(limite):
     def verificador(valor):
         return valor < limite
@@ -427,6 +429,7 @@ def saudar_repetido(nome):
 saudar_repetido("Equipe")
 
 # 2. Decorator para adicionar um prefixo de log
+# (Sem `print` no caminho quente: `log_em_fila.log_com_prefixo` e `log_em_fila.meu_log`.)
 def log_com_prefixo(prefixo):
     def decorator(func):
         @wraps(func)
@@ -442,6 +445,7 @@ def operacao_importante():
 operacao_importante()
 
 # 3. Decorator para verificar tipo de retorno
+# (Versão compilada, desligável sem custo: `validacao.esperar_tipo`.)
 def esperar_tipo(tipo_esperado):
     def decorator(func):
         @wraps(func)
@@ -475,6 +479,7 @@ def funcao_log_padrao(): pass
 funcao_log_padrao()
 
 # 5. Decorator para atrasar a execução
+# (`time.sleep` bloqueia quem chamou; `agendador.atrasar` agenda e retorna na hora.)
 def atrasar(segundos):
     def decorator(func):
         @wraps(func)
@@ -521,6 +526,7 @@ funcao_contada()
 funcao_contada()
 
 # 2. Decorator de classe com argumentos
+# (Para limitar chamadas por período de tempo, veja `limite_taxa.LimiteDeChamadas`.)
 class LimiteDeChamadas:
     def __init__(self, limite):
         self.limite = limite
@@ -557,6 +563,7 @@ class UltimoResultado:
         self.ultimo_resultado = resultado
         return resultado
 
+# (Chamada um item por vez de muitas threads? `lotes.lote` junta as chamadas em lotes.)
 @UltimoResultado
 def calcula_algo(x):
     return x * 10
@@ -568,6 +575,7 @@ calcula_algo(10)
 print(f"   Último resultado agora: {calcula_algo.ultimo_resultado}")
 
 # 4. Decorator de classe para singleton (padrão de projeto)
+# (Sem trava, threads simultâneas podem criar várias instâncias; ver `recursos.Singleton` e `recursos.PoolDeConexoes`.)
 class Singleton:
     def __init__(self, cls):
         self._cls = cls
@@ -596,6 +604,7 @@ class AdicionarAtributo:
         setattr(func, self.nome_attr, self.valor_attr)
         return func
 
+# (Para achar handlers por rota e versão sem varrer todos, veja `rotas.Registro`.)
 @AdicionarAtributo("versao", "1.0")
 def minha_api():
     pass
@@ -610,6 +619,8 @@ print("-" * 20 + "\n")
 print("--- 10. Casos de Uso Práticos e Avançados (5 Exemplos) ---")
 
 # 1. Decorator de `timing` para medir performance
+# (Um `print` por chamada não escala; `latencias.cronometrar` agrega em histogramas.)
+# (Para ver onde o tempo vai dentro da função, veja `perfilamento.perfilar`.)
 def cronometrar(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -626,6 +637,8 @@ def processamento_demorado():
 processamento_demorado()
 
 # 2. Decorator de `cache` (memoization) para otimizar chamadas repetidas
+# Atenção: este dicionário cresce para sempre. Para uso real, veja `memoizacao.memoizar`,
+# que limita o número de entradas/bytes e expõe `cache_info()`.
 def cache(func):
     cache_resultados = {}
     @wraps(func)
@@ -636,6 +649,7 @@ def cache(func):
         return cache_resultados[n]
     return wrapper
 
+# (Recursivo: estoura o limite de recursão perto de n=500; veja `sequencias.fibonacci`.)
 @cache
 def fibonacci(n):
     if n < 2: return n
@@ -646,6 +660,7 @@ fibonacci(10)
 fibonacci(10) # Esta chamada será instantânea
 
 # 3. Decorator para controle de acesso (ex: verificar se usuário está logado)
+# (Com uma consulta de sessão de verdade, veja `autorizacao.Autorizador`: decisões em cache e consultas em lote.)
 def login_necessario(func):
     @wraps(func)
     def wrapper(usuario, *args, **kwargs):
@@ -669,6 +684,7 @@ except PermissionError as e:
     print(f"   {e}")
 
 # 4. Decorator para registrar informações de debug
+# (Em produção, `rastreamento.rastrear` guarda as chamadas em um buffer e só formata ao despejar.)
 def debug_info(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -685,6 +701,7 @@ multiplicar_debug(3, 4)
 
 # 5. Empilhando decorators
 # Os decorators são aplicados de baixo para cima.
+# (Para juntar a pilha em um único wrapper, veja `fusao.fundir`.)
 @cronometrar
 @debug_info
 def funcao_empilhada(x):
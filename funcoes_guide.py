@@ -178,6 +178,7 @@ def processar_dados(lista_dados):
 print(f"9. {processar_dados([])}")
 
 # 10. Retornando o resultado de uma expressão diretamente
+# (Para aplicar a milhões de valores de uma vez, veja `vetorizacao.vetorizar`.)
 def area_circulo(raio):
     return 3.14159 * (raio ** 2)
 print(f"10. Área do círculo: {area_circulo(10):.2f}")
@@ -282,6 +283,7 @@ criar_usuario("Eva", "eva@example.com")
 criar_usuario("Frank", "frank@example.com", admin=True)
 
 # 5. Função de log com nível de severidade padrão
+# (Sob carga, `print` trava quem chama; `log_em_fila.log` só enfileira.)
 def log(mensagem, nivel="INFO"):
     print(f"5. [{nivel}] - {mensagem}")
 log("Serviço iniciado.")
@@ -695,6 +697,7 @@ pontos_2d = [(1, 9), (4, 3), (2, 7)]
 print(f"9. Ordenando pelo segundo elemento da tupla: {sorted(pontos_2d, key=lambda p: p[1])}")
 
 # 10. Lambda como valor padrão de argumento (uso raro, mas possível)
+# (Versão em blocos paralelos, para milhões de itens: `mapa_paralelo.processar`.)
 def processar(dados, func=lambda x: x):
     return [func(d) for d in dados]
 print(f"10. Lambda como valor padrão: {processar([1, 2, 3], func=lambda x: x * 10)}")
@@ -727,6 +730,7 @@ def ler_linhas(caminho_arquivo):
 print("2. (Exemplo de leitura de arquivo com gerador)")
 
 # 3. Gerador da sequência de Fibonacci
+# (Para começar de qualquer índice, veja `sequencias.fibonacci_gen`.)
 def fibonacci_gen(limite):
     a, b = 0, 1
     while a < limite:
@@ -827,6 +831,7 @@ def somar_decorado(a, b):
 somar_decorado(5, 3)
 
 # 3. Decorator para medir tempo de execução
+# (Para medir sob carga, sem um `print` por chamada: `latencias.cronometrar`.)
 def timer_decorator(func):
     def wrapper(*args, **kwargs):
         inicio = time.time()
@@ -887,6 +892,7 @@ alguma_funcao()
 alguma_funcao()
 
 # 7. Decorator para cache simples (memoization)
+# (Versão com limites de memória e estatísticas: `memoizacao.memoizar`.)
 def cache_decorator(func):
     cache = {}
     @wraps(func)
@@ -897,6 +903,7 @@ def cache_decorator(func):
         return cache[n]
     return wrapper
 
+# (Sem recursão e em O(log n): `sequencias.fibonacci`.)
 @cache_decorator
 def fibonacci(n):
     if n < 2: return n
@@ -906,6 +913,7 @@ fibonacci(5)
 fibonacci(5) # Não vai imprimir "Calculando..."
 
 # 8. Empilhando decorators
+# (Cada camada é mais um frame por chamada; `fusao.fundir` gera um wrapper só.)
 @timer_decorator
 @log_decorator # Este é executado primeiro (de dentro para fora)
 def funcao_empilhada(a, b):
@@ -929,6 +937,7 @@ print(f"9. Contador 1: {contador1()}, {contador1()}")
 print(f"   Contador 2: {contador2()}")
 
 # 10. Decorator para validar tipos de entrada
+# (Versão compilada, com argumentos nomeados: `validacao.validar_tipos`.)
 def validar_tipos(*tipos):
     def decorator(func):
         @wraps(func)
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fusão de decorators empilhados em um único wrapper.
+
+Em `funcao_empilhada` (nos dois guias) cada decorator da pilha acrescenta um
+frame Python, um empacotamento e desempacotamento de `*args`/`**kwargs` e
+uma cópia de metadados com `wraps`. Com quatro ou cinco camadas, isso custa
+mais do que muitas das funções decoradas.
+
+Aqui cada camada é descrita como um `Aspecto`, com ganchos:
+    - `antes(func, args, kwargs)`: roda antes da chamada; o valor que ele
+      retorna é o `estado` recebido por `finalmente`;
+    - `depois(func, args, kwargs, resultado)`: roda após um retorno normal;
+    - `erro(func, args, kwargs, exc)`: roda quando a chamada levanta (a
+      exceção continua se propagando);
+    - `ao_redor(func, args, kwargs)`: um gerador com um único `yield`, como
+      um `contextlib.contextmanager`: o trecho antes do `yield` roda antes
+      da chamada e o depois, no final (a exceção é lançada no `yield`);
+    - `finalmente(func, args, kwargs, estado)`: roda sempre no final, como
+      um `finally`. O par `antes` + `finalmente` cobre o caso comum de
+      "ao redor" (ex: cronometrar) sem o custo de criar um gerador.
+
+`fundir(*aspectos)` gera o código-fonte de um único wrapper que executa
+todos os ganchos em sequência, com a mesma ordem e o mesmo tratamento de
+exceções da pilha equivalente de decorators, empacotando os argumentos uma
+só vez. Aplicar um aspecto sobre uma função já fundida refaz a fusão, então
+`@a @b @c def f` também resulta em um wrapper só.
+"""
+
+import weakref
+from functools import wraps
+from typing import Callable, Optional
+
+# Limite de blocos aninhados por função gerada (o CPython aceita 20).
+_MAX_BLOCOS = 16
+
+# Os wrappers gerados por `fundir`. Um decorator comum com `wraps` copia
+# `__aspectos__` e `__wrapped__` para o próprio wrapper, então os atributos
+# não bastam para saber se uma função foi fundida aqui: vale a identidade.
+_FUNDIDOS = weakref.WeakSet()
+
+
+class Aspecto:
+    """Uma camada de decorator descrita por ganchos.
+
+    Uma instância também funciona como decorator: `@aspecto`.
+
+    Args:
+        antes, depois, erro, ao_redor, finalmente (Callable | None): Os
+            ganchos; veja o docstring do módulo para as assinaturas.
+        nome (str | None): Nome para depuração.
+    """
+
+    __slots__ = ("antes", "depois", "erro", "ao_redor", "finalmente", "nome")
+
+    def __init__(
+        self,
+        antes: Optional[Callable] = None,
+        depois: Optional[Callable] = None,
+        erro: Optional[Callable] = None,
+        ao_redor: Optional[Callable] = None,
+        finalmente: Optional[Callable] = None,
+        nome: Optional[str] = None,
+    ):
+        self.antes = antes
+        self.depois = depois
+        self.erro = erro
+        self.ao_redor = ao_redor
+        self.finalmente = finalmente
+        self.nome = nome or "aspecto"
+
+    def __call__(self, func: Callable) -> Callable:
+        return fundir(self)(func)
+
+    def __repr__(self):
+        return f"<Aspecto {self.nome}>"
+
+
+def _sair_com_erro(gerador, exc: BaseException) -> None:
+    """Lança `exc` no `yield`. Se o gerador terminar sem relançar, a exceção
+    original segue mesmo assim: aspectos não podem suprimi-la."""
+    try:
+        gerador.throw(exc)
+    except StopIteration:
+        return
+    except BaseException as outra:
+        if outra is exc:
+            return
+        raise
+    raise RuntimeError("O gancho `ao_redor` deve ter um único `yield`.")
+
+
+def _gerar_codigo(aspectos, namespace) -> str:
+    linhas = ["def fundido(*args, **kwargs):"]
+    fechamentos = []
+    nivel = 1
+    for i, aspecto in enumerate(aspectos):
+        recuo = "    " * nivel
+        for gancho in ("antes", "depois", "erro", "ao_redor", "finalmente"):
+            if getattr(aspecto, gancho) is not None:
+                namespace[f"{gancho}{i}"] = getattr(aspecto, gancho)
+        if aspecto.antes is not None:
+            destino = f"estado{i} = " if aspecto.finalmente is not None else ""
+            linhas.append(f"{recuo}{destino}antes{i}(func, args, kwargs)")
+        elif aspecto.finalmente is not None:
+            linhas.append(f"{recuo}estado{i} = None")
+        if aspecto.ao_redor is not None:
+            linhas.append(f"{recuo}g{i} = ao_redor{i}(func, args, kwargs)")
+            linhas.append(f"{recuo}next(g{i})")
+        if _blocos(aspecto):
+            linhas.append(f"{recuo}try:")
+            nivel += 1
+        fechamentos.append((i, aspecto, recuo))
+
+    linhas.append(f"{'    ' * nivel}resultado = func(*args, **kwargs)")
+    for i, aspecto, recuo in reversed(fechamentos):
+        sucesso = []
+        if aspecto.depois is not None:
+            sucesso.append(f"depois{i}(func, args, kwargs, resultado)")
+        if aspecto.ao_redor is not None:
+            sucesso.append(f"next(g{i}, None)")
+        protegido = aspecto.ao_redor is not None or aspecto.erro is not None
+        if protegido:
+            linhas.append(f"{recuo}except BaseException as exc:")
+            if aspecto.erro is not None:
+                linhas.append(f"{recuo}    erro{i}(func, args, kwargs, exc)")
+            if aspecto.ao_redor is not None:
+                linhas.append(f"{recuo}    _sair_com_erro(g{i}, exc)")
+            linhas.append(f"{recuo}    raise")
+            if sucesso and aspecto.finalmente is not None:
+                linhas.append(f"{recuo}else:")
+                linhas += [f"{recuo}    {linha}" for linha in sucesso]
+                sucesso = []
+        elif aspecto.finalmente is not None:
+            # `try/finally` sem `except`: o caminho de sucesso fica dentro do `try`.
+            linhas += [f"{recuo}    {linha}" for linha in sucesso]
+            sucesso = []
+        if aspecto.finalmente is not None:
+            linhas.append(f"{recuo}finally:")
+            linhas.append(f"{recuo}    finalmente{i}(func, args, kwargs, estado{i})")
+        linhas += [f"{recuo}{linha}" for linha in sucesso]
+    linhas.append("    return resultado")
+    return "\n".join(linhas) + "\n"
+
+
+def _blocos(aspecto: Aspecto) -> int:
+    """Quantos blocos o aspecto aninha na função gerada (`except` e `finally` contam um cada)."""
+    return int(aspecto.ao_redor is not None or aspecto.erro is not None) + int(aspecto.finalmente is not None)
+
+
+def _fundir_grupo(func: Callable, aspectos) -> Callable:
+    namespace = {"func": func, "_sair_com_erro": _sair_com_erro}
+    fonte = _gerar_codigo(aspectos, namespace)
+    exec(compile(fonte, f"<fusão de {getattr(func, '__qualname__', func)}>", "exec"), namespace)
+    fundido = namespace["fundido"]
+    fundido.fonte_fusao = fonte
+    return fundido
+
+
+def fundir(*aspectos: Aspecto) -> Callable[[Callable], Callable]:
+    """Decorator que aplica `aspectos` (o primeiro é o mais externo) em um só wrapper.
+
+    Equivale a empilhar `@aspectos[0] @aspectos[1] ... def func`, mas com um
+    único frame extra. Se `func` for um wrapper gerado por `fundir`, os
+    aspectos novos entram por fora dos existentes e tudo é fundido de novo.
+    Qualquer outra função (inclusive o wrapper de um decorator comum sobre
+    uma função fundida) é tratada como uma caixa-preta.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        todos = list(aspectos)
+        original = func
+        if func in _FUNDIDOS:
+            todos += func.__aspectos__
+            original = func.__wrapped__
+        if not todos:
+            return original
+
+        # Funções geradas não podem aninhar blocos `try` sem limite; pilhas
+        # enormes viram alguns wrappers fundidos, um dentro do outro.
+        grupos, atual, blocos = [], [], 0
+        for aspecto in todos:
+            custo = _blocos(aspecto)
+            if blocos + custo > _MAX_BLOCOS:
+                grupos.append(atual)
+                atual, blocos = [], 0
+            atual.append(aspecto)
+            blocos += custo
+        grupos.append(atual)
+        alvo = original
+        for grupo in reversed(grupos):
+            alvo = _fundir_grupo(alvo, grupo)
+
+        wrapper = wraps(original)(alvo)
+        wrapper.__aspectos__ = todos
+        _FUNDIDOS.add(wrapper)
+        return wrapper
+
+    return decorator
+
+
+if __name__ == "__main__":
+    import time
+
+    print("--- Fusão de decorators ---")
+
+    def registrar_chamada(func, args, kwargs):
+        print(f"   [LOG] Chamando '{func.__name__}' com {args}")
+
+    def iniciar_cronometro(func, args, kwargs):
+        return time.perf_counter()
+
+    def parar_cronometro(func, args, kwargs, inicio):
+        print(f"   [TIMER] '{func.__name__}' levou {time.perf_counter() - inicio:.6f}s")
+
+    log = Aspecto(antes=registrar_chamada, nome="log")
+    timer = Aspecto(antes=iniciar_cronometro, finalmente=parar_cronometro, nome="timer")
+
+    @timer
+    @log
+    def funcao_empilhada(a, b):
+        return a + b
+
+    print(f"1. Dois aspectos empilhados, um wrapper: {funcao_empilhada.__aspectos__}")
+    print(f"   Resultado: {funcao_empilhada(10, 20)}")
+    print("2. Código gerado:")
+    print("   " + funcao_empilhada.fonte_fusao.replace("\n", "\n   ").rstrip())
+
+    @fundir(timer, Aspecto(erro=lambda func, args, kwargs, exc: print(f"   [ERRO] {exc!r}")))
+    def dividir(a, b):
+        return a / b
+
+    try:
+        dividir(1, 0)
+    except ZeroDivisionError:
+        print("3. A exceção passou pelos ganchos e continuou se propagando.")
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+
+"""
+Medição de latência com histogramas, em vez de um `print` por chamada.
+
+`cronometrar` em `decorators_guide.py` e `timer_decorator` em `funcoes_guide.py`
+imprimem uma linha a cada chamada: formatação e E/S no caminho quente, e uma
+saída ilegível sob carga. Aqui cada chamada só incrementa um contador em um
+histograma log-linear (no estilo HDR), e os percentis são calculados quando
+alguém pede:
+
+- `Histograma`: baldes exatos até 64 ns e, acima disso, 32 baldes por
+  potência de 2 (erro relativo de no máximo ~3%).
+- `SerieDeLatencias`: um histograma por thread (sem travas no registro),
+  somados na leitura.
+- `RegistroDeLatencias`: guarda as séries por nome e gera relatórios com
+  contagem, p50/p90/p99/p999 e máximo, sob demanda ou periodicamente.
+- `cronometrar`: o decorator, que registra em `REGISTRO` por padrão e pode
+  medir só uma amostra das chamadas (`amostragem`/`taxa`), extrapolando as
+  contagens.
+"""
+
+import threading
+import time
+import weakref
+from collections import namedtuple
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+# Com 5 bits, cada potência de 2 é dividida em 32 baldes lineares.
+BITS_SUB = 5
+SUB_BALDES = 1 << BITS_SUB
+# Suficiente para qualquer duração em ns que caiba em 64 bits.
+NUM_BALDES = (64 - BITS_SUB + 1) * SUB_BALDES
+
+PERCENTIS = (50, 90, 99, 99.9)
+
+Resumo = namedtuple("Resumo", ["contagem", "p50", "p90", "p99", "p999", "maximo", "media"])
+
+
+def indice_do_balde(valor: int) -> int:
+    """Retorna o balde de `valor` (inteiro não negativo)."""
+    deslocamento = valor.bit_length() - BITS_SUB - 1
+    if deslocamento <= 0:
+        return valor
+    return (deslocamento << BITS_SUB) + (valor >> deslocamento)
+
+
+def limite_inferior(indice: int) -> int:
+    """Menor valor que cai no balde `indice`."""
+    deslocamento = (indice >> BITS_SUB) - 1
+    if deslocamento <= 0:
+        return indice
+    return (indice - (deslocamento << BITS_SUB)) << deslocamento
+
+
+class Histograma:
+    """Histograma log-linear de inteiros (durações em nanossegundos)."""
+
+    __slots__ = ("contagens", "soma", "maximo")
+
+    def __init__(self):
+        self.contagens = [0] * NUM_BALDES
+        self.soma = 0
+        self.maximo = 0
+
+    def registrar(self, valor: int, peso: int = 1) -> None:
+        self.contagens[indice_do_balde(valor)] += peso
+        self.soma += valor * peso
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def mesclar(self, outro: "Histograma") -> None:
+        """Soma as contagens de `outro` neste histograma."""
+        self.contagens = [a + b for a, b in zip(self.contagens, outro.contagens)]
+        self.soma += outro.soma
+        self.maximo = max(self.maximo, outro.maximo)
+
+    @property
+    def contagem(self) -> int:
+        return sum(self.contagens)
+
+    def percentis(self, percentis=PERCENTIS) -> List[int]:
+        """Valores aproximados dos percentis pedidos (em ordem crescente)."""
+        total = self.contagem
+        if total == 0:
+            return [0] * len(percentis)
+        alvos = [max(1, -(-total * p // 100)) for p in percentis]
+        resultado = []
+        acumulado = 0
+        proximo = 0
+        for indice, quantidade in enumerate(self.contagens):
+            if not quantidade:
+                continue
+            acumulado += quantidade
+            while proximo < len(alvos) and acumulado >= alvos[proximo]:
+                # Ponto médio do balde, sem passar do máximo observado.
+                inferior = limite_inferior(indice)
+                superior = limite_inferior(indice + 1)
+                resultado.append(min((inferior + superior) // 2, self.maximo))
+                proximo += 1
+            if proximo == len(alvos):
+                break
+        return resultado
+
+    def resumo(self) -> Resumo:
+        total = self.contagem
+        p50, p90, p99, p999 = self.percentis()
+        media = self.soma / total if total else 0.0
+        return Resumo(total, p50, p90, p99, p999, self.maximo, media)
+
+
+class SerieDeLatencias:
+    """Latências de uma função, com um histograma por thread.
+
+    Cada thread só escreve no próprio histograma, então o registro não precisa
+    de trava. A leitura soma todos eles (e pode não ver as últimas chamadas em
+    andamento, o que é aceitável para métricas).
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self._local = threading.local()
+        self._histogramas = []
+        self._trava = threading.Lock()
+
+    def histograma_local(self) -> Histograma:
+        """Histograma da thread atual (criado no primeiro uso)."""
+        try:
+            return self._local.histograma
+        except AttributeError:
+            histograma = self._local.histograma = Histograma()
+            with self._trava:
+                self._histogramas.append(histograma)
+            return histograma
+
+    def registrar(self, nanossegundos: int) -> None:
+        self.histograma_local().registrar(nanossegundos)
+
+    def histograma(self) -> Histograma:
+        """Soma dos histogramas de todas as threads."""
+        total = Histograma()
+        with self._trava:
+            histogramas = list(self._histogramas)
+        for histograma in histogramas:
+            total.mesclar(histograma)
+        return total
+
+    def zerar(self) -> None:
+        """Descarta as medições já feitas.
+
+        Um registro concorrente com o `zerar` pode se perder, o que é aceitável
+        para métricas e evita travas no caminho quente.
+        """
+        with self._trava:
+            for histograma in self._histogramas:
+                histograma.contagens = [0] * NUM_BALDES
+                histograma.soma = 0
+                histograma.maximo = 0
+
+
+class RegistroDeLatencias:
+    """Conjunto de séries de latência, identificadas por nome."""
+
+    def __init__(self):
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def serie(self, nome: str) -> SerieDeLatencias:
+        """Retorna a série `nome`, criando-a se necessário."""
+        serie = self._series.get(nome)
+        if serie is None:
+            with self._trava:
+                serie = self._series.setdefault(nome, SerieDeLatencias(nome))
+        return serie
+
+    def relatorio(self) -> Dict[str, Resumo]:
+        """Resumo (em ns) de cada série com pelo menos uma medição."""
+        with self._trava:
+            series = list(self._series.values())
+        relatorio = {}
+        for serie in series:
+            resumo = serie.histograma().resumo()
+            if resumo.contagem:
+                relatorio[serie.nome] = resumo
+        return relatorio
+
+    def formatar(self) -> str:
+        """Relatório em texto, com os tempos em microssegundos."""
+        linhas = [f"{'função':<40} {'n':>10} {'p50':>9} {'p90':>9} {'p99':>9} {'p999':>9} {'máx':>9}  (µs)"]
+        for nome, r in sorted(self.relatorio().items()):
+            valores = " ".join(f"{v / 1000:>9.1f}" for v in (r.p50, r.p90, r.p99, r.p999, r.maximo))
+            linhas.append(f"{nome:<40} {r.contagem:>10} {valores}")
+        return "\n".join(linhas)
+
+    def zerar(self) -> None:
+        """Zera todas as séries."""
+        with self._trava:
+            series = list(self._series.values())
+        for serie in series:
+            serie.zerar()
+
+    def iniciar_relatorio_periodico(
+        self, intervalo: float, destino: Callable[[str], None] = print, zerar: bool = False
+    ) -> "RelatorioPeriodico":
+        """Envia `formatar()` para `destino` a cada `intervalo` segundos, em segundo plano."""
+        relatorio = RelatorioPeriodico(self, intervalo, destino, zerar)
+        relatorio.start()
+        return relatorio
+
+
+class RelatorioPeriodico(threading.Thread):
+    """Thread (daemon) que publica o relatório de um registro periodicamente."""
+
+    def __init__(self, registro: RegistroDeLatencias, intervalo: float, destino, zerar: bool):
+        super().__init__(name="relatorio-latencias", daemon=True)
+        self.registro = registro
+        self.intervalo = intervalo
+        self.destino = destino
+        self.zerar = zerar
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            self.destino(self.registro.formatar())
+            if self.zerar:
+                self.registro.zerar()
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
+
+
+# Registro usado por `cronometrar` quando nenhum outro é informado.
+REGISTRO = RegistroDeLatencias()
+
+# Controles de todas as funções cronometradas, para ligar/desligar em bloco.
+_CONTROLES = weakref.WeakSet()
+
+
+class Amostragem:
+    """Controle de amostragem de uma função cronometrada.
+
+    Pode ser alterado a qualquer momento, sem decorar de novo: a função
+    decorada o expõe em `funcao.amostragem`.
+
+    Cada amostra é registrada com peso igual ao número de chamadas que ela
+    representa, então as contagens do histograma são extrapoladas para o
+    total de chamadas.
+
+    Args:
+        periodo (int): Mede 1 a cada `periodo` chamadas (1 = todas).
+        taxa (float | None): Alvo de amostras por segundo. Quando definida, o
+            `periodo` é recalculado a cada amostra a partir do ritmo de chamadas.
+        ativa (bool): Se False, a função é chamada direto, sem medição.
+    """
+
+    __slots__ = ("ativa", "periodo", "taxa", "restantes", "peso", "ultima_amostra", "__weakref__")
+
+    def __init__(self, periodo: int = 1, taxa: Optional[float] = None, ativa: bool = True):
+        if periodo < 1:
+            raise ValueError("`periodo` deve ser pelo menos 1.")
+        if taxa is not None and taxa <= 0:
+            raise ValueError("`taxa` deve ser positiva.")
+        self.ativa = ativa
+        self.periodo = periodo
+        self.taxa = taxa
+        self.restantes = 1  # A primeira chamada é sempre medida.
+        self.peso = 1
+        self.ultima_amostra = time.monotonic()
+
+    def ativar(self) -> None:
+        self.ativa = True
+
+    def desativar(self) -> None:
+        self.ativa = False
+
+    def definir_periodo(self, periodo: int) -> None:
+        """Passa a medir 1 a cada `periodo` chamadas (desliga a `taxa`)."""
+        if periodo < 1:
+            raise ValueError("`periodo` deve ser pelo menos 1.")
+        self.taxa = None
+        self.periodo = periodo
+        self.restantes = min(self.restantes, periodo)
+
+    def proxima_amostra(self) -> int:
+        """Chamado a cada amostra: retorna o peso dela e prepara a próxima."""
+        peso = self.peso
+        if self.taxa is not None:
+            agora = time.monotonic()
+            decorrido = agora - self.ultima_amostra
+            self.ultima_amostra = agora
+            if decorrido > 0:
+                chamadas_por_segundo = peso / decorrido
+                self.periodo = max(1, round(chamadas_por_segundo / self.taxa))
+        self.peso = self.restantes = self.periodo
+        return peso
+
+
+def definir_cronometragem(ativa: bool) -> None:
+    """Liga ou desliga a medição de todas as funções decoradas com `cronometrar`."""
+    for controle in list(_CONTROLES):
+        controle.ativa = ativa
+
+
+def cronometrar(
+    func: Optional[Callable] = None,
+    *,
+    nome: Optional[str] = None,
+    registro: Optional[RegistroDeLatencias] = None,
+    amostragem: int = 1,
+    taxa: Optional[float] = None,
+):
+    """Registra a duração das chamadas no histograma da função.
+
+    Pode ser usado como `@cronometrar` ou `@cronometrar(nome="api.login")`.
+    Nada é impresso: consulte `REGISTRO.relatorio()` ou `REGISTRO.formatar()`,
+    ou ligue `REGISTRO.iniciar_relatorio_periodico(...)`. Chamadas que
+    levantam exceção também são medidas.
+
+    Para funções chamadas milhões de vezes por segundo, até o par de
+    `perf_counter_ns` pesa. Com `amostragem=N` só 1 a cada N chamadas é
+    medida; com `taxa=R` o intervalo se ajusta para cerca de R amostras por
+    segundo. A função decorada ganha `amostragem` (um `Amostragem`) para
+    mudar isso, ou desligar a medição, em tempo de execução.
+    """
+
+    def decorator(f):
+        serie = (registro or REGISTRO).serie(nome or f"{f.__module__}.{f.__qualname__}")
+        local = serie._local
+        histograma_local = serie.histograma_local
+        relogio = time.perf_counter_ns
+        controle = Amostragem(amostragem, taxa)
+        _CONTROLES.add(controle)
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not controle.ativa:
+                return f(*args, **kwargs)
+            # A contagem regressiva não usa trava: sob threads, uma amostra a
+            # mais ou a menos não muda o resultado estatístico.
+            restantes = controle.restantes - 1
+            if restantes > 0:
+                controle.restantes = restantes
+                return f(*args, **kwargs)
+            peso = controle.proxima_amostra()
+
+            inicio = relogio()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                duracao = relogio() - inicio
+                try:
+                    histograma = local.histograma
+                except AttributeError:
+                    histograma = histograma_local()
+                # `indice_do_balde` escrito em linha: evita uma chamada por registro.
+                deslocamento = duracao.bit_length() - BITS_SUB - 1
+                if deslocamento > 0:
+                    histograma.contagens[(deslocamento << BITS_SUB) + (duracao >> deslocamento)] += peso
+                else:
+                    histograma.contagens[duracao] += peso
+                histograma.soma += duracao * peso
+                if duracao > histograma.maximo:
+                    histograma.maximo = duracao
+
+        wrapper.latencias = serie
+        wrapper.amostragem = controle
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+if __name__ == "__main__":
+    print("--- Latências com histogramas ---")
+
+    @cronometrar
+    def processamento_demorado(n):
+        return sum(i * i for i in range(n))
+
+    for n in range(0, 20_000, 10):
+        processamento_demorado(n)
+
+    print("1. Relatório sob demanda:")
+    print(REGISTRO.formatar())
+    print(f"2. Resumo em ns: {processamento_demorado.latencias.histograma().resumo()}")
+
+    @cronometrar(amostragem=100)
+    def soma_rapida(a, b):
+        return a + b
+
+    for i in range(100_000):
+        soma_rapida(i, i)
+    print(f"3. Amostrando 1%: {soma_rapida.latencias.histograma().contagem} chamadas extrapoladas "
+          f"(de 100000 reais)")
+    soma_rapida.amostragem.desativar()
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+"""
+Limitação de taxa (rate limiting) por janela de tempo.
+
+O `LimiteDeChamadas` de `decorators_guide.py` conta as chamadas desde o início
+do processo e, depois do limite, levanta um `Exception` genérico para sempre.
+Para proteger um serviço externo precisamos de "no máximo N chamadas por
+período", por chave (ex: por usuário), e de saber quando tentar de novo.
+
+- Algoritmos:
+    - `BaldeDeTokens`: tokens entram a uma taxa fixa até a capacidade; cada
+      chamada consome um. Permite rajadas curtas de até `capacidade`.
+    - `JanelaDeslizante`: guarda o instante de cada chamada e aceita no
+      máximo `limite` nos últimos `periodo` segundos. Exato, mas usa memória
+      proporcional ao limite.
+- `Limitador`: aplica um algoritmo com trava (seguro para threads), uma
+  instância por chave, e oferece aquisição bloqueante, não bloqueante e
+  `async`.
+- `LimiteExcedido`: exceção com `tentar_apos`, em segundos.
+- `LimiteDeChamadas`: o decorator, para funções comuns e corrotinas.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Hashable, Optional
+
+from memoizacao import CacheLimitado
+
+ALGORITMOS = ("balde", "janela")
+
+
+class LimiteExcedido(Exception):
+    """O limite de taxa foi atingido.
+
+    Attributes:
+        tentar_apos (float): Segundos até a chamada poder ser aceita.
+        chave (Hashable): A chave cujo limite foi atingido (`None` se global).
+    """
+
+    def __init__(self, tentar_apos: float, chave: Hashable = None):
+        self.tentar_apos = tentar_apos
+        self.chave = chave
+        alvo = f" para {chave!r}" if chave is not None else ""
+        super().__init__(f"Limite de taxa excedido{alvo}; tente novamente em {tentar_apos:.3f}s.")
+
+
+class BaldeDeTokens:
+    """Balde de tokens: `taxa` tokens por segundo, no máximo `capacidade` acumulados."""
+
+    __slots__ = ("taxa", "capacidade", "tokens", "ultimo")
+
+    def __init__(self, taxa: float, capacidade: float):
+        if taxa <= 0 or capacidade <= 0:
+            raise ValueError("`taxa` e `capacidade` devem ser positivas.")
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.ultimo = time.monotonic()
+
+    def reservar(self, n: int, agora: float) -> float:
+        """Consome `n` tokens se houver; senão retorna quanto esperar (sem consumir)."""
+        if n > self.capacidade:
+            raise ValueError(f"Pedido de {n} tokens excede a capacidade {self.capacidade}.")
+        tokens = self.tokens + (agora - self.ultimo) * self.taxa
+        if tokens > self.capacidade:
+            tokens = self.capacidade
+        self.ultimo = agora
+        if tokens >= n:
+            self.tokens = tokens - n
+            return 0.0
+        self.tokens = tokens
+        return (n - tokens) / self.taxa
+
+
+class JanelaDeslizante:
+    """Registro de instantes: no máximo `limite` chamadas nos últimos `periodo` segundos."""
+
+    __slots__ = ("limite", "periodo", "instantes")
+
+    def __init__(self, limite: int, periodo: float):
+        if limite <= 0 or periodo <= 0:
+            raise ValueError("`limite` e `periodo` devem ser positivos.")
+        self.limite = limite
+        self.periodo = periodo
+        self.instantes = deque()
+
+    def reservar(self, n: int, agora: float) -> float:
+        """Registra `n` chamadas se couberem; senão retorna quanto esperar."""
+        if n > self.limite:
+            raise ValueError(f"Pedido de {n} chamadas excede o limite {self.limite}.")
+        instantes = self.instantes
+        corte = agora - self.periodo
+        while instantes and instantes[0] <= corte:
+            instantes.popleft()
+        if len(instantes) + n <= self.limite:
+            instantes.extend([agora] * n)
+            return 0.0
+        # Espera até sair da janela a chamada que abre espaço para as `n` novas.
+        return instantes[len(instantes) + n - self.limite - 1] - corte
+
+
+def criar_algoritmo(algoritmo: str, limite: int, periodo: float) -> Callable[[], Any]:
+    """Fábrica de estados para "`limite` chamadas a cada `periodo` segundos"."""
+    if algoritmo == "balde":
+        return lambda: BaldeDeTokens(limite / periodo, limite)
+    if algoritmo == "janela":
+        return lambda: JanelaDeslizante(limite, periodo)
+    raise ValueError(f"Algoritmo desconhecido: {algoritmo!r}. Use um de {ALGORITMOS}.")
+
+
+class Limitador:
+    """Aplica um algoritmo de limite, com uma instância por chave.
+
+    Args:
+        fabrica (Callable): Cria o estado de uma chave (ex: `criar_algoritmo(...)`).
+        max_chaves (int): Quantas chaves manter; as usadas há mais tempo são
+            esquecidas (e recomeçam do zero se voltarem).
+    """
+
+    def __init__(self, fabrica: Callable[[], Any], max_chaves: int = 10_000):
+        self._fabrica = fabrica
+        self._estados = CacheLimitado(maxsize=max_chaves)
+        self._trava = threading.Lock()
+
+    def _reservar(self, chave: Hashable, n: int) -> float:
+        with self._trava:
+            estado = self._estados.obter(chave)
+            if estado is None:
+                estado = self._fabrica()
+                self._estados.guardar(chave, estado)
+            return estado.reservar(n, time.monotonic())
+
+    def tentar_adquirir(self, chave: Hashable = None, n: int = 1) -> bool:
+        """Aquisição não bloqueante: True se as `n` permissões foram concedidas."""
+        return self._reservar(chave, n) == 0.0
+
+    def adquirir(
+        self, chave: Hashable = None, n: int = 1, bloquear: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        """Obtém `n` permissões, esperando se necessário.
+
+        Raises:
+            LimiteExcedido: Se `bloquear=False` e não houver permissão agora, ou
+                se a espera necessária ultrapassar `timeout`.
+        """
+        prazo = None if timeout is None else time.monotonic() + timeout
+        while True:
+            espera = self._reservar(chave, n)
+            if espera == 0.0:
+                return
+            if not bloquear or (prazo is not None and time.monotonic() + espera > prazo):
+                raise LimiteExcedido(espera, chave)
+            time.sleep(espera)
+
+    async def adquirir_async(
+        self, chave: Hashable = None, n: int = 1, bloquear: bool = True, timeout: Optional[float] = None
+    ) -> None:
+        """Como `adquirir`, mas espera com `asyncio.sleep`, sem travar o event loop."""
+        prazo = None if timeout is None else time.monotonic() + timeout
+        while True:
+            espera = self._reservar(chave, n)
+            if espera == 0.0:
+                return
+            if not bloquear or (prazo is not None and time.monotonic() + espera > prazo):
+                raise LimiteExcedido(espera, chave)
+            await asyncio.sleep(espera)
+
+
+class LimiteDeChamadas:
+    """Decorator de classe: no máximo `limite` chamadas a cada `periodo` segundos.
+
+    Args:
+        limite (int): Chamadas permitidas por período.
+        periodo (float): Tamanho do período, em segundos.
+        algoritmo (str): "balde" (padrão, permite rajadas) ou "janela" (exato).
+        bloquear (bool): Se True, espera pela permissão; se False, levanta
+            `LimiteExcedido` imediatamente.
+        timeout (float | None): Espera máxima quando `bloquear=True`.
+        chave (Callable | None): Recebe os argumentos da chamada e devolve a
+            chave do limite (ex: `lambda usuario, *a, **k: usuario["id"]`).
+            Sem `chave`, o limite é global para a função.
+
+    Corrotinas decoradas esperam com `asyncio.sleep`.
+    """
+
+    def __init__(
+        self,
+        limite: int,
+        periodo: float = 1.0,
+        *,
+        algoritmo: str = "balde",
+        bloquear: bool = False,
+        timeout: Optional[float] = None,
+        chave: Optional[Callable[..., Hashable]] = None,
+    ):
+        self.limite = limite
+        self.periodo = periodo
+        self.bloquear = bloquear
+        self.timeout = timeout
+        self.chave = chave
+        self.limitador = Limitador(criar_algoritmo(algoritmo, limite, periodo))
+
+    def __call__(self, func: Callable) -> Callable:
+        limitador = self.limitador
+        extrair_chave = self.chave
+        bloquear, timeout = self.bloquear, self.timeout
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def wrapper_async(*args, **kwargs):
+                chave = extrair_chave(*args, **kwargs) if extrair_chave else None
+                await limitador.adquirir_async(chave, bloquear=bloquear, timeout=timeout)
+                return await func(*args, **kwargs)
+            wrapper_async.limitador = limitador
+            return wrapper_async
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            chave = extrair_chave(*args, **kwargs) if extrair_chave else None
+            limitador.adquirir(chave, bloquear=bloquear, timeout=timeout)
+            return func(*args, **kwargs)
+
+        wrapper.limitador = limitador
+        return wrapper
+
+
+if __name__ == "__main__":
+    print("--- Limitação de taxa ---")
+
+    @LimiteDeChamadas(limite=2, periodo=0.2)
+    def funcao_limitada():
+        return "ok"
+
+    funcao_limitada()
+    funcao_limitada()
+    try:
+        funcao_limitada()
+    except LimiteExcedido as e:
+        print(f"1. {e}")
+        time.sleep(e.tentar_apos)
+    print(f"   Depois de esperar `tentar_apos`: {funcao_limitada()}")
+
+    @LimiteDeChamadas(limite=1, periodo=60, algoritmo="janela", chave=lambda usuario: usuario["id"])
+    def painel(usuario):
+        return f"painel de {usuario['nome']}"
+
+    print(f"2. Limite por usuário: {painel({'id': 1, 'nome': 'Ana'})}, {painel({'id': 2, 'nome': 'Beto'})}")
+
+    @LimiteDeChamadas(limite=5, periodo=0.1, bloquear=True)
+    async def chamar_servico(i):
+        return i
+
+    async def demonstrar_async():
+        inicio = time.monotonic()
+        await asyncio.gather(*(chamar_servico(i) for i in range(15)))
+        print(f"3. 15 chamadas async a 5 por 0.1s: {time.monotonic() - inicio:.2f}s")
+
+    asyncio.run(demonstrar_async())
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+
+"""
+Log sem bloqueio: quem registra só enfileira, uma thread formata e escreve.
+
+Os decorators de log de `decorators_guide.py` (`criar_logger`,
+`log_com_prefixo`, `meu_log`) e a função `log` de `funcoes_guide.py` chamam
+`print` no caminho quente. Sob carga, as threads das requisições ficam
+presas esperando o stdout ou o disco.
+
+- `FilaDeLog`: o pipeline. O produtor coloca uma tupla
+  `(instante, nivel, mensagem, args)` numa fila; uma thread em segundo
+  plano tira lotes da fila, formata (inclusive o `mensagem % args`, que
+  fica adiado), escreve tudo com uma única chamada a `write` e faz `flush`
+  a cada `intervalo` ou quando o lote tem uma mensagem de nível
+  `nivel_flush` ou acima.
+- Fila cheia: a política "descartar" joga fora a mensagem nova (e conta);
+  "bloquear" espera espaço por até `tempo_bloqueio` segundos.
+- A thread escritora e o `atexit` guardam só uma referência fraca à fila:
+  uma fila descartada sem `parar()` é coletada e a escritora termina (o
+  que ainda não tinha sido escrito se perde; chame `parar()` antes).
+- Erro ao formatar ou escrever um lote (disco cheio, arquivo fechado): o
+  lote é perdido e contado em `falhas`, e a escritora continua.
+- `log`, `criar_logger`, `log_com_prefixo` e `meu_log`: as versões dos
+  guias, escrevendo em `fila_padrao()` (ou na fila informada).
+"""
+
+import atexit
+import sys
+import threading
+import time
+import weakref
+from collections import deque, namedtuple
+from functools import partial, wraps
+from typing import Callable, Optional, TextIO, Union
+
+NIVEIS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+POLITICAS = ("descartar", "bloquear")
+
+EstatisticasLog = namedtuple(
+    "EstatisticasLog",
+    ["enfileiradas", "escritas", "pendentes", "descartadas", "bloqueios", "lotes", "falhas"],
+)
+
+
+# Último segundo formatado: num lote, quase todas as mensagens caem no mesmo.
+# (Guardado como uma tupla só, para várias escritoras lerem um par consistente.)
+_ULTIMO_SEGUNDO = [(-1, "")]
+
+
+def formatar_padrao(instante: float, nivel: str, mensagem: str) -> str:
+    """`HH:MM:SS.mmm [NIVEL] mensagem`."""
+    segundos = int(instante)
+    ultimo, texto = _ULTIMO_SEGUNDO[0]
+    if segundos != ultimo:
+        texto = time.strftime("%H:%M:%S", time.localtime(segundos))
+        _ULTIMO_SEGUNDO[0] = (segundos, texto)
+    return f"{texto}.{int((instante - segundos) * 1000):03d} [{nivel}] {mensagem}"
+
+
+class FilaDeLog:
+    """Fila de mensagens de log com uma thread escritora.
+
+    Args:
+        destino (TextIO | str | None): Arquivo aberto, caminho (aberto em modo
+            "a" com buffer de `buffer` bytes) ou None para `sys.stdout`
+            (consultado a cada lote).
+        capacidade (int): Máximo de mensagens esperando na fila.
+        politica (str): "descartar" ou "bloquear", quando a fila está cheia.
+        tempo_bloqueio (float | None): Espera máxima na política "bloquear";
+            depois disso a mensagem é descartada. None = sem limite.
+        intervalo (float): Período de escrita e `flush`, em segundos.
+        nivel_flush (str): Mensagens deste nível ou acima acordam a
+            escritora e forçam `flush` no mesmo lote.
+        lote (int): Máximo de mensagens formatadas por `write`.
+        buffer (int): Tamanho do buffer do arquivo, quando `destino` é um caminho.
+        formatar (Callable): `formatar(instante, nivel, mensagem) -> str`.
+    """
+
+    def __init__(
+        self,
+        destino: Union[TextIO, str, None] = None,
+        capacidade: int = 100_000,
+        politica: str = "descartar",
+        tempo_bloqueio: Optional[float] = None,
+        intervalo: float = 0.1,
+        nivel_flush: str = "ERROR",
+        lote: int = 4096,
+        buffer: int = 1 << 20,
+        formatar: Callable[[float, str, str], str] = formatar_padrao,
+    ):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política desconhecida: {politica!r}. Use uma de {POLITICAS}.")
+        if capacidade < 1 or lote < 1:
+            raise ValueError("`capacidade` e `lote` devem ser pelo menos 1.")
+        if nivel_flush not in NIVEIS:
+            raise ValueError(f"Nível desconhecido: {nivel_flush!r}.")
+        self._arquivo_proprio = isinstance(destino, str)
+        if self._arquivo_proprio:
+            destino = open(destino, "a", buffering=buffer, encoding="utf-8")
+        self.destino = destino
+        self.capacidade = capacidade
+        self.politica = politica
+        self.tempo_bloqueio = tempo_bloqueio
+        self.intervalo = intervalo
+        self.nivel_flush = nivel_flush
+        self.lote = lote
+        self.formatar = formatar
+        # `deque.append` e `popleft` são atômicos: o produtor não usa trava.
+        self._fila = deque()
+        self._urgentes = {nivel for nivel, valor in NIVEIS.items() if valor >= NIVEIS[nivel_flush]}
+        self._acordar = threading.Event()
+        self._espaco = threading.Condition()
+        self._esperando = 0
+        self._trava_contadores = threading.Lock()
+        self._descartadas = 0
+        self._bloqueios = 0
+        self._escritas = 0
+        self._lotes = 0
+        self._falhas = 0
+        self.ultimo_erro: Optional[BaseException] = None
+        # Passagens da escritora pela fila, iniciadas e concluídas (com `flush`):
+        # `esvaziar` espera uma que tenha começado depois dele.
+        self._passagens_iniciadas = 0
+        self._passagens_concluidas = 0
+        self._concluida = threading.Condition()
+        self._parado = False
+        referencia = weakref.ref(self)
+        self._thread = threading.Thread(target=_escritora, args=(referencia,), name="fila-de-log", daemon=True)
+        self._thread.start()
+        self._ao_sair = partial(_parar_no_fim, referencia)
+        atexit.register(self._ao_sair)
+        weakref.finalize(self, _descartada, self._acordar, self._ao_sair)
+
+    # --- Produtores ----------------------------------------------------------
+
+    def registrar(self, nivel: str, mensagem: str, *args) -> None:
+        """Enfileira uma mensagem; `mensagem % args` só é feito pela escritora."""
+        fila = self._fila
+        if len(fila) >= self.capacidade and not self._abrir_espaco():
+            return
+        fila.append((time.time(), nivel, mensagem, args))
+        if nivel in self._urgentes:
+            self._acordar.set()
+
+    def _abrir_espaco(self) -> bool:
+        """Fila cheia: aplica a política. Retorna True se a mensagem pode entrar."""
+        if self.politica == "bloquear" and not self._parado:
+            limite = None if self.tempo_bloqueio is None else time.monotonic() + self.tempo_bloqueio
+            with self._espaco:
+                self._esperando += 1
+                self._bloqueios += 1
+                try:
+                    while len(self._fila) >= self.capacidade and not self._parado:
+                        self._acordar.set()
+                        restante = 0.05 if limite is None else min(0.05, limite - time.monotonic())
+                        if restante <= 0:
+                            break
+                        self._espaco.wait(restante)
+                finally:
+                    self._esperando -= 1
+            if len(self._fila) < self.capacidade:
+                return True
+        with self._trava_contadores:
+            self._descartadas += 1
+        return False
+
+    # --- Escritora -----------------------------------------------------------
+
+    def _passagem(self) -> bool:
+        """Uma passagem da escritora pela fila. Retorna True se a fila foi parada."""
+        self._acordar.clear()
+        parado = self._parado
+        self._passagens_iniciadas += 1
+        self._escrever_pendentes()
+        with self._concluida:
+            self._passagens_concluidas += 1
+            self._concluida.notify_all()
+        return parado
+
+    def _escrever_pendentes(self) -> None:
+        fila = self._fila
+        formatar = self.formatar
+        urgentes = self._urgentes
+        escreveu = False
+        while fila:
+            tamanho = min(self.lote, len(fila))
+            lote = [fila.popleft() for _ in range(tamanho)]
+            if self._esperando:
+                with self._espaco:
+                    self._espaco.notify_all()
+            try:
+                linhas = []
+                flush = False
+                for instante, nivel, mensagem, args in lote:
+                    if args:
+                        try:
+                            mensagem = mensagem % args
+                        except (TypeError, ValueError) as exc:
+                            mensagem = f"{mensagem!r} % {args!r} falhou: {exc}"
+                    linhas.append(formatar(instante, nivel, mensagem))
+                    flush = flush or nivel in urgentes
+                destino = self.destino or sys.stdout
+                destino.write("\n".join(linhas) + "\n")
+                if flush:
+                    destino.flush()
+            except Exception as exc:
+                # Uma exceção aqui mataria a thread, e todas as mensagens seguintes se perderiam.
+                self._falhas += tamanho
+                self.ultimo_erro = exc
+                continue
+            self._escritas += tamanho
+            self._lotes += 1
+            escreveu = True
+        if escreveu:
+            try:
+                (self.destino or sys.stdout).flush()
+            except Exception as exc:
+                self.ultimo_erro = exc
+
+    # --- Controle ------------------------------------------------------------
+
+    def esvaziar(self, timeout: Optional[float] = None) -> bool:
+        """Acorda a escritora e espera até o que foi enfileirado antes estar escrito.
+
+        Não basta a fila ficar vazia: a escritora pode estar no meio do lote
+        que acabou de tirar dela. Espera uma passagem completa (com `flush`)
+        que tenha começado depois desta chamada. Retorna False se o tempo acabar.
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        alvo = self._passagens_iniciadas + 1
+        self._acordar.set()
+        with self._concluida:
+            while self._passagens_concluidas < alvo:
+                if not self._thread.is_alive():
+                    return not self._fila
+                restante = 0.05 if limite is None else min(0.05, limite - time.monotonic())
+                if restante <= 0:
+                    return False
+                self._concluida.wait(restante)
+        return True
+
+    def parar(self) -> None:
+        """Escreve o que estiver na fila e encerra a escritora (chamado também no `atexit`)."""
+        if self._parado:
+            return
+        self._parado = True
+        with self._espaco:
+            self._espaco.notify_all()
+        self._acordar.set()
+        self._thread.join()
+        atexit.unregister(self._ao_sair)
+        if self._arquivo_proprio:
+            self.destino.close()
+
+    def estatisticas(self) -> EstatisticasLog:
+        pendentes = len(self._fila)
+        return EstatisticasLog(
+            self._escritas + self._falhas + pendentes, self._escritas, pendentes,
+            self._descartadas, self._bloqueios, self._lotes, self._falhas,
+        )
+
+
+def _escritora(referencia: "weakref.ref") -> None:
+    """Laço da thread escritora: só segura a fila durante cada passagem."""
+    while True:
+        fila = referencia()
+        if fila is None:
+            return
+        acordar, intervalo = fila._acordar, fila.intervalo
+        del fila
+        acordar.wait(intervalo)
+        fila = referencia()
+        if fila is None or fila._passagem():
+            return
+        del fila
+
+
+def _parar_no_fim(referencia: "weakref.ref") -> None:
+    """Registrada no `atexit`: para a fila, se ela ainda existir."""
+    fila = referencia()
+    if fila is not None:
+        fila.parar()
+
+
+def _descartada(acordar: threading.Event, ao_sair: Callable) -> None:
+    """A fila foi coletada: acorda a escritora (para ela terminar) e sai do `atexit`."""
+    atexit.unregister(ao_sair)
+    acordar.set()
+
+
+_FILA_PADRAO = None
+_TRAVA_PADRAO = threading.Lock()
+
+
+def fila_padrao() -> FilaDeLog:
+    """Fila compartilhada (escrevendo em `sys.stdout`), criada no primeiro uso."""
+    global _FILA_PADRAO
+    if _FILA_PADRAO is None:
+        with _TRAVA_PADRAO:
+            if _FILA_PADRAO is None:
+                _FILA_PADRAO = FilaDeLog()
+    return _FILA_PADRAO
+
+
+# --- As versões dos guias ------------------------------------------------------
+
+def log(mensagem: str, nivel: str = "INFO", fila: Optional[FilaDeLog] = None) -> None:
+    """Como o `log` de `funcoes_guide.py`, mas só enfileira a mensagem."""
+    (fila or fila_padrao()).registrar(nivel, mensagem)
+
+
+def criar_logger(prefixo: str, nivel: str = "INFO", fila: Optional[FilaDeLog] = None):
+    """Como o `criar_logger` de `decorators_guide.py`: registra cada chamada com `prefixo`."""
+
+    def logger(funcao):
+        registrar = (fila or fila_padrao()).registrar
+        mensagem = f"{prefixo}: Chamando a função {funcao.__name__}..."
+
+        @wraps(funcao)
+        def wrapper(*args, **kwargs):
+            registrar(nivel, mensagem)
+            return funcao(*args, **kwargs)
+        return wrapper
+
+    return logger
+
+
+def log_com_prefixo(prefixo: str, nivel: str = "INFO", fila: Optional[FilaDeLog] = None):
+    """Como o `log_com_prefixo` de `decorators_guide.py`."""
+
+    def decorator(func):
+        registrar = (fila or fila_padrao()).registrar
+        # A mensagem não muda entre chamadas: é montada uma vez só.
+        mensagem = f"{prefixo}: {func.__name__} foi chamada."
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            registrar(nivel, mensagem)
+            return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def meu_log(func: Optional[Callable] = None, *, prefixo: str = "[LOG]", nivel: str = "INFO",
+            fila: Optional[FilaDeLog] = None):
+    """Como o `meu_log` de `decorators_guide.py`: `@meu_log` ou `@meu_log(prefixo="...")`."""
+
+    def decorator(f):
+        registrar = (fila or fila_padrao()).registrar
+        mensagem = f"{prefixo} {f.__name__}"
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            registrar(nivel, mensagem)
+            return f(*args, **kwargs)
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+if __name__ == "__main__":
+    print("--- Log em fila ---")
+    fila = FilaDeLog(destino=sys.stdout, intervalo=0.05)
+
+    @log_com_prefixo("[INFO]", fila=fila)
+    def operacao_importante():
+        return "ok"
+
+    @meu_log(prefixo="[AUDITORIA]", fila=fila)
+    def funcao_log_padrao():
+        pass
+
+    inicio = time.perf_counter()
+    for _ in range(3):
+        operacao_importante()
+    funcao_log_padrao()
+    log("Serviço iniciado.", fila=fila)
+    fila.registrar("INFO", "Usuário %s entrou (%d tentativas)", "ana", 2)
+    print(f"1. 6 mensagens enfileiradas em {(time.perf_counter() - inicio) * 1e6:.0f} µs; ainda nada escrito:")
+    fila.esvaziar()
+    print("2. A escritora escreveu o lote acima de uma vez.")
+
+    pequena = FilaDeLog(destino=sys.stdout, capacidade=10, intervalo=10)
+    for i in range(100):
+        pequena.registrar("DEBUG", "mensagem %d", i)
+    print(f"3. Fila de 10 com 100 mensagens: {pequena.estatisticas()}")
+    pequena.parar()
+    fila.parar()
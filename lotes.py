@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""
+Micro-lotes: chamadas escalares de várias threads viram uma chamada em lote.
+
+Funções como `calcula_algo(x)` (a do `UltimoResultado` em
+`decorators_guide.py`) ou `calculos.somar(a, b)` são chamadas um item por
+vez, de muitas threads. Os backends reais (banco, serviço remoto, kernel
+numérico) costumam ter um custo fixo alto por chamada e um custo pequeno por
+item, então processar 64 itens de uma vez sai quase pelo preço de um.
+
+`@lote` decora a implementação em lote (recebe uma lista de itens e retorna
+a lista de resultados, na mesma ordem) e devolve uma função escalar. Cada
+chamada escalar entra em um buffer e recebe um `Future`; o buffer é enviado
+quando junta `max_itens` itens ou quando o primeiro deles completa
+`max_espera` segundos, e cada resultado volta para o `Future` de quem o pediu.
+
+- `Agrupador`: a versão com threads. Uma thread em segundo plano despacha os
+  lotes; enquanto um lote executa, o próximo vai se formando.
+- `AgrupadorAsync`: a versão para corrotinas, com `loop.call_later`.
+- `lote`: o decorator, que escolhe entre os dois.
+
+Um item é o único argumento posicional da chamada (`calcula_algo(5)` -> `5`)
+ou a tupla de argumentos quando há mais de um (`somar(1, 2)` -> `(1, 2)`).
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Executor, Future
+from functools import update_wrapper
+from typing import Any, Callable, Optional
+
+from latencias import REGISTRO, Histograma, RegistroDeLatencias
+
+EstatisticasLote = namedtuple(
+    "EstatisticasLote", ["lotes", "itens", "media_por_lote", "por_tamanho", "por_prazo", "erros"]
+)
+
+# Motivos de envio de um lote.
+CHEIO, PRAZO = "cheio", "prazo"
+
+
+def _item(args: tuple, kwargs: dict) -> Any:
+    if kwargs:
+        raise TypeError("Funções em lote não aceitam argumentos nomeados.")
+    if len(args) == 1:
+        return args[0]
+    return args
+
+
+class _BaseAgrupador:
+    """Configuração e métricas comuns às versões com threads e `async`."""
+
+    def __init__(self, func: Callable, max_itens: int, max_espera: float, nome: Optional[str],
+                 registro: Optional[RegistroDeLatencias]):
+        if max_itens < 1:
+            raise ValueError("`max_itens` deve ser pelo menos 1.")
+        if max_espera < 0:
+            raise ValueError("`max_espera` não pode ser negativa.")
+        update_wrapper(self, func)
+        self.em_lote = func
+        self.max_itens = max_itens
+        self.max_espera = max_espera
+        nome = nome or f"{func.__module__}.{func.__qualname__}"
+        registro = registro or REGISTRO
+        # Duração de cada chamada em lote e idade do item mais antigo ao enviar.
+        self.latencias_lote = registro.serie(f"{nome}.lote")
+        self.latencias_espera = registro.serie(f"{nome}.espera")
+        self.tamanhos = Histograma()
+        self._motivos = {CHEIO: 0, PRAZO: 0}
+        self._erros = 0
+
+    def _registrar_envio(self, tamanho: int, motivo: str, primeiro_em: int) -> None:
+        self.tamanhos.registrar(tamanho)
+        self._motivos[motivo] += 1
+        self.latencias_espera.registrar(time.perf_counter_ns() - primeiro_em)
+
+    def _chamar_em_lote(self, itens: list, resultados) -> list:
+        """Confere a resposta da implementação em lote."""
+        resultados = list(resultados)
+        if len(resultados) != len(itens):
+            raise ValueError(
+                f"{self.em_lote.__qualname__} retornou {len(resultados)} resultados para {len(itens)} itens."
+            )
+        return resultados
+
+    def estatisticas(self) -> EstatisticasLote:
+        """Lotes enviados, itens, tamanho médio, motivos de envio e lotes com erro."""
+        lotes = self._motivos[CHEIO] + self._motivos[PRAZO]
+        itens = self.tamanhos.soma
+        return EstatisticasLote(
+            lotes, itens, itens / lotes if lotes else 0.0, self._motivos[CHEIO], self._motivos[PRAZO], self._erros
+        )
+
+
+class Agrupador(_BaseAgrupador):
+    """Junta chamadas escalares de várias threads em chamadas a `func(itens)`.
+
+    Chamar o agrupador bloqueia até o resultado chegar; `enviar` retorna o
+    `Future` na hora. Se a chamada em lote levantar, todos os itens dela
+    recebem a exceção.
+
+    Args:
+        func (Callable): Implementação em lote: `func(lista_de_itens) -> resultados`.
+        max_itens (int): Tamanho que envia o lote na hora.
+        max_espera (float): Quanto o primeiro item de um lote espera por outros, em segundos.
+        executor (Executor | None): Onde executar os lotes. Sem executor, eles
+            rodam um de cada vez na thread do agrupador.
+        nome (str | None): Prefixo das séries de latência.
+        registro (RegistroDeLatencias | None): Padrão `latencias.REGISTRO`.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        max_itens: int = 64,
+        max_espera: float = 0.002,
+        executor: Optional[Executor] = None,
+        nome: Optional[str] = None,
+        registro: Optional[RegistroDeLatencias] = None,
+    ):
+        super().__init__(func, max_itens, max_espera, nome, registro)
+        self.executor = executor
+        # (item, futuro, instante de entrada): o prazo de cada lote conta a partir do seu primeiro item.
+        self._pendentes = []
+        self._condicao = threading.Condition()
+        self._parado = False
+        self._thread = None
+
+    def enviar(self, *args, **kwargs) -> Future:
+        """Coloca um item no buffer e retorna o `Future` do resultado dele."""
+        item = _item(args, kwargs)
+        futuro = Future()
+        instante = time.perf_counter_ns()
+        with self._condicao:
+            if self._parado:
+                raise RuntimeError("O agrupador foi parado.")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._rodar, name="agrupador", daemon=True)
+                self._thread.start()
+            pendentes = self._pendentes
+            pendentes.append((item, futuro, instante))
+            if len(pendentes) == 1 or len(pendentes) >= self.max_itens:
+                self._condicao.notify()
+        return futuro
+
+    def __call__(self, *args, **kwargs):
+        return self.enviar(*args, **kwargs).result()
+
+    def _rodar(self) -> None:
+        espera_ns = int(self.max_espera * 1e9)
+        while True:
+            with self._condicao:
+                while True:
+                    pendentes = self._pendentes
+                    if pendentes:
+                        if len(pendentes) >= self.max_itens:
+                            motivo = CHEIO
+                            break
+                        restante = pendentes[0][2] + espera_ns - time.perf_counter_ns()
+                        if restante <= 0 or self._parado:
+                            motivo = PRAZO
+                            break
+                        self._condicao.wait(restante / 1e9)
+                    elif self._parado:
+                        return
+                    else:
+                        self._condicao.wait()
+                lote = pendentes[:self.max_itens]
+                del pendentes[:self.max_itens]
+                # O que sobrou chegou depois do lote encher: espera o próprio prazo,
+                # contado a partir do mais antigo que ficou (`pendentes[0]`).
+                self._registrar_envio(len(lote), motivo, lote[0][2])
+
+            # Futuros cancelados por quem chamou `enviar` ficam fora do lote.
+            lote = [(item, futuro) for item, futuro, _ in lote if futuro.set_running_or_notify_cancel()]
+            if not lote:
+                continue
+            if self.executor is None:
+                self._executar(lote)
+            else:
+                self.executor.submit(self._executar, lote)
+
+    def _executar(self, lote: list) -> None:
+        itens = [item for item, _ in lote]
+        inicio = time.perf_counter_ns()
+        try:
+            resultados = self._chamar_em_lote(itens, self.em_lote(itens))
+        except BaseException as exc:
+            with self._condicao:
+                self._erros += 1
+            for _, futuro in lote:
+                futuro.set_exception(exc)
+            return
+        finally:
+            self.latencias_lote.registrar(time.perf_counter_ns() - inicio)
+        for (_, futuro), resultado in zip(lote, resultados):
+            futuro.set_result(resultado)
+
+    def parar(self) -> None:
+        """Envia o que estiver no buffer e para a thread."""
+        with self._condicao:
+            self._parado = True
+            self._condicao.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class AgrupadorAsync(_BaseAgrupador):
+    """A versão de `Agrupador` para uma implementação em lote `async def`.
+
+    Chamar o agrupador retorna uma corrotina; `enviar` retorna o
+    `asyncio.Future` na hora. Precisa de um event loop em execução.
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        max_itens: int = 64,
+        max_espera: float = 0.002,
+        nome: Optional[str] = None,
+        registro: Optional[RegistroDeLatencias] = None,
+    ):
+        super().__init__(func, max_itens, max_espera, nome, registro)
+        self._loop = None
+        self._pendentes = []
+        self._primeiro_em = 0
+        self._handle = None
+        self._tarefas = set()
+
+    def enviar(self, *args, **kwargs) -> "asyncio.Future":
+        """Coloca um item no buffer e retorna o `asyncio.Future` do resultado dele."""
+        item = _item(args, kwargs)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Um event loop novo (ex: outro `asyncio.run`); o anterior já terminou.
+            self._loop, self._pendentes, self._handle = loop, [], None
+        futuro = loop.create_future()
+        self._pendentes.append((item, futuro))
+        if len(self._pendentes) == 1:
+            self._primeiro_em = time.perf_counter_ns()
+            self._handle = loop.call_later(self.max_espera, self._despachar, PRAZO)
+        if len(self._pendentes) >= self.max_itens:
+            self._handle.cancel()
+            self._despachar(CHEIO)
+        return futuro
+
+    async def __call__(self, *args, **kwargs):
+        return await self.enviar(*args, **kwargs)
+
+    def _despachar(self, motivo: str) -> None:
+        lote, self._pendentes, self._handle = self._pendentes, [], None
+        self._registrar_envio(len(lote), motivo, self._primeiro_em)
+        lote = [(item, futuro) for item, futuro in lote if not futuro.cancelled()]
+        if lote:
+            tarefa = self._loop.create_task(self._executar(lote))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _executar(self, lote: list) -> None:
+        itens = [item for item, _ in lote]
+        inicio = time.perf_counter_ns()
+        try:
+            resultados = self._chamar_em_lote(itens, await self.em_lote(itens))
+        except BaseException as exc:
+            self._erros += 1
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(exc)
+            return
+        finally:
+            self.latencias_lote.registrar(time.perf_counter_ns() - inicio)
+        for (_, futuro), resultado in zip(lote, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+
+def lote(
+    func: Optional[Callable] = None,
+    *,
+    max_itens: int = 64,
+    max_espera: float = 0.002,
+    executor: Optional[Executor] = None,
+    nome: Optional[str] = None,
+    registro: Optional[RegistroDeLatencias] = None,
+):
+    """Transforma uma implementação em lote em uma função escalar que agrupa chamadas.
+
+    Pode ser usado como `@lote` ou `@lote(max_itens=128, max_espera=0.005)`.
+    Em `async def` retorna um `AgrupadorAsync` (o `executor` é ignorado);
+    caso contrário, um `Agrupador`. Métricas em `funcao.estatisticas()`,
+    `funcao.tamanhos` e nas séries `<nome>.lote` e `<nome>.espera`.
+    """
+
+    def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            return AgrupadorAsync(f, max_itens, max_espera, nome, registro)
+        return Agrupador(f, max_itens, max_espera, executor, nome, registro)
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("--- Micro-lotes ---")
+
+    @lote(max_itens=32, max_espera=0.005)
+    def calcula_algo(xs):
+        time.sleep(0.002)  # Custo fixo de uma ida ao backend.
+        return [x * 10 for x in xs]
+
+    print(f"1. Uma chamada sozinha espera o prazo: calcula_algo(5) = {calcula_algo(5)}")
+    with ThreadPoolExecutor(max_workers=64) as executor:
+        resultados = list(executor.map(calcula_algo, range(1000)))
+    print(f"2. 1000 chamadas de 64 threads: corretas? {resultados == [x * 10 for x in range(1000)]}")
+    print(f"   {calcula_algo.estatisticas()}")
+
+    @lote
+    def somar(pares):
+        return [a + b for a, b in pares]
+
+    print(f"3. Vários argumentos viram uma tupla por item: somar(2, 3) = {somar(2, 3)}")
+
+    @lote(max_itens=10, max_espera=0.01)
+    async def buscar_precos(ids):
+        await asyncio.sleep(0.005)
+        return [f"preço de {i}" for i in ids]
+
+    async def demonstrar_async():
+        precos = await asyncio.gather(*(buscar_precos(i) for i in range(25)))
+        print(f"4. 25 awaits simultâneos: {precos[:2]}... em {buscar_precos.estatisticas().lotes} lotes")
+
+    asyncio.run(demonstrar_async())
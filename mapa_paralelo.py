@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+"""
+Map paralelo em blocos, preservando a ordem dos resultados.
+
+`aplicar_operacao(lista, operacao)` (em `decorators_guide.py`) e
+`processar(dados, func)` (em `funcoes_guide.py`) são list comprehensions:
+um núcleo só, um item por vez. Com dezenas de milhões de registros, o
+trabalho precisa ser dividido.
+
+- A entrada é cortada em blocos. O tamanho do bloco é escolhido na hora: os
+  primeiros itens são processados aqui mesmo, cronometrados, e o bloco fica
+  com o número de itens que leva cerca de `alvo` segundos, limitado para
+  caber no cache (`TAMANHO_CACHE` bytes de itens) e para sobrarem blocos
+  suficientes para equilibrar os trabalhadores.
+- Os blocos vão para um pool de threads (funções de I/O ou que liberam a
+  GIL, como as de C) ou de processos (funções Python que usam CPU). Em
+  `modo="auto"`, funções embutidas vão para threads, funções Python que
+  podem ser serializadas (`pickle`) vão para processos, e lambdas e funções
+  locais ficam nas threads. Trabalho curto demais para compensar o custo
+  dos blocos, ou com um trabalhador só, roda em série.
+- Trabalhadores, por padrão: um processo por núcleo; para threads, que
+  passam a maior parte do tempo esperando, `min(32, núcleos + 4)` (o mesmo
+  padrão do `ThreadPoolExecutor`), então o I/O se sobrepõe mesmo numa
+  máquina de um núcleo.
+- `mapear_iter` é a versão em fluxo: consome a entrada aos poucos, mantém no
+  máximo `2 * trabalhadores` blocos em andamento e entrega os resultados na
+  ordem da entrada. `mapear` junta tudo numa lista.
+"""
+
+import atexit
+import itertools
+import os
+import pickle
+import sys
+import threading
+import time
+import types
+from collections import deque, namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+
+MODOS = ("auto", "threads", "processos", "serie")
+
+Plano = namedtuple("Plano", ["modo", "trabalhadores", "tamanho_bloco", "segundos_por_item"])
+
+# Itens processados aqui mesmo para medir o custo por item (no máximo
+# AMOSTRA itens ou `alvo / 10` segundos, o que vier primeiro).
+AMOSTRA = 32
+# Bytes de itens por bloco: um bloco inteiro deve caber no cache L2.
+TAMANHO_CACHE = 1 << 20
+# Blocos por trabalhador, quando o tamanho da entrada é conhecido.
+BLOCOS_POR_TRABALHADOR = 4
+# Abaixo disto (tempo estimado total, em segundos), não vale a pena paralelizar.
+MINIMO_PARALELO = {"threads": 0.002, "processos": 0.05}
+
+
+def trabalhadores_padrao(modo: str) -> int:
+    """Núcleos da máquina para processos; `min(32, núcleos + 4)` para threads."""
+    nucleos = os.cpu_count() or 1
+    return nucleos if modo == "processos" else min(32, nucleos + 4)
+
+
+def _aplicar_bloco(func: Callable, bloco: list) -> list:
+    """Executado pelos trabalhadores (precisa estar no módulo para ir por `pickle`)."""
+    return list(map(func, bloco))
+
+
+def escolher_modo(func: Callable) -> str:
+    """Threads para funções de C e não serializáveis; processos para funções Python."""
+    if isinstance(func, (types.BuiltinFunctionType, types.BuiltinMethodType)) or not hasattr(func, "__code__"):
+        return "threads"
+    try:
+        pickle.dumps(func)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return "threads"
+    return "processos"
+
+
+def _bytes_por_item(amostra: list) -> int:
+    if not amostra:
+        return 8
+    # O ponteiro na lista mais o objeto em si (sem seguir referências).
+    return 8 + sum(map(sys.getsizeof, amostra)) // len(amostra)
+
+
+def planejar(
+    segundos_por_item: float,
+    bytes_por_item: int,
+    modo: str,
+    trabalhadores: int,
+    total: Optional[int] = None,
+    alvo: float = 0.01,
+) -> Plano:
+    """Escolhe modo e tamanho de bloco a partir do custo medido de um item.
+
+    Args:
+        segundos_por_item (float): Tempo medido por item.
+        bytes_por_item (int): Memória estimada de um item.
+        modo (str): "threads", "processos" ou "serie" (já resolvido).
+        trabalhadores (int): Tamanho do pool.
+        total (int | None): Itens restantes, se conhecido.
+        alvo (float): Duração desejada de um bloco, em segundos.
+    """
+    if total is not None and modo != "serie" and segundos_por_item * total < MINIMO_PARALELO[modo]:
+        modo = "serie"
+    # Com um trabalhador (um processo num só núcleo, ou `trabalhadores=1`) não
+    # há paralelismo, só o custo dos blocos (e do `pickle`).
+    if modo == "serie" or trabalhadores <= 1:
+        return Plano("serie", 1, total or 1, segundos_por_item)
+    tamanho = int(alvo / segundos_por_item) if segundos_por_item > 0 else TAMANHO_CACHE
+    tamanho = min(tamanho, TAMANHO_CACHE // bytes_por_item)
+    if total is not None:
+        tamanho = min(tamanho, -(-total // (trabalhadores * BLOCOS_POR_TRABALHADOR)))
+    return Plano(modo, trabalhadores, max(tamanho, 1), segundos_por_item)
+
+
+_EXECUTORES = {}
+_TRAVA_PADRAO = threading.Lock()
+
+
+def executor_padrao(modo: str, trabalhadores: Optional[int] = None) -> Executor:
+    """Pool compartilhado de threads ou de processos (criado no primeiro uso)."""
+    trabalhadores = trabalhadores or trabalhadores_padrao(modo)
+    chave = (modo, trabalhadores)
+    executor = _EXECUTORES.get(chave)
+    if executor is None:
+        with _TRAVA_PADRAO:
+            executor = _EXECUTORES.get(chave)
+            if executor is None:
+                classe = ProcessPoolExecutor if modo == "processos" else ThreadPoolExecutor
+                executor = _EXECUTORES[chave] = classe(max_workers=trabalhadores)
+    return executor
+
+
+@atexit.register
+def _encerrar_executores() -> None:
+    for executor in _EXECUTORES.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def mapear_iter(
+    func: Callable,
+    dados: Iterable,
+    *,
+    modo: str = "auto",
+    trabalhadores: Optional[int] = None,
+    tamanho_bloco: Optional[int] = None,
+    alvo: float = 0.01,
+    executor: Optional[Executor] = None,
+) -> Iterator:
+    """Gera `func(item)` para cada item de `dados`, em paralelo e na ordem da entrada.
+
+    Args:
+        func (Callable): Função de um argumento. Em modo "processos" precisa
+            ser serializável (definida no nível de um módulo).
+        dados (Iterable): Qualquer iterável; é consumido aos poucos.
+        modo (str): "auto", "threads", "processos" ou "serie".
+        trabalhadores (int | None): Tamanho do pool (padrão: `trabalhadores_padrao(modo)`).
+        tamanho_bloco (int | None): Fixa o tamanho do bloco em vez de medir.
+        alvo (float): Duração desejada de cada bloco, em segundos.
+        executor (Executor | None): Pool próprio; o `modo` indica se é de
+            threads ou de processos.
+
+    Raises:
+        ValueError: Se o modo for desconhecido.
+        TypeError: Em modo "processos", se `func` não for serializável.
+    """
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconhecido: {modo!r}. Use um de {MODOS}.")
+    if modo == "auto":
+        modo = escolher_modo(func)
+    elif modo == "processos" and executor is None:
+        try:
+            pickle.dumps(func)
+        except (pickle.PicklingError, AttributeError, TypeError) as exc:
+            raise TypeError(f"{func!r} não pode ir para outro processo: {exc}") from exc
+    trabalhadores = trabalhadores or getattr(executor, "_max_workers", None) or trabalhadores_padrao(modo)
+    return _gerar(func, dados, modo, trabalhadores, tamanho_bloco, alvo, executor)
+
+
+def _gerar(func, dados, modo, trabalhadores, tamanho_bloco, alvo, executor):
+    total = len(dados) if hasattr(dados, "__len__") else None
+    iterador = iter(dados)
+
+    if tamanho_bloco is None:
+        # Os itens da amostra fazem parte da saída: nada é processado duas vezes.
+        amostra, resultados = [], []
+        inicio = time.perf_counter()
+        limite = inicio + alvo / 10
+        for item in itertools.islice(iterador, AMOSTRA):
+            amostra.append(item)
+            resultados.append(func(item))
+            if time.perf_counter() >= limite:
+                break
+        por_item = (time.perf_counter() - inicio) / max(len(amostra), 1)
+        yield from resultados
+        restantes = None if total is None else total - len(amostra)
+        plano = planejar(por_item, _bytes_por_item(amostra), modo, trabalhadores, restantes, alvo)
+        modo, tamanho_bloco = plano.modo, plano.tamanho_bloco
+    elif trabalhadores <= 1:
+        modo = "serie"
+
+    if modo == "serie":
+        yield from map(func, iterador)
+        return
+
+    if executor is None:
+        executor = executor_padrao(modo, trabalhadores)
+    pendentes = deque()
+    janela = 2 * trabalhadores
+    try:
+        while True:
+            while len(pendentes) < janela:
+                bloco = list(itertools.islice(iterador, tamanho_bloco))
+                if not bloco:
+                    break
+                pendentes.append(executor.submit(_aplicar_bloco, func, bloco))
+            if not pendentes:
+                return
+            yield from pendentes.popleft().result()
+    finally:
+        # Se o consumidor parar no meio (ou der erro), os blocos na fila são cancelados.
+        for futuro in pendentes:
+            futuro.cancel()
+
+
+def mapear(func: Callable, dados: Iterable, **opcoes) -> List:
+    """`list(mapear_iter(func, dados, **opcoes))`."""
+    return list(mapear_iter(func, dados, **opcoes))
+
+
+# --- As versões dos guias ------------------------------------------------------
+
+def aplicar_operacao(lista: Iterable, operacao: Callable, **opcoes) -> List:
+    """Como o `aplicar_operacao` de `decorators_guide.py`, em blocos paralelos."""
+    return mapear(operacao, lista, **opcoes)
+
+
+def processar(dados: Iterable, func: Callable = lambda x: x, **opcoes) -> List:
+    """Como o `processar` de `funcoes_guide.py`, em blocos paralelos."""
+    return mapear(func, dados, **opcoes)
+
+
+def _quadrado_lento(x):
+    return sum(i * x for i in range(200))
+
+
+def _esperar_io(x):
+    time.sleep(0.001)  # Como uma chamada de rede.
+    return x
+
+
+if __name__ == "__main__":
+    print("--- Map paralelo ---")
+    print(f"1. Lambda (fica nas threads): {aplicar_operacao([1, 2, 3], lambda x: x * 2)}")
+    print(f"   Modo escolhido para `abs`: {escolher_modo(abs)}; para uma função Python: "
+          f"{escolher_modo(_quadrado_lento)}")
+
+    dados = range(20_000)
+    inicio = time.perf_counter()
+    serie = [_quadrado_lento(x) for x in dados]
+    tempo_serie = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    paralelo = processar(dados, _quadrado_lento)
+    tempo_paralelo = time.perf_counter() - inicio
+    assert paralelo == serie
+    print(f"2. {len(dados)} itens: série {tempo_serie * 1e3:.0f} ms, "
+          f"paralelo {tempo_paralelo * 1e3:.0f} ms ({os.cpu_count()} núcleos), mesma ordem")
+
+    inicio = time.perf_counter()
+    esperas = mapear(_esperar_io, range(200), modo="threads")
+    print(f"3. 200 esperas de 1 ms em threads: {(time.perf_counter() - inicio) * 1e3:.0f} ms "
+          f"({trabalhadores_padrao('threads')} trabalhadores; em série, ~200 ms)")
+
+    fluxo = mapear_iter(str.upper, (f"linha {i}" for i in itertools.count()), modo="threads")
+    print(f"4. Em fluxo, sobre uma entrada infinita: {list(itertools.islice(fluxo, 3))}")
+    fluxo.close()
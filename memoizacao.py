@@ -0,0 +1,570 @@
+# -*- coding: utf-8 -*-
+
+"""
+Motor de memoização com limites de memória.
+
+O decorator `cache` de `decorators_guide.py` (e seu irmão `cache_decorator` em
+`funcoes_guide.py`) guarda cada resultado em um dicionário que nunca encolhe.
+Em processos de longa duração isso vira um vazamento de memória. Este módulo
+oferece a mesma ideia com limites e estatísticas:
+
+- `CacheLimitado`: armazenamento em memória com limite de entradas (`maxsize`)
+  e de bytes (`maxbytes`), e despejo por LRU ou por TTL.
+- `memoizar`: decorator que usa um `CacheLimitado` (ou outro armazenamento com
+  a mesma interface) e expõe `cache_info()` e `cache_clear()`. As chaves são
+  montadas por `chaves.criar_construtor_de_chave`, então qualquer combinação
+  de argumentos posicionais e nomeados é aceita.
+- `memoizar_concorrente`: versão segura para threads com "voo único": quando
+  várias threads erram a mesma chave ao mesmo tempo, só a primeira calcula e
+  as demais esperam pelo resultado dela.
+- `memoizar_async`: o equivalente para `async def`, que guarda o resultado
+  aguardado (e não o objeto corrotina) e junta awaits simultâneos da mesma
+  chave em uma única tarefa.
+
+No caminho quente (acerto de cache) o custo é uma única consulta ao dicionário.
+"""
+
+import asyncio
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future
+from functools import partial, wraps
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from chaves import CHAVE_PADRAO, criar_construtor_de_chave
+
+# Sentinela para diferenciar "não está no cache" de um resultado `None`.
+_AUSENTE = object()
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["acertos", "falhas", "despejos", "tamanho", "maxsize", "bytes"]
+)
+
+POLITICAS = ("lru", "ttl")
+
+# Tamanho a partir do qual a política "lru" com `ttl` varre as entradas vencidas.
+_VARREDURA_MINIMA = 1024
+
+
+class CacheLimitado:
+    """Armazenamento em memória com limite de entradas/bytes e despejo LRU ou TTL.
+
+    Políticas:
+        - "lru": um acerto move a entrada para o fim da fila; ao estourar o
+          limite, sai a entrada usada há mais tempo. Se `ttl` for informado,
+          as entradas também expiram.
+        - "ttl": as entradas expiram `ttl` segundos após a inserção; ao estourar
+          o limite, sai a entrada mais antiga (a mais próxima de expirar).
+
+    Com `ttl`, as entradas vencidas também são descartadas nas inserções (não
+    só quando alguém as lê), então mesmo sem `maxsize` o cache não cresce
+    com chaves que nunca mais são consultadas.
+
+    Não usa travas: uma instância é para uma thread por vez (o
+    `memoizar_concorrente` protege cada fatia com a sua trava). Uma leitura
+    que cruza com um despejo em outra thread não levanta erro, mas as
+    estatísticas podem perder contagens.
+
+    Args:
+        maxsize (int | None): Número máximo de entradas (`None` = sem limite).
+        maxbytes (int | None): Soma máxima do tamanho dos valores, medida com `medir`.
+            O padrão, `sys.getsizeof`, é raso: uma lista conta só os ponteiros,
+            não os elementos. Para valores aninhados, passe um `medir` próprio.
+        ttl (float | None): Tempo de vida das entradas, em segundos.
+        politica (str | None): "lru" ou "ttl". Por padrão, "ttl" se `ttl` for
+            informado e "lru" caso contrário.
+        medir (Callable): Função que estima o tamanho de um valor em bytes.
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 128,
+        maxbytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        politica: Optional[str] = None,
+        medir: Callable[[Any], int] = sys.getsizeof,
+    ):
+        if politica is None:
+            politica = "lru" if ttl is None else "ttl"
+        if politica not in POLITICAS:
+            raise ValueError(f"Política desconhecida: {politica!r}. Use uma de {POLITICAS}.")
+        if politica == "ttl" and ttl is None:
+            raise ValueError("A política 'ttl' exige o argumento `ttl`.")
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("`maxsize` não pode ser negativo.")
+
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.politica = politica
+        self._medir = medir
+
+        self._dados = OrderedDict()
+        self._tamanhos = {}
+        self._bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        # Na política "lru" com `ttl`, a ordem é de uso, não de vencimento: as
+        # vencidas são procuradas no cache inteiro quando o tamanho dobra.
+        self._proxima_varredura = _VARREDURA_MINIMA
+
+        # A leitura é escolhida uma única vez, para o caminho quente não
+        # precisar testar a configuração a cada chamada.
+        if ttl is not None:
+            self.obter = self._obter_com_ttl
+        elif maxsize is None and maxbytes is None:
+            self.obter = self._obter_sem_limite
+        else:
+            self.obter = self._obter_lru
+
+    # --- Leitura -----------------------------------------------------------
+
+    def _obter_sem_limite(self, chave: Hashable, padrao: Any = None) -> Any:
+        valor = self._dados.get(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            self.falhas += 1
+            return padrao
+        self.acertos += 1
+        return valor
+
+    def _obter_lru(self, chave: Hashable, padrao: Any = None) -> Any:
+        valor = self._dados.get(chave, _AUSENTE)
+        if valor is _AUSENTE:
+            self.falhas += 1
+            return padrao
+        try:
+            self._dados.move_to_end(chave)
+        except KeyError:
+            pass  # Despejada por outra thread entre o `get` e aqui.
+        self.acertos += 1
+        return valor
+
+    def _obter_com_ttl(self, chave: Hashable, padrao: Any = None) -> Any:
+        entrada = self._dados.get(chave, _AUSENTE)
+        if entrada is _AUSENTE:
+            self.falhas += 1
+            return padrao
+        valor, expira_em = entrada
+        if expira_em <= time.monotonic():
+            if self.remover(chave):
+                self.despejos += 1
+            self.falhas += 1
+            return padrao
+        if self.politica == "lru":
+            try:
+                self._dados.move_to_end(chave)
+            except KeyError:
+                pass
+        self.acertos += 1
+        return valor
+
+    # --- Escrita -----------------------------------------------------------
+
+    def guardar(self, chave: Hashable, valor: Any) -> None:
+        """Guarda `valor` e despeja entradas antigas se algum limite estourar."""
+        if self.maxsize == 0:
+            return
+        if chave in self._dados:
+            self._remover(chave)
+
+        if self.maxbytes is not None:
+            tamanho = self._medir(valor)
+            if tamanho > self.maxbytes:
+                return  # Um valor maior que o cache inteiro nunca é guardado.
+            self._tamanhos[chave] = tamanho
+            self._bytes += tamanho
+
+        if self.ttl is not None:
+            agora = time.monotonic()
+            self._purgar_vencidas(agora)
+            self._dados[chave] = (valor, agora + self.ttl)
+        else:
+            self._dados[chave] = valor
+        self._despejar_excesso()
+
+    def _purgar_vencidas(self, agora: float) -> None:
+        dados = self._dados
+        if self.politica == "ttl":
+            # Ordem de inserção = ordem de vencimento: as vencidas estão no começo.
+            while dados:
+                chave, (_, expira_em) = next(iter(dados.items()))
+                if expira_em > agora:
+                    break
+                self._remover(chave)
+                self.despejos += 1
+        elif len(dados) >= self._proxima_varredura:
+            vencidas = [chave for chave, (_, expira_em) in dados.items() if expira_em <= agora]
+            for chave in vencidas:
+                self._remover(chave)
+            self.despejos += len(vencidas)
+            self._proxima_varredura = max(2 * len(dados), _VARREDURA_MINIMA)
+
+    def _despejar_excesso(self) -> None:
+        dados = self._dados
+        while (self.maxsize is not None and len(dados) > self.maxsize) or (
+            self.maxbytes is not None and self._bytes > self.maxbytes
+        ):
+            chave, _ = dados.popitem(last=False)
+            self._bytes -= self._tamanhos.pop(chave, 0)
+            self.despejos += 1
+
+    def _remover(self, chave: Hashable) -> None:
+        del self._dados[chave]
+        self._bytes -= self._tamanhos.pop(chave, 0)
+
+    # --- Manutenção --------------------------------------------------------
+
+    def remover(self, chave: Hashable) -> bool:
+        """Remove `chave`, se existir. Retorna True se havia uma entrada."""
+        if chave not in self._dados:
+            return False
+        self._remover(chave)
+        return True
+
+    def limpar(self) -> None:
+        """Remove todas as entradas e zera as estatísticas."""
+        self._dados.clear()
+        self._tamanhos.clear()
+        self._bytes = 0
+        self.acertos = self.falhas = self.despejos = 0
+        self._proxima_varredura = _VARREDURA_MINIMA
+
+    def info(self) -> CacheInfo:
+        """Retorna acertos, falhas, despejos e ocupação atual."""
+        return CacheInfo(
+            self.acertos, self.falhas, self.despejos, len(self._dados), self.maxsize, self._bytes
+        )
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+
+def memoizar(
+    func: Optional[Callable] = None,
+    *,
+    maxsize: Optional[int] = 128,
+    maxbytes: Optional[int] = None,
+    ttl: Optional[float] = None,
+    politica: Optional[str] = None,
+    armazenamento: Any = None,
+    congelar: bool = False,
+    ignorar: Iterable[str] = (),
+):
+    """Decorator de memoização com limites, no estilo de `cache` do guia.
+
+    Pode ser usado como `@memoizar` ou `@memoizar(maxsize=1000, ttl=60)`.
+    `congelar` e `ignorar` são repassados a `chaves.criar_construtor_de_chave`.
+    Qualquer objeto com os métodos `obter(chave, padrao)`, `guardar(chave, valor)`,
+    `info()` e `limpar()` pode ser passado em `armazenamento`; nesse caso os
+    demais limites são ignorados.
+
+    A função decorada ganha `cache_info()` e `cache_clear()`. Sem travas, como
+    o `CacheLimitado`: para chamadas de várias threads, use
+    `memoizar_concorrente`.
+    """
+
+    def decorator(f):
+        cache = armazenamento
+        if cache is None:
+            cache = CacheLimitado(maxsize=maxsize, maxbytes=maxbytes, ttl=ttl, politica=politica)
+        obter = cache.obter
+        guardar = cache.guardar
+        construir_chave = criar_construtor_de_chave(f, congelar=congelar, ignorar=ignorar)
+
+        if construir_chave is CHAVE_PADRAO:
+            # Caminho rápido: chamadas só com posicionais usam a tupla `args` como chave.
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                chave = construir_chave(args, kwargs) if kwargs else args
+                resultado = obter(chave, _AUSENTE)
+                if resultado is _AUSENTE:
+                    resultado = f(*args, **kwargs)
+                    guardar(chave, resultado)
+                return resultado
+        else:
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                chave = construir_chave(args, kwargs)
+                resultado = obter(chave, _AUSENTE)
+                if resultado is _AUSENTE:
+                    resultado = f(*args, **kwargs)
+                    guardar(chave, resultado)
+                return resultado
+
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.limpar
+        wrapper.armazenamento = cache
+        return wrapper
+
+    if func is None:
+        return decorator  # Chamado como @memoizar(maxsize=...)
+    return decorator(func)  # Chamado como @memoizar
+
+
+class _Faixa:
+    """Uma fatia independente do cache concorrente: trava, dados e cálculos em andamento."""
+
+    __slots__ = ("trava", "cache", "em_voo")
+
+    def __init__(self, cache: CacheLimitado):
+        self.trava = threading.Lock()
+        self.cache = cache
+        self.em_voo = {}
+
+
+def _dividir_limite(limite: Optional[int], partes: int) -> Optional[int]:
+    if limite is None:
+        return None
+    return -(-limite // partes)  # Divisão arredondada para cima.
+
+
+def memoizar_concorrente(
+    func: Optional[Callable] = None,
+    *,
+    maxsize: Optional[int] = 128,
+    maxbytes: Optional[int] = None,
+    ttl: Optional[float] = None,
+    politica: Optional[str] = None,
+    faixas: int = 16,
+    congelar: bool = False,
+    ignorar: Iterable[str] = (),
+):
+    """Decorator de memoização seguro para threads, com voo único por chave.
+
+    As chaves são distribuídas por `faixas` fatias (lock striping). Cada fatia
+    tem sua própria trava, seu próprio `CacheLimitado` (com `maxsize`/`maxbytes`
+    divididos entre as fatias) e um dicionário de `Future`s em andamento.
+    Chaves de fatias diferentes nunca disputam a mesma trava, e nenhuma trava
+    fica presa enquanto a função decorada executa.
+
+    Se o cálculo levantar uma exceção, ela é repassada a todas as threads que
+    esperavam pela chave e nada é guardado: a próxima chamada tenta de novo.
+
+    Args:
+        faixas (int): Número de fatias; arredondado para a próxima potência de 2.
+    """
+    if faixas < 1:
+        raise ValueError("`faixas` deve ser pelo menos 1.")
+    faixas = 1 << (faixas - 1).bit_length()
+    mascara = faixas - 1
+
+    def decorator(f):
+        fatias = [
+            _Faixa(
+                CacheLimitado(
+                    maxsize=_dividir_limite(maxsize, faixas),
+                    maxbytes=_dividir_limite(maxbytes, faixas),
+                    ttl=ttl,
+                    politica=politica,
+                )
+            )
+            for _ in range(faixas)
+        ]
+        construir_chave = criar_construtor_de_chave(f, congelar=congelar, ignorar=ignorar)
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            chave = construir_chave(args, kwargs)
+            fatia = fatias[hash(chave) & mascara]
+            with fatia.trava:
+                resultado = fatia.cache.obter(chave, _AUSENTE)
+                if resultado is not _AUSENTE:
+                    return resultado
+                futuro = fatia.em_voo.get(chave)
+                lider = futuro is None
+                if lider:
+                    futuro = fatia.em_voo[chave] = Future()
+
+            if not lider:
+                return futuro.result()  # Repassa o resultado ou a exceção do líder.
+
+            try:
+                resultado = f(*args, **kwargs)
+            except BaseException as exc:
+                with fatia.trava:
+                    del fatia.em_voo[chave]
+                futuro.set_exception(exc)
+                raise
+            with fatia.trava:
+                fatia.cache.guardar(chave, resultado)
+                del fatia.em_voo[chave]
+            futuro.set_result(resultado)
+            return resultado
+
+        def cache_info() -> CacheInfo:
+            infos = []
+            for fatia in fatias:
+                with fatia.trava:
+                    infos.append(fatia.cache.info())
+            return CacheInfo(
+                sum(info.acertos for info in infos),
+                sum(info.falhas for info in infos),
+                sum(info.despejos for info in infos),
+                sum(info.tamanho for info in infos),
+                maxsize,
+                sum(info.bytes for info in infos),
+            )
+
+        def cache_clear() -> None:
+            for fatia in fatias:
+                with fatia.trava:
+                    fatia.cache.limpar()
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+class _VooAsync:
+    """Uma tarefa em andamento e quantos awaits ainda esperam por ela."""
+
+    __slots__ = ("tarefa", "esperando")
+
+    def __init__(self, tarefa: "asyncio.Future"):
+        self.tarefa = tarefa
+        self.esperando = 0
+
+
+def memoizar_async(
+    func: Optional[Callable] = None,
+    *,
+    maxsize: Optional[int] = 128,
+    maxbytes: Optional[int] = None,
+    ttl: Optional[float] = None,
+    politica: Optional[str] = None,
+    congelar: bool = False,
+    ignorar: Iterable[str] = (),
+):
+    """Decorator de memoização para corrotinas (`async def`).
+
+    Usar o `cache` do guia em uma corrotina guarda o objeto corrotina, que só
+    pode ser aguardado uma vez. Aqui o que vai para o `CacheLimitado` (com as
+    mesmas políticas LRU/TTL de `memoizar`) é o valor aguardado.
+
+    Awaits simultâneos da mesma chave compartilham uma única tarefa. Se todos
+    os que esperavam forem cancelados, a tarefa também é cancelada. Exceções
+    são repassadas a quem esperava e nunca ficam no cache.
+
+    As tarefas em andamento pertencem ao event loop em que foram criadas; os
+    valores já guardados podem ser lidos de qualquer loop.
+    """
+
+    def decorator(f):
+        if not inspect.iscoroutinefunction(f):
+            raise TypeError(f"'{f.__qualname__}' não é uma corrotina; use `memoizar`.")
+        cache = CacheLimitado(maxsize=maxsize, maxbytes=maxbytes, ttl=ttl, politica=politica)
+        construir_chave = criar_construtor_de_chave(f, congelar=congelar, ignorar=ignorar)
+        em_voo = {}
+
+        def concluir(chave, voo, tarefa):
+            if em_voo.get(chave) is voo:
+                del em_voo[chave]
+            # `exception()` também marca a exceção como lida, evitando o aviso
+            # "Task exception was never retrieved" quando ninguém mais espera.
+            if not tarefa.cancelled() and tarefa.exception() is None:
+                cache.guardar(chave, tarefa.result())
+
+        @wraps(f)
+        async def wrapper(*args, **kwargs):
+            chave = construir_chave(args, kwargs)
+            resultado = cache.obter(chave, _AUSENTE)
+            if resultado is not _AUSENTE:
+                return resultado
+
+            voo = em_voo.get(chave)
+            if voo is None:
+                voo = em_voo[chave] = _VooAsync(asyncio.ensure_future(f(*args, **kwargs)))
+                voo.tarefa.add_done_callback(partial(concluir, chave, voo))
+
+            voo.esperando += 1
+            try:
+                # `shield` impede que o cancelamento de um único await cancele a
+                # tarefa compartilhada; quem decide isso é o último a sair.
+                return await asyncio.shield(voo.tarefa)
+            finally:
+                voo.esperando -= 1
+                if voo.esperando == 0 and not voo.tarefa.done():
+                    voo.tarefa.cancel()
+                    if em_voo.get(chave) is voo:
+                        del em_voo[chave]
+
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.limpar
+        wrapper.armazenamento = cache
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+if __name__ == "__main__":
+    print("--- Memoização com limites ---")
+
+    @memoizar(maxsize=64)
+    def fibonacci(n):
+        if n < 2:
+            return n
+        return fibonacci(n - 1) + fibonacci(n - 2)
+
+    print(f"1. fibonacci(80) = {fibonacci(80)}")
+    print(f"   {fibonacci.cache_info()}")
+
+    @memoizar(maxsize=2)
+    def quadrado(x):
+        return x * x
+
+    for x in (1, 2, 1, 3, 2):
+        quadrado(x)
+    print(f"2. LRU com maxsize=2: {quadrado.cache_info()}")
+
+    @memoizar(ttl=0.05)
+    def agora(_):
+        return time.monotonic()
+
+    primeiro = agora("a")
+    time.sleep(0.06)
+    print(f"3. TTL expirou e recalculou? {agora('a') != primeiro}")
+    print(f"   {agora.cache_info()}")
+
+    @memoizar(congelar=True)
+    def criar_relatorio(**dados):
+        return ", ".join(f"{chave}={valor}" for chave, valor in sorted(dados.items()))
+
+    criar_relatorio(titulo="Vendas", meses=[1, 2, 3])
+    criar_relatorio(meses=[1, 2, 3], titulo="Vendas")
+    print(f"4. kwargs em outra ordem e lista congelada: {criar_relatorio.cache_info()}")
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    execucoes = []
+
+    @memoizar_concorrente
+    def consulta_lenta(x):
+        execucoes.append(x)
+        time.sleep(0.05)
+        return x * 2
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resultados = list(executor.map(consulta_lenta, [7] * 8))
+    print(f"5. 8 threads pedindo a mesma chave: {len(execucoes)} cálculo(s), resultados {set(resultados)}")
+
+    @memoizar_async(ttl=60)
+    async def buscar_usuario(id_usuario):
+        await asyncio.sleep(0.05)
+        return {"id": id_usuario}
+
+    async def demonstrar_async():
+        resultados = await asyncio.gather(*(buscar_usuario(1) for _ in range(100)))
+        print(f"6. 100 awaits simultâneos: {buscar_usuario.cache_info()}, "
+              f"todos iguais? {all(r is resultados[0] for r in resultados)}")
+
+    asyncio.run(demonstrar_async())
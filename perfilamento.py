@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+
+"""
+Perfil determinístico (`cProfile`) por função, com amostragem das chamadas.
+
+O `cronometrar` de `decorators_guide.py` diz quanto a chamada de fora
+demorou, mas não onde o tempo foi gasto dentro dela (em
+`processamento_demorado`, por exemplo). `@perfilar` roda algumas chamadas
+da função sob o `cProfile` e junta tudo num perfil só:
+
+- Amostragem: a mesma contagem regressiva de `latencias.cronometrar`
+  (`latencias.Amostragem`). Uma chamada fora da amostra custa um decremento
+  e um teste; só as amostradas ligam o profiler.
+- Cada thread tem o seu `cProfile.Profile`, que acumula as chamadas
+  amostradas dela (o `cProfile` só enxerga a thread que o ligou). Na
+  leitura, os perfis de todas as threads, inclusive as que já terminaram,
+  são somados num `pstats.Stats`.
+- Exportação: `pstats` (`salvar_pstats`, para `snakeviz`/`pstats`), pilhas
+  colapsadas (`pilhas_colapsadas`, o formato do `flamegraph.pl` e do
+  speedscope) e JSON (`para_json`).
+
+O `cProfile` guarda só arestas chamador -> chamado, não pilhas inteiras. As
+pilhas colapsadas são reconstruídas a partir da função decorada, dividindo
+o tempo de cada função entre os caminhos na proporção do tempo de cada
+aresta: é exato quando cada função tem um só chamador e uma aproximação
+quando tem vários.
+
+Uma função perfilada chamada dentro de outra que está sendo perfilada na
+mesma thread roda sem profiler próprio; o tempo dela aparece no perfil de
+fora.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+from latencias import Amostragem
+
+# A chamada a `disable()` acontece com o profiler ligado e entraria no perfil.
+_DESLIGAR = ("~", 0, "<method 'disable' of '_lsprof.Profiler' objects>")
+
+# Pilhas colapsadas: profundidade máxima e menor tempo (µs) que vira linha.
+PROFUNDIDADE_MAXIMA = 64
+MINIMO_US = 1
+
+_ESTADO = threading.local()
+
+
+def nome_da_funcao(chave: tuple) -> str:
+    """`arquivo.py:linha(nome)`, ou só o nome para funções embutidas."""
+    arquivo, linha, nome = chave
+    if arquivo == "~":
+        return nome
+    return f"{os.path.basename(arquivo)}:{linha}({nome})"
+
+
+class _Instantaneo:
+    """Cópia das estatísticas de um profiler, no formato que `pstats.Stats` aceita."""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class _PerfilDaThread:
+    __slots__ = ("profiler", "trava", "amostras", "chamadas", "thread")
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        # Reentrante: exportar de dentro da própria função perfilada não trava.
+        self.trava = threading.RLock()
+        self.amostras = 0
+        self.chamadas = 0
+        self.thread = threading.current_thread().name
+
+
+class Perfil:
+    """Perfil agregado das chamadas amostradas de uma função.
+
+    Args:
+        nome (str): Nome da função (usado nos relatórios).
+        chave (tuple | None): Entrada da função no `pstats`
+            (`(arquivo, linha, nome)`), raiz das pilhas colapsadas.
+    """
+
+    def __init__(self, nome: str, chave: Optional[tuple] = None):
+        self.nome = nome
+        self.chave = chave
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._perfis: List[_PerfilDaThread] = []
+
+    def perfil_local(self) -> _PerfilDaThread:
+        """O profiler da thread atual, criado no primeiro uso."""
+        perfil = _PerfilDaThread()
+        with self._trava:
+            self._perfis.append(perfil)
+        self._local.perfil = perfil
+        return perfil
+
+    # --- Leitura ---------------------------------------------------------------
+
+    def _instantaneos(self) -> List[_Instantaneo]:
+        with self._trava:
+            perfis = list(self._perfis)
+        instantaneos = []
+        for perfil in perfis:
+            with perfil.trava:
+                perfil.profiler.snapshot_stats()
+                stats = dict(perfil.profiler.stats)
+            stats.pop(_DESLIGAR, None)
+            if stats:
+                instantaneos.append(_Instantaneo(stats))
+        return instantaneos
+
+    @property
+    def amostras(self) -> int:
+        """Chamadas que rodaram sob o profiler."""
+        return sum(perfil.amostras for perfil in self._perfis)
+
+    @property
+    def chamadas(self) -> int:
+        """Total estimado de chamadas (cada amostra vale o período em que foi tirada)."""
+        return sum(perfil.chamadas for perfil in self._perfis)
+
+    def estatisticas(self) -> pstats.Stats:
+        """Um `pstats.Stats` com as chamadas amostradas de todas as threads."""
+        return pstats.Stats(*self._instantaneos())
+
+    def salvar_pstats(self, caminho: str) -> None:
+        """Grava no formato do `pstats` (`python -m pstats caminho`, `snakeviz caminho`)."""
+        self.estatisticas().dump_stats(caminho)
+
+    def pilhas_colapsadas(self) -> str:
+        """Uma linha `raiz;...;função microssegundos` por pilha, para `flamegraph.pl`."""
+        stats = self.estatisticas().stats
+        filhos: Dict[tuple, Dict[tuple, float]] = {}
+        for chave, (_, _, _, _, chamadores) in stats.items():
+            for chamador, (_, _, _, tempo_aresta) in chamadores.items():
+                filhos.setdefault(chamador, {})[chave] = tempo_aresta
+
+        if self.chave in stats:
+            raizes = [self.chave]
+        else:
+            raizes = [chave for chave, valores in stats.items() if not valores[4]]
+        pesos: Dict[str, float] = {}
+
+        def descer(chave, pilha, nomes, tempo_caminho):
+            _, _, proprio, acumulado, _ = stats[chave]
+            fracao = tempo_caminho / acumulado if acumulado > 0 else 0.0
+            nomes = nomes + [nome_da_funcao(chave).replace(";", ":")]
+            linha = ";".join(nomes)
+            pesos[linha] = pesos.get(linha, 0.0) + proprio * fracao
+            if len(nomes) >= PROFUNDIDADE_MAXIMA:
+                return
+            for filho, tempo_aresta in filhos.get(chave, {}).items():
+                if filho in pilha:  # Recursão: o tempo já está no nível de cima.
+                    continue
+                tempo_filho = tempo_aresta * fracao
+                if tempo_filho * 1e6 >= MINIMO_US:
+                    descer(filho, pilha | {filho}, nomes, tempo_filho)
+
+        for raiz in raizes:
+            descer(raiz, {raiz}, [], stats[raiz][3])
+        return "".join(
+            f"{linha} {round(segundos * 1e6)}\n"
+            for linha, segundos in sorted(pesos.items())
+            if round(segundos * 1e6) >= MINIMO_US
+        )
+
+    def salvar_pilhas(self, caminho: str) -> None:
+        """Grava `pilhas_colapsadas()` (ex: `flamegraph.pl caminho > perfil.svg`)."""
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.pilhas_colapsadas())
+
+    def para_json(self, limite: Optional[int] = None) -> dict:
+        """O perfil como dicionário serializável, funções em ordem de tempo próprio.
+
+        Args:
+            limite (int | None): Máximo de funções listadas.
+        """
+        estatisticas = self.estatisticas()
+        funcoes = []
+        for chave, (primitivas, chamadas, proprio, acumulado, chamadores) in estatisticas.stats.items():
+            funcoes.append({
+                "funcao": nome_da_funcao(chave),
+                "arquivo": chave[0],
+                "linha": chave[1],
+                "chamadas": chamadas,
+                "chamadas_primitivas": primitivas,
+                "tempo_proprio_s": proprio,
+                "tempo_acumulado_s": acumulado,
+                "chamadores": {nome_da_funcao(c): valores[3] for c, valores in chamadores.items()},
+            })
+        funcoes.sort(key=lambda f: f["tempo_proprio_s"], reverse=True)
+        return {
+            "nome": self.nome,
+            "amostras": self.amostras,
+            "chamadas_estimadas": self.chamadas,
+            "threads": sorted({perfil.thread for perfil in self._perfis}),
+            "tempo_total_s": estatisticas.total_tt,
+            "funcoes": funcoes[:limite],
+        }
+
+    def salvar_json(self, caminho: str, limite: Optional[int] = None) -> None:
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.para_json(limite), arquivo, ensure_ascii=False, indent=2)
+
+    def zerar(self) -> None:
+        """Descarta o que foi coletado até agora, em todas as threads."""
+        with self._trava:
+            perfis = list(self._perfis)
+        for perfil in perfis:
+            with perfil.trava:
+                perfil.profiler.clear()
+                perfil.amostras = perfil.chamadas = 0
+
+
+def perfilar(
+    func: Optional[Callable] = None,
+    *,
+    nome: Optional[str] = None,
+    amostragem: int = 1,
+    taxa: Optional[float] = None,
+):
+    """Roda as chamadas amostradas da função sob o `cProfile` e agrega o perfil.
+
+    Pode ser usado como `@perfilar` ou `@perfilar(amostragem=100)`. Com
+    `amostragem=N`, 1 a cada N chamadas é perfilada; com `taxa=R`, cerca de R
+    por segundo. A função decorada ganha `perfil` (um `Perfil`, com as
+    exportações) e `amostragem` (um `latencias.Amostragem`, para mudar o
+    período ou desligar em tempo de execução).
+    """
+
+    def decorator(f):
+        codigo = getattr(f, "__code__", None)
+        chave = (codigo.co_filename, codigo.co_firstlineno, codigo.co_name) if codigo else None
+        perfil = Perfil(nome or f"{f.__module__}.{f.__qualname__}", chave)
+        local = perfil._local
+        controle = Amostragem(amostragem, taxa)
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if not controle.ativa:
+                return f(*args, **kwargs)
+            restantes = controle.restantes - 1
+            if restantes > 0:
+                controle.restantes = restantes
+                return f(*args, **kwargs)
+            peso = controle.proxima_amostra()
+
+            if getattr(_ESTADO, "perfilando", False):
+                return f(*args, **kwargs)
+            try:
+                atual = local.perfil
+            except AttributeError:
+                atual = perfil.perfil_local()
+            with atual.trava:
+                atual.amostras += 1
+                atual.chamadas += peso
+                _ESTADO.perfilando = True
+                atual.profiler.enable()
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    atual.profiler.disable()
+                    _ESTADO.perfilando = False
+
+        wrapper.perfil = perfil
+        wrapper.amostragem = controle
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+if __name__ == "__main__":
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("--- Perfil por função ---")
+
+    def quadrados(n):
+        return [i * i for i in range(n)]
+
+    def somar(valores):
+        return sum(valores)
+
+    @perfilar(amostragem=10)
+    def processamento_demorado(n):
+        return somar(quadrados(n)) + somar(sorted(quadrados(n // 2)))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(processamento_demorado, [20_000] * 200))
+
+    perfil = processamento_demorado.perfil
+    print(f"1. {perfil.amostras} chamadas perfiladas de ~{perfil.chamadas}, "
+          f"em {len(perfil.para_json()['threads'])} threads")
+    print("2. As mais caras (pstats):")
+    perfil.estatisticas().sort_stats("tottime").print_stats(4)
+    print("3. Pilhas colapsadas (flamegraph):")
+    print(perfil.pilhas_colapsadas())
+    with tempfile.TemporaryDirectory() as pasta:
+        perfil.salvar_pstats(os.path.join(pasta, "perfil.pstats"))
+        perfil.salvar_json(os.path.join(pasta, "perfil.json"), limite=5)
+        print(f"4. Exportado: {sorted(os.listdir(pasta))}")
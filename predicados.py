@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+"""
+Predicados compilados: o `criar_verificador_de_limite` para listas grandes.
+
+`criar_verificador_de_limite(limite)` (em `decorators_guide.py`) devolve uma
+closure que o `filter()` chama uma vez por elemento. Em listas numéricas
+grandes, o custo é quase todo da chamada, não da comparação.
+
+Aqui um predicado é uma pequena árvore montada com `acima`, `abaixo`,
+`no_minimo`, `no_maximo`, `igual`, `entre`, `par`, `impar` e `multiplo_de`,
+combinada com `&`, `|`, `^` e `~`:
+
+    filtro = acima(10) & par()
+    filtro(12)                  # True: uma closure gerada, para escalares
+    filtro.filtrar(numeros)     # os elementos que passam, do mesmo tipo
+    filtro.mascara(numeros)     # um booleano por elemento
+
+A árvore vira código Python uma vez só (com `exec`, como em `vetorizacao`):
+
+- Escalar: `def verificador(x): return x > c0 and x % c1 == c2`, com as
+  constantes em células de closure.
+- Listas e tuplas: uma list comprehension com a expressão em linha, sem
+  chamada de função por elemento.
+- `array.array` e arrays do NumPy (opcional): a mesma expressão com `&`, `|`
+  e `~` sobre o array inteiro. Um `array.array` é visto pelo NumPy sem cópia
+  (`np.frombuffer`); sem NumPy, cai na list comprehension.
+"""
+
+import array
+import numbers
+from typing import Callable, Iterable, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # O NumPy é opcional: sem ele, list comprehensions.
+    np = None
+
+# Códigos de `array.array` que o NumPy lê direto do buffer.
+_CODIGOS_NUMPY = set("bBhHiIlLqQfd")
+
+
+def _numero(valor, nome: str):
+    if isinstance(valor, bool) or not isinstance(valor, numbers.Real):
+        raise TypeError(f"`{nome}` deve ser um número, não {type(valor).__name__}.")
+    return valor
+
+
+class Predicado:
+    """Base dos predicados: operadores de combinação e o código compilado.
+
+    As subclasses só implementam `_gerar`, que escreve a expressão em duas
+    formas (escalar, com `and`/`or`/`not`, e vetorial, com `&`/`|`/`~`) e
+    acumula as constantes usadas.
+    """
+
+    __slots__ = ("_compilados",)
+
+    def __init__(self):
+        self._compilados = None
+
+    def _gerar(self, constantes: list) -> Tuple[str, str]:
+        raise NotImplementedError
+
+    def __and__(self, outro: "Predicado") -> "Predicado":
+        return _Combinacao("&", self, outro)
+
+    def __or__(self, outro: "Predicado") -> "Predicado":
+        return _Combinacao("|", self, outro)
+
+    def __xor__(self, outro: "Predicado") -> "Predicado":
+        return _Combinacao("^", self, outro)
+
+    def __invert__(self) -> "Predicado":
+        return _Negacao(self)
+
+    # --- Compilação ------------------------------------------------------------
+
+    def _compilar(self) -> dict:
+        if self._compilados is None:
+            constantes = []
+            escalar, vetorial = self._gerar(constantes)
+            nomes = [f"c{i}" for i in range(len(constantes))]
+            fonte = (
+                f"def fabricar({', '.join(nomes)}):\n"
+                f"    def verificador(x):\n"
+                f"        return {escalar}\n"
+                f"    def filtrar(dados):\n"
+                f"        return [x for x in dados if {escalar}]\n"
+                f"    def mascara(dados):\n"
+                f"        return [{escalar} for x in dados]\n"
+                f"    def vetorial(x):\n"
+                f"        return {vetorial}\n"
+                f"    return verificador, filtrar, mascara, vetorial\n"
+            )
+            namespace = {}
+            exec(compile(fonte, f"<predicado {self!r}>", "exec"), namespace)
+            verificador, filtrar, mascara, vetorial = namespace["fabricar"](*constantes)
+            self._compilados = {
+                "verificador": verificador, "filtrar": filtrar, "mascara": mascara,
+                "vetorial": vetorial, "expressao": escalar,
+            }
+        return self._compilados
+
+    @property
+    def expressao(self) -> str:
+        """A expressão escalar gerada, em função de `x` e das constantes `c0`, `c1`..."""
+        return self._compilar()["expressao"]
+
+    @property
+    def verificador(self) -> Callable[[object], bool]:
+        """A closure escalar compilada (mais rápida que chamar o predicado)."""
+        return self._compilar()["verificador"]
+
+    def __call__(self, valor) -> bool:
+        return self._compilar()["verificador"](valor)
+
+    # --- Sequências ------------------------------------------------------------
+
+    def _como_ndarray(self, dados):
+        """Um ndarray sobre os mesmos dados, ou None se não houver caminho vetorial."""
+        if np is None:
+            return None
+        if isinstance(dados, np.ndarray):
+            return dados
+        if isinstance(dados, array.array) and dados.typecode in _CODIGOS_NUMPY:
+            return np.frombuffer(dados, dtype=dados.typecode) if len(dados) else np.array([], dados.typecode)
+        return None
+
+    def mascara(self, dados: Iterable):
+        """Um booleano por elemento: ndarray de `bool` no caminho vetorial, senão `array('b')`."""
+        vetor = self._como_ndarray(dados)
+        if vetor is not None:
+            return np.asarray(self._compilar()["vetorial"](vetor), dtype=bool)
+        return array.array("b", self._compilar()["mascara"](dados))
+
+    def filtrar(self, dados: Iterable):
+        """Os elementos que passam no predicado, na ordem e no tipo da entrada.
+
+        Listas, tuplas, `array.array` e ndarrays voltam com o mesmo tipo;
+        outros iteráveis viram lista.
+        """
+        vetor = self._como_ndarray(dados)
+        if vetor is not None:
+            selecionados = vetor[self.mascara(vetor)]
+            if isinstance(dados, array.array):
+                return array.array(dados.typecode, selecionados.tobytes())
+            return selecionados
+        selecionados = self._compilar()["filtrar"](dados)
+        if isinstance(dados, array.array):
+            return array.array(dados.typecode, selecionados)
+        if isinstance(dados, tuple):
+            return tuple(selecionados)
+        return selecionados
+
+    def contar(self, dados: Iterable) -> int:
+        """Quantos elementos passam no predicado."""
+        vetor = self._como_ndarray(dados)
+        if vetor is not None:
+            return int(np.count_nonzero(self.mascara(vetor)))
+        return sum(self._compilar()["mascara"](dados))
+
+
+class _Comparacao(Predicado):
+    __slots__ = ("operador", "valor", "nome")
+
+    def __init__(self, nome: str, operador: str, valor):
+        super().__init__()
+        self.nome = nome
+        self.operador = operador
+        self.valor = _numero(valor, nome)
+
+    def _gerar(self, constantes):
+        constantes.append(self.valor)
+        expressao = f"x {self.operador} c{len(constantes) - 1}"
+        return expressao, expressao
+
+    def __repr__(self):
+        return f"{self.nome}({self.valor!r})"
+
+
+class _Entre(Predicado):
+    __slots__ = ("minimo", "maximo")
+
+    def __init__(self, minimo, maximo):
+        super().__init__()
+        self.minimo = _numero(minimo, "minimo")
+        self.maximo = _numero(maximo, "maximo")
+        if minimo > maximo:
+            raise ValueError(f"Intervalo vazio: {minimo!r} > {maximo!r}.")
+
+    def _gerar(self, constantes):
+        constantes.extend((self.minimo, self.maximo))
+        a, b = f"c{len(constantes) - 2}", f"c{len(constantes) - 1}"
+        return f"{a} <= x <= {b}", f"({a} <= x) & (x <= {b})"
+
+    def __repr__(self):
+        return f"entre({self.minimo!r}, {self.maximo!r})"
+
+
+class _Multiplo(Predicado):
+    __slots__ = ("divisor", "resto", "nome")
+
+    def __init__(self, nome: str, divisor: int, resto: int = 0):
+        super().__init__()
+        if not isinstance(divisor, int) or isinstance(divisor, bool) or divisor == 0:
+            raise ValueError("`divisor` deve ser um inteiro diferente de zero.")
+        self.nome = nome
+        self.divisor = divisor
+        self.resto = resto
+
+    def _gerar(self, constantes):
+        constantes.extend((self.divisor, self.resto))
+        expressao = f"x % c{len(constantes) - 2} == c{len(constantes) - 1}"
+        return expressao, expressao
+
+    def __repr__(self):
+        return f"multiplo_de({self.divisor!r})" if self.nome == "multiplo_de" else f"{self.nome}()"
+
+
+class _Combinacao(Predicado):
+    __slots__ = ("operador", "esquerda", "direita")
+
+    _ESCALAR = {"&": "and", "|": "or", "^": "!="}
+
+    def __init__(self, operador: str, esquerda: Predicado, direita: Predicado):
+        if not isinstance(direita, Predicado):
+            raise TypeError(f"Só é possível combinar predicados, não {type(direita).__name__}.")
+        super().__init__()
+        self.operador = operador
+        self.esquerda = esquerda
+        self.direita = direita
+
+    def _gerar(self, constantes):
+        escalar_e, vetorial_e = self.esquerda._gerar(constantes)
+        escalar_d, vetorial_d = self.direita._gerar(constantes)
+        return (
+            f"({escalar_e}) {self._ESCALAR[self.operador]} ({escalar_d})",
+            f"({vetorial_e}) {self.operador} ({vetorial_d})",
+        )
+
+    def __repr__(self):
+        return f"({self.esquerda!r} {self.operador} {self.direita!r})"
+
+
+class _Negacao(Predicado):
+    __slots__ = ("interno",)
+
+    def __init__(self, interno: Predicado):
+        super().__init__()
+        self.interno = interno
+
+    def _gerar(self, constantes):
+        escalar, vetorial = self.interno._gerar(constantes)
+        return f"not ({escalar})", f"~({vetorial})"
+
+    def __repr__(self):
+        return f"~{self.interno!r}"
+
+
+def acima(limite) -> Predicado:
+    """`x > limite`."""
+    return _Comparacao("acima", ">", limite)
+
+
+def abaixo(limite) -> Predicado:
+    """`x < limite` (o mesmo teste do `criar_verificador_de_limite`)."""
+    return _Comparacao("abaixo", "<", limite)
+
+
+def no_minimo(limite) -> Predicado:
+    """`x >= limite`."""
+    return _Comparacao("no_minimo", ">=", limite)
+
+
+def no_maximo(limite) -> Predicado:
+    """`x <= limite`."""
+    return _Comparacao("no_maximo", "<=", limite)
+
+
+def igual(valor) -> Predicado:
+    """`x == valor`."""
+    return _Comparacao("igual", "==", valor)
+
+
+def entre(minimo, maximo) -> Predicado:
+    """`minimo <= x <= maximo` (os dois extremos entram).
+
+    Raises:
+        ValueError: Se `minimo > maximo`.
+    """
+    return _Entre(minimo, maximo)
+
+
+def multiplo_de(divisor: int) -> Predicado:
+    """`x % divisor == 0`."""
+    return _Multiplo("multiplo_de", divisor)
+
+
+def par() -> Predicado:
+    """`x % 2 == 0`."""
+    return _Multiplo("par", 2)
+
+
+def impar() -> Predicado:
+    """`x % 2 == 1`."""
+    return _Multiplo("impar", 2, 1)
+
+
+def criar_verificador_de_limite(limite) -> Predicado:
+    """Como o `criar_verificador_de_limite` de `decorators_guide.py`, mas compilável."""
+    return abaixo(limite)
+
+
+if __name__ == "__main__":
+    print("--- Predicados compilados ---")
+    abaixo_de_10 = criar_verificador_de_limite(10)
+    print(f"1. Como o guia: 5 < 10? {abaixo_de_10(5)}; 15 < 10? {abaixo_de_10(15)}")
+
+    filtro = acima(10) & par()
+    print(f"2. {filtro!r} vira: {filtro.expressao}")
+    numeros = list(range(20))
+    print(f"3. Lista: {filtro.filtrar(numeros)}")
+    print(f"4. array.array: {filtro.filtrar(array.array('q', numeros))}")
+    print(f"5. Máscara: {list(filtro.mascara(numeros))}")
+    fora = ~entre(5, 15) | multiplo_de(7)
+    print(f"6. {fora!r}: {fora.contar(numeros)} de {len(numeros)} passam")
+    print(f"   NumPy disponível: {np is not None}")
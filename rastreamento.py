@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+"""
+Rastreamento de chamadas em buffer circular, com formatação preguiçosa.
+
+O `debug_info` de `decorators_guide.py` monta f-strings com `args`, `kwargs`
+e o resultado e chama `print` duas vezes por chamada. Esquecido ligado em
+produção, ele domina a latência de qualquer função.
+
+Aqui cada chamada só guarda referências em um buffer circular de tamanho
+fixo, um por thread (sem trava). Nada é formatado até alguém pedir o
+conteúdo:
+    - quando uma exceção escapa de uma função rastreada, se ligado
+      (`despejar_em_excecao=True`: exceções usadas como controle de fluxo
+      pagariam a formatação a cada vez);
+    - quando o processo recebe um sinal (ver `instalar_sinal`);
+    - sob demanda, com `despejar()` ou `eventos()`.
+
+A memória é limitada (`capacidade` registros por thread) e o custo por
+chamada é constante: criar uma lista pequena e gravá-la em uma posição.
+
+- `Rastreador`: os buffers, a profundidade de captura e o despejo.
+- `rastrear`: o decorator (substituto do `debug_info`).
+- `RASTREADOR`: rastreador usado quando nenhum outro é informado.
+"""
+
+import copy
+import itertools
+import reprlib
+import signal
+import sys
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+from typing import Callable, List, Optional, TextIO
+
+# O que guardar de cada chamada.
+CAPTURA_NOME = 0  # Só nome, instantes e estado (e o tipo da exceção); não retém os argumentos.
+CAPTURA_REFERENCIAS = 1  # Referências a args, kwargs e resultado (padrão).
+CAPTURA_COPIAS = 2  # Cópias rasas dos argumentos: mutações posteriores não aparecem.
+
+# Estados de um registro.
+EM_ANDAMENTO, RETORNOU, LEVANTOU = "em andamento", "retornou", "levantou"
+
+# Marca posta na exceção já despejada: as funções externas veem a mesma exceção.
+_DESPEJADA = "_rastreamento_despejada"
+
+# Posições na lista de cada registro.
+_INICIO, _FIM, _NOME, _ARGS, _KWARGS, _RESULTADO, _ESTADO = range(7)
+
+Evento = namedtuple(
+    "Evento", ["thread", "inicio", "fim", "nivel", "nome", "args", "kwargs", "resultado", "estado"]
+)
+
+_REPR = reprlib.Repr()
+_REPR.maxstring = 80
+_REPR.maxother = 80
+
+
+class _Anel:
+    """Buffer circular de uma thread."""
+
+    __slots__ = ("thread", "itens", "contador")
+
+    def __init__(self, capacidade: int):
+        self.thread = threading.current_thread()
+        self.itens = [None] * capacidade
+        self.contador = itertools.count()
+
+
+class Rastreador:
+    """Buffers circulares por thread com as últimas chamadas rastreadas.
+
+    Args:
+        capacidade (int): Registros guardados por thread (arredondado para
+            uma potência de 2). Os mais antigos são sobrescritos.
+        captura (int): `CAPTURA_NOME`, `CAPTURA_REFERENCIAS` ou `CAPTURA_COPIAS`.
+        despejar_em_excecao (bool): Despeja os buffers quando uma exceção
+            escapa de uma função rastreada (uma vez por exceção). Desligado
+            por padrão: cada despejo formata os buffers de todas as threads.
+        saida (TextIO | None): Destino dos despejos; padrão `sys.stderr`.
+    """
+
+    def __init__(
+        self,
+        capacidade: int = 1024,
+        captura: int = CAPTURA_REFERENCIAS,
+        despejar_em_excecao: bool = False,
+        saida: Optional[TextIO] = None,
+    ):
+        if capacidade < 1:
+            raise ValueError("`capacidade` deve ser pelo menos 1.")
+        if captura not in (CAPTURA_NOME, CAPTURA_REFERENCIAS, CAPTURA_COPIAS):
+            raise ValueError(f"Captura desconhecida: {captura!r}.")
+        self.capacidade = 1 << (capacidade - 1).bit_length()
+        self.captura = captura
+        self.despejar_em_excecao = despejar_em_excecao
+        self.saida = saida
+        self._local = threading.local()
+        self._aneis = []
+        # Reentrante: o despejo por sinal roda na thread principal, talvez
+        # no meio de um trecho dela que já está com a trava.
+        self._trava = threading.RLock()
+        self._origem = time.perf_counter_ns()
+
+    def _novo_anel(self) -> _Anel:
+        anel = self._local.anel = _Anel(self.capacidade)
+        with self._trava:
+            self._aneis.append(anel)
+        return anel
+
+    def decorar(self, func: Callable, nome: Optional[str] = None, captura: Optional[int] = None) -> Callable:
+        """Retorna `func` rastreada por este rastreador."""
+        nome = nome or func.__qualname__
+        captura = self.captura if captura is None else captura
+        local = self._local
+        novo_anel = self._novo_anel
+        mascara = self.capacidade - 1
+        relogio = time.perf_counter_ns
+        rastreador = self
+
+        if captura == CAPTURA_COPIAS:
+            copiar = copy.copy
+        elif captura not in (CAPTURA_NOME, CAPTURA_REFERENCIAS):
+            raise ValueError(f"Captura desconhecida: {captura!r}.")
+        guardar_argumentos = captura != CAPTURA_NOME
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                anel = local.anel
+            except AttributeError:
+                anel = novo_anel()
+            if captura == CAPTURA_REFERENCIAS:
+                registro = [relogio(), 0, nome, args, kwargs, None, EM_ANDAMENTO]
+            elif not guardar_argumentos:
+                registro = [relogio(), 0, nome, None, None, None, EM_ANDAMENTO]
+            else:
+                registro = [relogio(), 0, nome, tuple(map(copiar, args)),
+                            {k: copiar(v) for k, v in kwargs.items()}, None, EM_ANDAMENTO]
+            anel.itens[next(anel.contador) & mascara] = registro
+            try:
+                resultado = func(*args, **kwargs)
+            except BaseException as exc:
+                registro[_FIM] = relogio()
+                registro[_ESTADO] = LEVANTOU
+                # A exceção prende o traceback, e com ele os argumentos de todos os
+                # quadros: sem captura de argumentos, fica só o nome do tipo.
+                registro[_RESULTADO] = exc if guardar_argumentos else type(exc).__name__
+                if rastreador.despejar_em_excecao and not getattr(exc, _DESPEJADA, False):
+                    try:
+                        setattr(exc, _DESPEJADA, True)
+                    except AttributeError:
+                        pass  # Exceção sem `__dict__`: as funções externas despejam de novo.
+                    rastreador.despejar(motivo=f"{type(exc).__name__} em {nome}")
+                raise
+            registro[_FIM] = relogio()
+            registro[_ESTADO] = RETORNOU
+            if guardar_argumentos:
+                registro[_RESULTADO] = resultado
+            return resultado
+
+        wrapper.rastreador = self
+        return wrapper
+
+    # --- Leitura (a parte cara fica aqui) ------------------------------------
+
+    def eventos(self, apenas_thread_atual: bool = False) -> List[Evento]:
+        """Os registros de todos os buffers, em ordem de início."""
+        if apenas_thread_atual:
+            aneis = [getattr(self._local, "anel", None)]
+            aneis = [anel for anel in aneis if anel is not None]
+        else:
+            with self._trava:
+                aneis = list(self._aneis)
+        eventos = []
+        for anel in aneis:
+            registros = sorted((r for r in list(anel.itens) if r is not None), key=lambda r: r[_INICIO])
+            # O aninhamento é reconstruído aqui, e não medido a cada chamada:
+            # uma chamada está dentro das que começaram antes e ainda não tinham terminado.
+            abertas = []
+            for registro in registros:
+                while abertas and abertas[-1] <= registro[_INICIO]:
+                    abertas.pop()
+                inicio, fim, *resto = registro
+                eventos.append(Evento(anel.thread.name, inicio, fim, len(abertas), *resto))
+                abertas.append(fim or float("inf"))
+        eventos.sort(key=lambda evento: evento.inicio)
+        return eventos
+
+    def formatar(self, eventos: Optional[List[Evento]] = None) -> str:
+        """Formata os eventos, uma linha por chamada, indentada pelo aninhamento."""
+        if eventos is None:
+            eventos = self.eventos()
+        linhas = []
+        for evento in eventos:
+            instante = (evento.inicio - self._origem) / 1e6
+            chamada = evento.nome
+            if evento.args is not None:
+                partes = [_REPR.repr(arg) for arg in evento.args]
+                partes += [f"{chave}={_REPR.repr(valor)}" for chave, valor in evento.kwargs.items()]
+                chamada += f"({', '.join(partes)})"
+            if evento.estado == EM_ANDAMENTO:
+                desfecho = "... em andamento"
+            else:
+                duracao = (evento.fim - evento.inicio) / 1e3
+                if evento.estado == LEVANTOU:
+                    # Em `CAPTURA_NOME`, o resultado é só o nome do tipo da exceção.
+                    resultado = evento.resultado
+                    desfecho = f"!! {resultado if isinstance(resultado, str) else repr(resultado)}"
+                elif evento.args is not None:
+                    desfecho = f"-> {_REPR.repr(evento.resultado)}"
+                else:
+                    desfecho = "-> ok"
+                desfecho += f" ({duracao:.1f} µs)"
+            linhas.append(f"[{evento.thread}] {instante:12.3f} ms {'  ' * evento.nivel}{chamada} {desfecho}")
+        return "\n".join(linhas)
+
+    def despejar(self, saida: Optional[TextIO] = None, motivo: str = "pedido") -> None:
+        """Escreve todos os buffers formatados em `saida` (padrão: `sys.stderr`)."""
+        saida = saida or self.saida or sys.stderr
+        eventos = self.eventos()
+        saida.write(f"--- Rastreamento ({motivo}): {len(eventos)} chamadas ---\n")
+        if eventos:
+            saida.write(self.formatar(eventos) + "\n")
+        saida.flush()
+
+    def limpar(self) -> None:
+        """Esvazia os buffers e descarta os das threads que já terminaram."""
+        with self._trava:
+            self._aneis = [anel for anel in self._aneis if anel.thread.is_alive()]
+            for anel in self._aneis:
+                anel.itens = [None] * self.capacidade
+                anel.contador = itertools.count()
+
+    def instalar_sinal(self, sinal: Optional[int] = None) -> None:
+        """Despeja os buffers quando o processo receber `sinal` (padrão: SIGUSR1).
+
+        Deve ser chamado na thread principal. Ex: `kill -USR1 <pid>`.
+        """
+        if sinal is None:
+            sinal = getattr(signal, "SIGUSR1", None)
+            if sinal is None:
+                raise ValueError("Esta plataforma não tem SIGUSR1; informe outro sinal.")
+        signal.signal(sinal, lambda numero, quadro: self.despejar(motivo=f"sinal {numero}"))
+
+
+# Rastreador usado por `rastrear` quando nenhum outro é informado.
+RASTREADOR = Rastreador()
+
+
+def rastrear(
+    func: Optional[Callable] = None,
+    *,
+    nome: Optional[str] = None,
+    rastreador: Optional[Rastreador] = None,
+    captura: Optional[int] = None,
+):
+    """Registra as chamadas no buffer circular da thread, sem formatar nada.
+
+    Pode ser usado como `@rastrear` ou `@rastrear(captura=CAPTURA_NOME)`.
+    Consulte com `RASTREADOR.despejar()` (ou `funcao.rastreador.despejar()`).
+    """
+
+    def decorator(f):
+        return (rastreador or RASTREADOR).decorar(f, nome=nome, captura=captura)
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+if __name__ == "__main__":
+    print("--- Rastreamento em buffer circular ---")
+    rastreador = Rastreador(capacidade=8, despejar_em_excecao=True, saida=sys.stdout)
+
+    @rastrear(rastreador=rastreador)
+    def multiplicar_debug(a, b):
+        return a * b
+
+    @rastrear(rastreador=rastreador)
+    def dividir(a, b):
+        return multiplicar_debug(a, 1) / b
+
+    for i in range(20):
+        multiplicar_debug(i, 4)
+    print(f"1. 20 chamadas, nada impresso; o buffer guarda as {rastreador.capacidade} últimas.")
+    print("2. Despejo sob demanda:")
+    rastreador.despejar(motivo="demonstração")
+
+    rastreador.limpar()
+    print("3. Despejo automático quando uma exceção escapa:")
+    try:
+        dividir(1, 0)
+    except ZeroDivisionError:
+        pass
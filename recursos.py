@@ -0,0 +1,457 @@
+# -*- coding: utf-8 -*-
+
+"""
+Recursos compartilhados: `Singleton` seguro para threads e pool de conexões.
+
+O `Singleton` de `decorators_guide.py` faz "verifica e depois cria" sem trava:
+se várias threads chamam `ConexaoDB()` ao mesmo tempo na inicialização, cada
+uma pode criar sua própria instância. E mesmo com uma única instância, uma
+só conexão serializa todas as requisições.
+
+- `Singleton`: verificação dupla com trava (double-checked locking). Depois
+  de criada, a instância é lida sem trava.
+- `PoolDeConexoes`: várias conexões reaproveitáveis, com tamanho mínimo e
+  máximo, criação sob demanda, tempo limite para emprestar, verificação de
+  saúde ao emprestar e descarte de conexões ociosas (também por uma thread
+  ou tarefa de recolha periódica, para um pool que fica parado).
+- `PoolDeConexoesAsync`: a mesma ideia para asyncio.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+import weakref
+from collections import deque, namedtuple
+from contextlib import asynccontextmanager, contextmanager
+from functools import update_wrapper
+from typing import Any, Callable, Optional
+
+EstatisticasPool = namedtuple(
+    "EstatisticasPool", ["total", "ociosas", "emprestadas", "criadas", "descartadas", "esperas"]
+)
+
+
+class Singleton:
+    """Decorator de classe: todas as chamadas retornam a mesma instância.
+
+    A instância é criada na primeira chamada (preguiçosa). A trava só é usada
+    enquanto ela ainda não existe; depois, cada chamada custa uma leitura de
+    atributo.
+    """
+
+    def __init__(self, cls):
+        update_wrapper(self, cls, updated=())
+        self._cls = cls
+        self._instancia = None
+        self._trava = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        instancia = self._instancia
+        if instancia is None:
+            with self._trava:
+                # Outra thread pode ter criado enquanto esperávamos a trava.
+                if self._instancia is None:
+                    self._instancia = self._cls(*args, **kwargs)
+                instancia = self._instancia
+        return instancia
+
+
+class PoolEsgotado(TimeoutError):
+    """Nenhuma conexão ficou livre dentro do tempo limite."""
+
+
+class _BasePool:
+    """Contabilidade comum aos pools síncrono e assíncrono."""
+
+    def __init__(self, fabrica, minimo, maximo, timeout, verificar, ocioso_max, fechar, intervalo_recolha):
+        if minimo < 0 or maximo < 1 or minimo > maximo:
+            raise ValueError("Esperado 0 <= minimo <= maximo e maximo >= 1.")
+        if intervalo_recolha is None and ocioso_max is not None:
+            intervalo_recolha = ocioso_max / 2
+        self.intervalo_recolha = intervalo_recolha
+        self.fabrica = fabrica
+        self.minimo = minimo
+        self.maximo = maximo
+        self.timeout = timeout
+        self.verificar = verificar
+        self.ocioso_max = ocioso_max
+        self._fechar_conexao = fechar or (lambda conexao: getattr(conexao, "close", lambda: None)())
+        # Conexões livres e o instante em que voltaram; a mais recente sai
+        # primeiro (LIFO), para as antigas envelhecerem e serem descartadas.
+        self._ociosas = deque()
+        self._total = 0
+        self._criadas = 0
+        self._descartadas = 0
+        self._esperas = 0
+        self._fechado = False
+
+    def _verificacao_falhou(self, conexao) -> bool:
+        """True se `verificar` rejeitar a conexão (levantar `Exception` também conta)."""
+        try:
+            return not self.verificar(conexao)
+        except Exception:
+            return True
+
+    def _recolher_ociosas(self) -> list:
+        """Remove (sem fechar) as conexões ociosas há mais de `ocioso_max`."""
+        if self.ocioso_max is None:
+            return []
+        limite = time.monotonic() - self.ocioso_max
+        recolhidas = []
+        while self._ociosas and self._total > self.minimo and self._ociosas[0][1] < limite:
+            recolhidas.append(self._ociosas.popleft()[0])
+            self._total -= 1
+            self._descartadas += 1
+        return recolhidas
+
+    def _fechar_todas(self, conexoes) -> None:
+        for conexao in conexoes:
+            try:
+                self._fechar_conexao(conexao)
+            except Exception:
+                pass  # Uma conexão quebrada não deve impedir as demais de fechar.
+
+    def estatisticas(self) -> EstatisticasPool:
+        ociosas = len(self._ociosas)
+        return EstatisticasPool(
+            self._total, ociosas, self._total - ociosas, self._criadas, self._descartadas, self._esperas
+        )
+
+
+class PoolDeConexoes(_BasePool):
+    """Pool de conexões seguro para threads.
+
+    Args:
+        fabrica (Callable): Cria uma conexão nova.
+        minimo (int): Conexões mantidas mesmo ociosas (criadas no início).
+        maximo (int): Limite de conexões abertas ao mesmo tempo.
+        timeout (float | None): Espera máxima por uma conexão livre.
+        verificar (Callable | None): Recebe uma conexão ao ser emprestada e
+            retorna False (ou levanta) se ela estiver quebrada: ela é descartada.
+        ocioso_max (float | None): Conexões livres há mais tempo que isso são
+            fechadas, respeitando o `minimo`.
+        fechar (Callable | None): Fecha uma conexão; por padrão, `conexao.close()`.
+        intervalo_recolha (float | None): Período da thread que fecha as
+            conexões ociosas mesmo sem ninguém usar o pool. Padrão:
+            `ocioso_max / 2`; sem `ocioso_max`, não há thread.
+
+    Uso:
+        with pool.conexao() as db:
+            db.consultar(...)
+    """
+
+    def __init__(
+        self,
+        fabrica: Callable[[], Any],
+        minimo: int = 1,
+        maximo: int = 10,
+        timeout: Optional[float] = 30.0,
+        verificar: Optional[Callable[[Any], bool]] = None,
+        ocioso_max: Optional[float] = 300.0,
+        fechar: Optional[Callable[[Any], None]] = None,
+        intervalo_recolha: Optional[float] = None,
+    ):
+        super().__init__(fabrica, minimo, maximo, timeout, verificar, ocioso_max, fechar, intervalo_recolha)
+        self._condicao = threading.Condition()
+        for _ in range(minimo):
+            self._ociosas.append((self._criar(), time.monotonic()))
+            self._total += 1
+        self._parar_recolha = threading.Event()
+        if self.intervalo_recolha is not None:
+            threading.Thread(
+                target=_recolher_periodicamente,
+                args=(weakref.ref(self), self.intervalo_recolha, self._parar_recolha),
+                name="recolha-pool",
+                daemon=True,
+            ).start()
+
+    def _criar(self) -> Any:
+        conexao = self.fabrica()
+        self._criadas += 1
+        return conexao
+
+    def emprestar(self, timeout: Optional[float] = None) -> Any:
+        """Retira uma conexão do pool, criando uma nova se houver espaço.
+
+        Raises:
+            PoolEsgotado: Se nenhuma conexão ficar livre dentro do tempo limite.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        prazo = None if timeout is None else time.monotonic() + timeout
+        while True:
+            criar = False
+            with self._condicao:
+                while True:
+                    if self._fechado:
+                        raise RuntimeError("O pool foi fechado.")
+                    recolhidas = self._recolher_ociosas()
+                    if self._ociosas:
+                        conexao = self._ociosas.pop()[0]
+                        break
+                    if self._total < self.maximo:
+                        self._total += 1  # Reserva a vaga antes de criar fora da trava.
+                        criar = True
+                        break
+                    restante = None if prazo is None else prazo - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        raise PoolEsgotado(f"Nenhuma conexão livre em {timeout}s.")
+                    self._esperas += 1
+                    self._condicao.wait(restante)
+            self._fechar_todas(recolhidas)
+
+            if criar:
+                try:
+                    return self._criar()
+                except BaseException:
+                    with self._condicao:
+                        self._total -= 1
+                        self._condicao.notify()
+                    raise
+            try:
+                quebrada = self.verificar is not None and self._verificacao_falhou(conexao)
+            except BaseException:
+                self.devolver(conexao, descartar=True)  # Libera a vaga (ex: KeyboardInterrupt).
+                raise
+            if not quebrada:
+                return conexao
+            self.devolver(conexao, descartar=True)  # Quebrada: tenta outra.
+
+    def devolver(self, conexao: Any, descartar: bool = False) -> None:
+        """Devolve a conexão ao pool (ou a fecha, se `descartar=True`)."""
+        with self._condicao:
+            if descartar or self._fechado:
+                self._total -= 1
+                self._descartadas += 1
+            else:
+                self._ociosas.append((conexao, time.monotonic()))
+            recolhidas = self._recolher_ociosas()
+            self._condicao.notify()
+        if descartar or self._fechado:
+            recolhidas.append(conexao)
+        self._fechar_todas(recolhidas)
+
+    @contextmanager
+    def conexao(self, timeout: Optional[float] = None):
+        """Empresta uma conexão durante o bloco `with` e a devolve no final."""
+        conexao = self.emprestar(timeout)
+        try:
+            yield conexao
+        finally:
+            self.devolver(conexao)
+
+    def recolher(self) -> int:
+        """Fecha as conexões ociosas há mais de `ocioso_max`. Retorna quantas."""
+        with self._condicao:
+            recolhidas = self._recolher_ociosas()
+        self._fechar_todas(recolhidas)
+        return len(recolhidas)
+
+    def fechar(self) -> None:
+        """Fecha as conexões livres; as emprestadas são fechadas ao voltar."""
+        self._parar_recolha.set()
+        with self._condicao:
+            self._fechado = True
+            ociosas = [conexao for conexao, _ in self._ociosas]
+            self._ociosas.clear()
+            self._total -= len(ociosas)
+            self._condicao.notify_all()
+        self._fechar_todas(ociosas)
+
+
+def _recolher_periodicamente(referencia, intervalo: float, parar: threading.Event) -> None:
+    """Corpo da thread de recolha. Guarda só uma referência fraca ao pool:
+    um pool esquecido sem `fechar()` ainda pode ser coletado."""
+    while not parar.wait(intervalo):
+        pool = referencia()
+        if pool is None:
+            return
+        pool.recolher()
+        del pool
+
+
+async def _talvez_aguardar(valor):
+    return await valor if inspect.isawaitable(valor) else valor
+
+
+class PoolDeConexoesAsync(_BasePool):
+    """Pool de conexões para asyncio.
+
+    Mesmos argumentos de `PoolDeConexoes`; `fabrica`, `verificar` e `fechar`
+    podem ser funções comuns ou corrotinas. As conexões mínimas são criadas
+    em `iniciar()` (ou no primeiro `async with pool`), que também inicia a
+    tarefa de recolha periódica.
+
+    Uso:
+        async with pool.conexao() as db:
+            await db.consultar(...)
+    """
+
+    def __init__(
+        self,
+        fabrica: Callable[[], Any],
+        minimo: int = 1,
+        maximo: int = 10,
+        timeout: Optional[float] = 30.0,
+        verificar: Optional[Callable[[Any], Any]] = None,
+        ocioso_max: Optional[float] = 300.0,
+        fechar: Optional[Callable[[Any], Any]] = None,
+        intervalo_recolha: Optional[float] = None,
+    ):
+        super().__init__(fabrica, minimo, maximo, timeout, verificar, ocioso_max, fechar, intervalo_recolha)
+        self._condicao = asyncio.Condition()
+        self._tarefa_recolha = None
+
+    async def _criar(self) -> Any:
+        conexao = await _talvez_aguardar(self.fabrica())
+        self._criadas += 1
+        return conexao
+
+    async def iniciar(self) -> "PoolDeConexoesAsync":
+        """Cria as conexões mínimas."""
+        while self._total < self.minimo:
+            self._total += 1
+            try:
+                self._ociosas.append((await self._criar(), time.monotonic()))
+            except BaseException:
+                self._total -= 1
+                raise
+        if self.intervalo_recolha is not None and self._tarefa_recolha is None:
+            self._tarefa_recolha = asyncio.ensure_future(self._recolher_periodicamente())
+        return self
+
+    async def _recolher_periodicamente(self) -> None:
+        while not self._fechado:
+            await asyncio.sleep(self.intervalo_recolha)
+            await self.recolher()
+
+    async def recolher(self) -> int:
+        """Versão assíncrona de `PoolDeConexoes.recolher`."""
+        async with self._condicao:
+            recolhidas = self._recolher_ociosas()
+        await self._fechar_todas_async(recolhidas)
+        return len(recolhidas)
+
+    async def _fechar_todas_async(self, conexoes) -> None:
+        for conexao in conexoes:
+            try:
+                await _talvez_aguardar(self._fechar_conexao(conexao))
+            except Exception:
+                pass
+
+    async def emprestar(self, timeout: Optional[float] = None) -> Any:
+        """Versão assíncrona de `PoolDeConexoes.emprestar`."""
+        timeout = self.timeout if timeout is None else timeout
+        prazo = None if timeout is None else time.monotonic() + timeout
+        while True:
+            criar = False
+            async with self._condicao:
+                while True:
+                    if self._fechado:
+                        raise RuntimeError("O pool foi fechado.")
+                    recolhidas = self._recolher_ociosas()
+                    if self._ociosas:
+                        conexao = self._ociosas.pop()[0]
+                        break
+                    if self._total < self.maximo:
+                        self._total += 1
+                        criar = True
+                        break
+                    restante = None if prazo is None else prazo - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        raise PoolEsgotado(f"Nenhuma conexão livre em {timeout}s.")
+                    self._esperas += 1
+                    try:
+                        await asyncio.wait_for(self._condicao.wait(), restante)
+                    except asyncio.TimeoutError:
+                        pass  # O laço confere o prazo e levanta `PoolEsgotado`.
+            await self._fechar_todas_async(recolhidas)
+
+            if criar:
+                try:
+                    return await self._criar()
+                except BaseException:
+                    async with self._condicao:
+                        self._total -= 1
+                        self._condicao.notify()
+                    raise
+            try:
+                quebrada = self.verificar is not None and not await _talvez_aguardar(self.verificar(conexao))
+            except Exception:
+                quebrada = True
+            except BaseException:
+                await self.devolver(conexao, descartar=True)  # Libera a vaga (ex: cancelamento).
+                raise
+            if not quebrada:
+                return conexao
+            await self.devolver(conexao, descartar=True)
+
+    async def devolver(self, conexao: Any, descartar: bool = False) -> None:
+        """Versão assíncrona de `PoolDeConexoes.devolver`."""
+        async with self._condicao:
+            if descartar or self._fechado:
+                self._total -= 1
+                self._descartadas += 1
+            else:
+                self._ociosas.append((conexao, time.monotonic()))
+            recolhidas = self._recolher_ociosas()
+            self._condicao.notify()
+        if descartar or self._fechado:
+            recolhidas.append(conexao)
+        await self._fechar_todas_async(recolhidas)
+
+    @asynccontextmanager
+    async def conexao(self, timeout: Optional[float] = None):
+        """Empresta uma conexão durante o bloco `async with`."""
+        conexao = await self.emprestar(timeout)
+        try:
+            yield conexao
+        finally:
+            await self.devolver(conexao)
+
+    async def fechar(self) -> None:
+        if self._tarefa_recolha is not None:
+            self._tarefa_recolha.cancel()
+            self._tarefa_recolha = None
+        async with self._condicao:
+            self._fechado = True
+            ociosas = [conexao for conexao, _ in self._ociosas]
+            self._ociosas.clear()
+            self._total -= len(ociosas)
+            self._condicao.notify_all()
+        await self._fechar_todas_async(ociosas)
+
+    async def __aenter__(self):
+        return await self.iniciar()
+
+    async def __aexit__(self, *exc):
+        await self.fechar()
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("--- Singleton e pool de conexões ---")
+
+    @Singleton
+    class ConexaoDB:
+        def __init__(self):
+            time.sleep(0.05)  # Inicialização lenta: a janela da corrida.
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        instancias = list(executor.map(lambda _: ConexaoDB(), range(16)))
+    print(f"1. 16 threads criando ConexaoDB: {len({id(i) for i in instancias})} instância(s)")
+
+    class ConexaoFalsa:
+        def consultar(self, sql):
+            time.sleep(0.01)
+            return f"resultado de {sql!r}"
+
+    pool = PoolDeConexoes(ConexaoFalsa, minimo=2, maximo=4)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        def consultar(i):
+            with pool.conexao() as db:
+                return db.consultar(f"SELECT {i}")
+        list(executor.map(consultar, range(40)))
+    print(f"2. 40 consultas em 8 threads: {pool.estatisticas()}")
+    pool.fechar()
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+
+"""
+Registro de endpoints com despacho por trie de segmentos e mapa de versões.
+
+Em `decorators_guide.py`, `AdicionarAtributo("versao", "1.0")` marca uma
+função (como `minha_api`) com um atributo. Para achar o handler de uma rota
+e versão, o jeito direto é percorrer todas as funções marcadas e comparar,
+o que custa O(número de rotas) por requisição.
+
+- `Registro.rota(caminho, versao)`: decorator (um `Rota`) no estilo do
+  `AdicionarAtributo`. Marca a função com `rota` e `versao` e só a coloca
+  numa lista de pendentes: importar um módulo com 10 mil rotas não compila
+  nada.
+- `Registro.incluir(funcoes)`: aceita funções já marcadas com
+  `AdicionarAtributo("rota", ...)` e `AdicionarAtributo("versao", ...)`.
+- `Registro.despachar(caminho, versao)`: na primeira chamada depois de
+  novos registros, os pendentes entram numa trie de segmentos; cada nó
+  guarda um mapa versão -> handler e a versão mais recente já calculada.
+  O despacho percorre o caminho uma vez: O(tamanho do caminho).
+
+Caminhos são segmentos separados por "/"; um segmento `{nome}` captura o
+valor daquela posição. Segmentos literais têm prioridade sobre parâmetros;
+se o ramo literal não levar a uma rota com a versão pedida, o despacho
+volta e tenta o parâmetro (`/usuarios/eu` só na 1.0 e `/usuarios/{id}` na
+2.0: `/usuarios/eu` na 2.0 vai para `{id}`).
+Registrar a mesma rota e versão duas vezes levanta `ValueError` no próprio
+registro (`/a/{x}` e `/a/{y}` contam como a mesma rota).
+
+O despacho lê a trie sem trava. A compilação nunca deixa um nó pela metade:
+os handlers de um nó são trocados numa única atribuição, e um trecho novo
+de caminho é montado solto e pendurado na trie já pronto.
+"""
+
+import threading
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+Despacho = namedtuple("Despacho", ["handler", "parametros", "versao"])
+
+
+class RotaNaoEncontrada(LookupError):
+    """Nenhuma rota registrada corresponde ao caminho."""
+
+
+class VersaoNaoSuportada(LookupError):
+    """A rota existe, mas não na versão pedida."""
+
+
+def _segmentos(caminho: str) -> List[str]:
+    return [segmento for segmento in caminho.split("/") if segmento]
+
+
+def _eh_parametro(segmento: str) -> bool:
+    return segmento.startswith("{") and segmento.endswith("}")
+
+
+def _padrao(caminho: str) -> Tuple[str, ...]:
+    """Os segmentos com os nomes dos parâmetros apagados: identifica o nó da rota."""
+    return tuple("{}" if _eh_parametro(segmento) else segmento for segmento in _segmentos(caminho))
+
+
+def _chave_de_versao(versao: str) -> Tuple:
+    """"1.10" > "1.9": compara as partes numéricas como números."""
+    return tuple((0, int(parte)) if parte.isdigit() else (1, parte) for parte in str(versao).split("."))
+
+
+class _No:
+    """Um nó da trie: filhos literais, um filho parâmetro e os handlers por versão."""
+
+    __slots__ = ("filhos", "parametro", "handlers")
+
+    def __init__(self):
+        self.filhos = {}
+        self.parametro = None
+        # (versão -> (handler, nomes dos parâmetros na ordem do caminho), versão mais
+        # recente): uma tupla só, para o despacho nunca ver um sem o outro.
+        self.handlers = ({}, None)
+
+    def publicar(self, versao: str, func: Callable, nomes: Tuple[str, ...]) -> None:
+        versoes = dict(self.handlers[0])
+        versoes[versao] = (func, nomes)
+        self.handlers = (versoes, max(versoes, key=_chave_de_versao))
+
+    def ligar(self, segmento: str, filho: "_No") -> None:
+        if _eh_parametro(segmento):
+            self.parametro = filho
+        else:
+            self.filhos[segmento] = filho
+
+
+class Rota:
+    """Decorator de classe, como o `AdicionarAtributo` do guia, criado por `Registro.rota`.
+
+    Marca a função com `rota` e `versao` e a põe na fila de pendentes do
+    registro. Devolve a própria função, sem wrapper.
+
+    Raises:
+        ValueError: Se a rota já estiver registrada nessa versão.
+    """
+
+    def __init__(self, registro: "Registro", caminho: str, versao: str = "1.0"):
+        self.registro = registro
+        self.caminho = caminho
+        self.versao = versao
+
+    def __call__(self, func: Callable) -> Callable:
+        self.registro._adicionar([(self.caminho, self.versao, func)])
+        func.rota = self.caminho
+        func.versao = self.versao
+        return func
+
+
+class Registro:
+    """Rotas e versões de uma API, compiladas sob demanda para despacho rápido."""
+
+    def __init__(self):
+        self._raiz = _No()
+        self._pendentes = []
+        self._registradas = set()
+        self._trava = threading.Lock()
+        self._total = 0
+
+    def __len__(self) -> int:
+        return self._total + len(self._pendentes)
+
+    # --- Registro (barato) -------------------------------------------------
+
+    def rota(self, caminho: str, versao: str = "1.0") -> Rota:
+        """Decorator: registra a função como handler de `caminho` na `versao`.
+
+        A função é devolvida sem wrapper, com os atributos `rota` e `versao`.
+        """
+        return Rota(self, caminho, versao)
+
+    def incluir(self, funcoes: Iterable[Any]) -> int:
+        """Registra as funções marcadas com os atributos `rota` e `versao`; ignora as outras.
+
+        Ex: `registro.incluir(vars(modulo).values())`. Retorna quantas entraram.
+
+        Raises:
+            ValueError: Se alguma rota e versão já estiver registrada (nesse
+                caso nenhuma das funções entra).
+        """
+        novas = [
+            (funcao.rota, getattr(funcao, "versao", "1.0"), funcao)
+            for funcao in funcoes
+            if callable(funcao) and isinstance(getattr(funcao, "rota", None), str)
+        ]
+        self._adicionar(novas)
+        return len(novas)
+
+    def _adicionar(self, novas: List[Tuple[str, str, Callable]]) -> None:
+        chaves = [(_padrao(caminho), versao) for caminho, versao, _ in novas]
+        with self._trava:
+            registradas = self._registradas
+            no_lote = set()
+            repetidas = []
+            for (caminho, versao, _), chave in zip(novas, chaves):
+                if chave in registradas or chave in no_lote:
+                    repetidas.append(f"{caminho} ({versao})")
+                no_lote.add(chave)
+            if repetidas:
+                raise ValueError(f"Rotas registradas mais de uma vez: {', '.join(repetidas)}.")
+            registradas.update(no_lote)
+            self._pendentes.extend(novas)
+
+    # --- Compilação ----------------------------------------------------------
+
+    def compilar(self) -> None:
+        """Insere os registros pendentes na trie (feito sozinho pelo `despachar`)."""
+        with self._trava:
+            for caminho, versao, func in self._pendentes:
+                _inserir(self._raiz, caminho, versao, func)
+                self._total += 1
+            # Esvaziada só no fim: quem despacha enquanto isso vê pendentes e
+            # espera a trava, em vez de procurar uma rota que ainda não entrou.
+            self._pendentes = []
+
+    # --- Despacho ------------------------------------------------------------
+
+    def despachar(self, caminho: str, versao: Optional[str] = None) -> Despacho:
+        """Encontra o handler de `caminho`. Sem `versao`, usa a mais recente da rota.
+
+        Raises:
+            RotaNaoEncontrada: Se nenhuma rota corresponder.
+            VersaoNaoSuportada: Se a rota não tiver a `versao` pedida.
+        """
+        if self._pendentes:
+            self.compilar()
+        segmentos = _segmentos(caminho)
+        valores = []
+        no = _buscar(self._raiz, segmentos, 0, valores, versao)
+        if no is None and versao is not None:
+            # Nenhuma na versão pedida; se houver rota em outra, o erro diz quais versões existem.
+            no = _buscar(self._raiz, segmentos, 0, [], None)
+        if no is None:
+            raise RotaNaoEncontrada(f"Nenhuma rota para {caminho!r}.")
+        versoes, mais_recente = no.handlers
+        if versao is None:
+            versao = mais_recente
+        entrada = versoes.get(versao)
+        if entrada is None:
+            raise VersaoNaoSuportada(
+                f"{caminho!r} não existe na versão {versao!r} (há: {', '.join(sorted(versoes))})."
+            )
+        handler, nomes = entrada
+        return Despacho(handler, dict(zip(nomes, valores)), versao)
+
+    def chamar(self, caminho: str, *args, versao: Optional[str] = None, **kwargs) -> Any:
+        """Despacha e chama o handler com os parâmetros do caminho como argumentos nomeados."""
+        handler, parametros, _ = self.despachar(caminho, versao)
+        return handler(*args, **parametros, **kwargs)
+
+    def rotas(self) -> Dict[str, List[str]]:
+        """Cada rota registrada e suas versões (para inspeção)."""
+        if self._pendentes:
+            self.compilar()
+        resultado = {}
+        pilha = [self._raiz]
+        while pilha:
+            no = pilha.pop()
+            for versao, (handler, _) in no.handlers[0].items():
+                resultado.setdefault(handler.rota, []).append(versao)
+            pilha.extend(no.filhos.values())
+            if no.parametro is not None:
+                pilha.append(no.parametro)
+        return {rota: sorted(versoes, key=_chave_de_versao) for rota, versoes in sorted(resultado.items())}
+
+
+def _inserir(raiz: _No, caminho: str, versao: str, func: Callable) -> None:
+    """Põe `func` na trie; a parte do caminho que ainda não existe entra pronta, de uma vez."""
+    segmentos = _segmentos(caminho)
+    nomes = tuple(segmento[1:-1] for segmento in segmentos if _eh_parametro(segmento))
+    no = raiz
+    i = 0
+    while i < len(segmentos):
+        segmento = segmentos[i]
+        proximo = no.parametro if _eh_parametro(segmento) else no.filhos.get(segmento)
+        if proximo is None:
+            break
+        no = proximo
+        i += 1
+    if i == len(segmentos):
+        no.publicar(versao, func, nomes)
+        return
+    novo = _No()
+    novo.publicar(versao, func, nomes)
+    for segmento in reversed(segmentos[i + 1:]):
+        pai = _No()
+        pai.ligar(segmento, novo)
+        novo = pai
+    no.ligar(segmentos[i], novo)
+
+
+def _buscar(
+    no: _No, segmentos: List[str], i: int, valores: List[str], versao: Optional[str]
+) -> Optional[_No]:
+    """Desce a trie a partir de `no`; tenta o literal e, se ele não levar a uma rota, o parâmetro.
+
+    Com `versao`, só serve um nó que tenha essa versão; sem ela, qualquer nó com handlers.
+    """
+    while i < len(segmentos):
+        segmento = segmentos[i]
+        filho = no.filhos.get(segmento)
+        if filho is None:
+            if no.parametro is None:
+                return None
+            valores.append(segmento)
+            no = no.parametro
+        elif no.parametro is None:
+            no = filho
+        else:
+            # Os dois caminhos existem: o literal tem prioridade, com volta se falhar.
+            capturados = len(valores)
+            encontrado = _buscar(filho, segmentos, i + 1, valores, versao)
+            if encontrado is not None:
+                return encontrado
+            del valores[capturados:]  # Descarta o que o ramo literal capturou.
+            valores.append(segmento)
+            no = no.parametro
+        i += 1
+    versoes = no.handlers[0]
+    if versao is None:
+        return no if versoes else None
+    return no if versao in versoes else None
+
+
+if __name__ == "__main__":
+    print("--- Registro de rotas ---")
+    api = Registro()
+
+    @api.rota("/usuarios/{id}", versao="1.0")
+    def obter_usuario(id):
+        return {"id": id}
+
+    @api.rota("/usuarios/{id}", versao="2.0")
+    def obter_usuario_v2(id):
+        return {"id": int(id), "formato": "v2"}
+
+    @api.rota("/usuarios/eu")
+    def usuario_atual():
+        return {"id": "eu"}
+
+    print(f"1. Registradas (ainda não compiladas): {len(api)} rotas; atributo: {obter_usuario.versao}")
+    print(f"2. Mais recente: {api.chamar('/usuarios/42')}")
+    print(f"   Versão 1.0: {api.chamar('/usuarios/42', versao='1.0')}")
+    print(f"   Literal tem prioridade: {api.chamar('/usuarios/eu')}")
+    print(f"   Sem a versão no literal, volta para o parâmetro: "
+          f"{api.despachar('/usuarios/eu', versao='2.0').handler.__name__}")
+    try:
+        api.despachar("/pedidos/1")
+    except RotaNaoEncontrada as e:
+        print(f"3. {e}")
+
+    class AdicionarAtributo:  # Como em decorators_guide.py.
+        def __init__(self, nome_attr, valor_attr):
+            self.nome_attr = nome_attr
+            self.valor_attr = valor_attr
+
+        def __call__(self, func):
+            setattr(func, self.nome_attr, self.valor_attr)
+            return func
+
+    @AdicionarAtributo("rota", "/status")
+    @AdicionarAtributo("versao", "1.0")
+    def minha_api():
+        return "ok"
+
+    api.incluir([minha_api, print])
+    print(f"4. Função marcada com AdicionarAtributo: {api.chamar('/status')}")
+    print(f"5. {api.rotas()}")
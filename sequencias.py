@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fibonacci em O(log n) multiplicações, sem recursão.
+
+O `fibonacci` de `decorators_guide.py` (com `cache`) e o de
+`funcoes_guide.py` (com `cache_decorator`) são recursivos: mesmo com
+memoização, `fibonacci(n)` desce n níveis de pilha (dois frames por nível,
+contando o wrapper) e guarda n entradas no dicionário. Por volta de
+n ≈ 500-1000 estouram o limite de recursão.
+
+- `fibonacci`: duplicação rápida (fast doubling), iterando sobre os bits de
+  n. Cada passo custa três multiplicações de inteiros grandes.
+- `fibonacci_matriz`: exponenciação da matriz [[1, 1], [1, 0]] por
+  quadrados; mesma complexidade, mais multiplicações por passo. Fica como
+  referência.
+- `fibonacci_par`: o par (F(n), F(n+1)).
+- `fibonacci_muitos`: vários n de uma vez, aproveitando o resultado de um n
+  para chegar ao próximo.
+- `fibonacci_gen`: substituto do gerador de `funcoes_guide.py`, que pode
+  começar em qualquer índice.
+
+Os primeiros `TAMANHO_TABELA` valores ficam numa tabela calculada na
+importação; a duplicação rápida também parte dela, pulando os primeiros
+passos.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+TAMANHO_TABELA = 256
+
+_TABELA = [0, 1]
+for _ in range(TAMANHO_TABELA - 1):
+    _TABELA.append(_TABELA[-1] + _TABELA[-2])
+del _
+
+# Índices mais distantes que isso são alcançados com a fórmula de soma de
+# índices; mais próximos, somando termo a termo.
+_MAX_PASSOS = 64
+
+
+def _validar(n: int) -> None:
+    if not isinstance(n, int) or isinstance(n, bool):
+        raise TypeError(f"O índice deve ser um inteiro, não {type(n).__name__}.")
+    if n < 0:
+        raise ValueError("O índice não pode ser negativo.")
+
+
+def _duplicar(n: int) -> Tuple[int, int]:
+    """(F(n), F(n+1)) por duplicação rápida, para n >= 0 já validado."""
+    if n < TAMANHO_TABELA:
+        return _TABELA[n], _TABELA[n + 1]
+    # Os bits mais altos de n formam um índice que já está na tabela.
+    deslocamento = n.bit_length() - (TAMANHO_TABELA - 1).bit_length()
+    topo = n >> deslocamento
+    a, b = _TABELA[topo], _TABELA[topo + 1]
+    for i in range(deslocamento - 1, -1, -1):
+        # F(2k) = F(k) * (2F(k+1) - F(k));  F(2k+1) = F(k)² + F(k+1)²
+        c = a * ((b << 1) - a)
+        d = a * a + b * b
+        if (n >> i) & 1:
+            a, b = d, c + d
+        else:
+            a, b = c, d
+    return a, b
+
+
+def fibonacci_par(n: int) -> Tuple[int, int]:
+    """Retorna (F(n), F(n+1))."""
+    _validar(n)
+    return _duplicar(n)
+
+
+def fibonacci(n: int) -> int:
+    """F(n) por duplicação rápida: O(log n) multiplicações, sem recursão.
+
+    Raises:
+        TypeError: Se `n` não for inteiro.
+        ValueError: Se `n` for negativo.
+    """
+    _validar(n)
+    if n < TAMANHO_TABELA:
+        return _TABELA[n]
+    return _duplicar(n)[0]
+
+
+def fibonacci_matriz(n: int) -> int:
+    """F(n) por exponenciação da matriz [[1, 1], [1, 0]].
+
+    A matriz é simétrica ([[F(k+1), F(k)], [F(k), F(k-1)]]), então basta
+    guardar três números.
+    """
+    _validar(n)
+    # Acumulador (identidade) e base, como (a, b, c) = [[a, b], [b, c]].
+    ra, rb, rc = 1, 0, 1
+    ba, bb, bc = 1, 1, 0
+    while n:
+        if n & 1:
+            ra, rb, rc = ra * ba + rb * bb, ra * bb + rb * bc, rb * bb + rc * bc
+        n >>= 1
+        if n:
+            bb2 = bb * bb
+            ba, bb, bc = ba * ba + bb2, bb * (ba + bc), bb2 + bc * bc
+    return rb
+
+
+def fibonacci_muitos(ns: Iterable[int]) -> List[int]:
+    """F(n) para cada n de `ns`, na mesma ordem.
+
+    Os índices são ordenados e calculados em sequência: índices próximos
+    somando termo a termo, distantes com
+    F(m + k) = F(m)·F(k-1) + F(m+1)·F(k), reaproveitando o par anterior.
+    """
+    ns = list(ns)
+    for n in ns:
+        _validar(n)
+    resultados = {}
+    atual, a, b = 0, 0, 1  # (F(atual), F(atual + 1))
+    for n in sorted(set(ns)):
+        passo = n - atual
+        if passo <= _MAX_PASSOS:
+            for _ in range(passo):
+                a, b = b, a + b
+        elif n < TAMANHO_TABELA:
+            a, b = _TABELA[n], _TABELA[n + 1]
+        else:
+            fk, fk1 = _duplicar(passo)
+            fk_menos_1 = fk1 - fk
+            a, b = a * fk_menos_1 + b * fk, a * fk + b * fk1
+        atual = n
+        resultados[n] = a
+    return [resultados[n] for n in ns]
+
+
+def fibonacci_gen(limite: Optional[int] = None, inicio: int = 0) -> Iterator[int]:
+    """Gera F(inicio), F(inicio + 1), ... enquanto os valores forem menores que `limite`.
+
+    Com `limite=None` a sequência não termina. `fibonacci_gen(30)` gera os
+    mesmos valores que o gerador de `funcoes_guide.py`.
+    """
+    a, b = fibonacci_par(inicio)
+    while limite is None or a < limite:
+        yield a
+        a, b = b, a + b
+
+
+if __name__ == "__main__":
+    import itertools
+    import math
+    import time
+
+    print("--- Fibonacci em O(log n) ---")
+    print(f"1. fibonacci(10) = {fibonacci(10)}; fibonacci(100) = {fibonacci(100)}")
+
+    inicio = time.perf_counter()
+    grande = fibonacci(1_000_000)
+    duracao = time.perf_counter() - inicio
+    digitos = int(grande.bit_length() * math.log10(2)) + 1
+    print(f"2. fibonacci(1_000_000) tem ~{digitos} dígitos, calculado em {duracao * 1e3:.1f} ms")
+    print(f"   Igual à versão com matriz? {grande == fibonacci_matriz(1_000_000)}")
+
+    print(f"3. Vários de uma vez: {fibonacci_muitos([30, 5, 10, 5, 1000])[:4]}...")
+    print(f"4. Gerador até 30: {list(fibonacci_gen(30))}")
+    print(f"   A partir do índice 100: {list(itertools.islice(fibonacci_gen(inicio=100), 2))}")
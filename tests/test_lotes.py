@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+"""Testes de `lotes.Agrupador`: prazo de cada lote e envio por tamanho."""
+
+import time
+import unittest
+
+from latencias import RegistroDeLatencias
+from lotes import Agrupador
+
+
+class TestAgrupador(unittest.TestCase):
+    def test_sobra_de_um_lote_cheio_espera_o_proprio_prazo(self):
+        envios = []
+
+        def dobrar(itens):
+            envios.append((time.perf_counter(), list(itens)))
+            return [x * 2 for x in itens]
+
+        max_espera = 0.2
+        agrupador = Agrupador(dobrar, max_itens=4, max_espera=max_espera, registro=RegistroDeLatencias())
+        try:
+            inicio = time.perf_counter()
+            futuros = [agrupador.enviar(i) for i in range(6)]
+            self.assertEqual([f.result(timeout=5) for f in futuros], [0, 2, 4, 6, 8, 10])
+        finally:
+            agrupador.parar()
+
+        self.assertEqual([itens for _, itens in envios], [[0, 1, 2, 3], [4, 5]])
+        # O primeiro sai cheio, sem esperar; a sobra chegou junto e espera o prazo inteiro.
+        self.assertLess(envios[0][0] - inicio, max_espera / 2)
+        self.assertGreaterEqual(envios[1][0] - inicio, max_espera * 0.9)
+        estatisticas = agrupador.estatisticas()
+        self.assertEqual((estatisticas.por_tamanho, estatisticas.por_prazo), (1, 1))
+        # A espera registrada da sobra é o prazo, não o prazo somado ao do lote anterior.
+        self.assertLess(agrupador.latencias_espera.histograma().maximo / 1e9, max_espera * 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+"""Testes de `rotas.Registro`: prioridade do literal e volta para o parâmetro."""
+
+import unittest
+
+from rotas import Registro, RotaNaoEncontrada, VersaoNaoSuportada
+
+
+class TestDespacho(unittest.TestCase):
+    def setUp(self):
+        self.api = Registro()
+
+        @self.api.rota("/usuarios/{id}", versao="2.0")
+        def obter_usuario(id):
+            return ("parametro", id)
+
+        @self.api.rota("/usuarios/eu", versao="1.0")
+        def usuario_atual():
+            return ("literal",)
+
+    def test_literal_tem_prioridade_quando_tem_a_versao(self):
+        self.assertEqual(self.api.chamar("/usuarios/eu", versao="1.0"), ("literal",))
+
+    def test_literal_sem_a_versao_volta_para_o_parametro(self):
+        self.assertEqual(self.api.chamar("/usuarios/eu", versao="2.0"), ("parametro", "eu"))
+
+    def test_sem_versao_usa_a_mais_recente_do_literal(self):
+        self.assertEqual(self.api.chamar("/usuarios/eu"), ("literal",))
+
+    def test_versao_que_nenhum_ramo_tem(self):
+        with self.assertRaises(VersaoNaoSuportada):
+            self.api.despachar("/usuarios/eu", versao="3.0")
+        with self.assertRaises(RotaNaoEncontrada):
+            self.api.despachar("/pedidos/1", versao="1.0")
+
+
+if __name__ == "__main__":
+    unittest.main()
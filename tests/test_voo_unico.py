@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Testes do voo único de `memoizacao.memoizar_concorrente` sob concorrência.
+
+Todas as threads esperam numa barreira e chamam uma função lenta com as
+mesmas chaves ao mesmo tempo.
+"""
+
+import threading
+import time
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from memoizacao import memoizar_concorrente
+
+ATRASO = 0.05
+THREADS = 32
+CHAVES = 8
+
+
+def disparar(funcao, pedidos):
+    """Chama `funcao(pedido)` de uma thread por pedido, todas ao mesmo tempo."""
+    barreira = threading.Barrier(len(pedidos))
+
+    def chamar(pedido):
+        barreira.wait()
+        try:
+            return funcao(pedido)
+        except ConnectionError as exc:
+            return exc
+
+    with ThreadPoolExecutor(max_workers=len(pedidos)) as executor:
+        return list(executor.map(chamar, pedidos))
+
+
+class TestVooUnico(unittest.TestCase):
+    def test_um_calculo_por_chave(self):
+        execucoes = Counter()
+        trava = threading.Lock()
+
+        @memoizar_concorrente
+        def lenta(chave):
+            with trava:
+                execucoes[chave] += 1
+            time.sleep(ATRASO)
+            return chave * 10
+
+        pedidos = [i % CHAVES for i in range(THREADS)]
+        self.assertEqual(disparar(lenta, pedidos), [chave * 10 for chave in pedidos])
+        self.assertEqual(execucoes, Counter(range(CHAVES)))
+
+    def test_excecao_chega_a_todos_e_nao_fica_no_cache(self):
+        tentativas = Counter()
+        trava = threading.Lock()
+        falha = ConnectionError("falha temporária")
+
+        @memoizar_concorrente
+        def instavel(chave):
+            with trava:
+                tentativas[chave] += 1
+                primeira = tentativas[chave] == 1
+            time.sleep(ATRASO)
+            if primeira:
+                raise falha
+            return "ok"
+
+        resultados = disparar(instavel, ["k"] * THREADS)
+        self.assertEqual(tentativas["k"], 1)
+        # Quem esperou recebe a mesma exceção do cálculo.
+        self.assertTrue(all(resultado is falha for resultado in resultados))
+        self.assertEqual(instavel("k"), "ok")
+        self.assertEqual(tentativas["k"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
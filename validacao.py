@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+
+"""
+Validação de tipos compilada, sem custo quando desligada.
+
+O `validar_tipos` de `funcoes_guide.py` faz `zip(args, tipos)` e um laço a
+cada chamada (e ignora argumentos nomeados); o `esperar_tipo` de
+`decorators_guide.py` usa `assert`. Em funções pequenas a validação custa
+mais do que a própria função.
+
+Aqui a assinatura e os tipos são lidos uma única vez, na decoração, e viram
+o código-fonte de um wrapper com a mesma assinatura da função e um
+`isinstance` desenrolado por parâmetro. O próprio Python faz a associação
+dos argumentos (posicionais ou nomeados), sem `*args`/`**kwargs` no meio.
+
+Com a validação desligada o decorator devolve a função original, sem
+wrapper algum. Ela fica desligada sob `python -O` (como o `assert` do guia)
+ou com a variável de ambiente `VALIDAR_TIPOS=0`; `definir_validacao` muda
+isso para as decorações seguintes.
+
+- `validar_tipos(*tipos, **tipos_nomeados)`: tipos por posição (como no
+  guia) e/ou por nome.
+- `esperar_tipo(tipo)`: confere o tipo do retorno.
+- `validar_anotacoes`: usa as anotações da função (parâmetros e retorno).
+- `compilar_validador`: a função que gera o wrapper.
+"""
+
+import inspect
+import os
+import typing
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Sentinela para "sem verificação de retorno".
+_AUSENTE = object()
+
+VALIDACAO_ATIVA = __debug__ and os.environ.get("VALIDAR_TIPOS", "1").lower() not in ("0", "false", "nao", "não")
+
+
+def definir_validacao(ativa: bool) -> None:
+    """Liga ou desliga a validação para as funções decoradas daqui em diante."""
+    global VALIDACAO_ATIVA
+    VALIDACAO_ATIVA = ativa
+
+
+def tipo_verificavel(anotacao: Any) -> Optional[Any]:
+    """Converte uma anotação em algo aceito por `isinstance` (ou None para não verificar).
+
+    `Optional[X]` e `Union[X, Y]` viram tuplas, `list[int]` vira `list`;
+    `Any`, `TypeVar` e anotações em texto não resolvidas não são verificados.
+    """
+    if anotacao is Any or anotacao is inspect.Parameter.empty or isinstance(anotacao, (str, typing.TypeVar)):
+        return None
+    if anotacao is None or anotacao is type(None):
+        return type(None)
+    origem = typing.get_origin(anotacao)
+    if origem is typing.Union or (origem is not None and getattr(origem, "__name__", "") == "UnionType"):
+        membros = [tipo_verificavel(membro) for membro in typing.get_args(anotacao)]
+        if any(membro is None for membro in membros):
+            return None  # Um membro sem verificação (ex: Any) aceita tudo.
+        achatados = []
+        for membro in membros:
+            achatados.extend(membro if isinstance(membro, tuple) else (membro,))
+        return tuple(dict.fromkeys(achatados))
+    if origem is not None:
+        return origem if isinstance(origem, type) else None
+    if isinstance(anotacao, (type, tuple)):
+        return anotacao
+    return None
+
+
+def _erro_argumento(nome: str, valor: Any, tipo: Any) -> TypeError:
+    return TypeError(f"Argumento {nome}={valor!r} deve ser do tipo {tipo}")
+
+
+def _erro_retorno(resultado: Any, tipo: Any) -> TypeError:
+    return TypeError(f"Esperava {tipo}, recebeu {type(resultado)}")
+
+
+def compilar_validador(
+    func: Callable,
+    tipos: Optional[Dict[str, Any]] = None,
+    retorno: Any = _AUSENTE,
+) -> Callable:
+    """Gera um wrapper que valida `func` com `isinstance` desenrolados.
+
+    Args:
+        func (Callable): A função a validar.
+        tipos (dict | None): Nome do parâmetro -> tipo (ou tupla de tipos).
+            Para `*args`, o tipo vale para cada elemento.
+        retorno: Tipo esperado do resultado (omitido = não verifica).
+
+    Returns:
+        Callable: O wrapper, com o código gerado em `fonte_validador`. Se não
+        houver nada a verificar, retorna `func` sem alterações.
+    """
+    tipos = {nome: tipo for nome, tipo in (tipos or {}).items() if tipo is not None}
+    if not tipos and retorno is _AUSENTE:
+        return func
+    parametros = inspect.signature(func).parameters
+    desconhecidos = set(tipos) - set(parametros)
+    if desconhecidos:
+        raise TypeError(f"{func.__qualname__} não tem os parâmetros: {', '.join(sorted(desconhecidos))}")
+
+    # Nomes internos do código gerado não podem colidir com os parâmetros.
+    prefixo = "_v"
+    while any(nome.startswith(prefixo) for nome in parametros):
+        prefixo += "_"
+    namespace = {
+        f"{prefixo}func": func,
+        f"{prefixo}erro_arg": _erro_argumento,
+        f"{prefixo}erro_ret": _erro_retorno,
+        f"{prefixo}isinstance": isinstance,
+    }
+    definicao, chamada, checagens = [], [], []
+    barra = asterisco = False
+    for i, (nome, parametro) in enumerate(parametros.items()):
+        tipo = tipos.get(nome)
+        tipo_nome = f"{prefixo}t{i}"
+        padrao_nome = f"{prefixo}p{i}"
+        tem_padrao = parametro.default is not inspect.Parameter.empty
+        if tipo is not None:
+            namespace[tipo_nome] = tipo
+        if tem_padrao:
+            namespace[padrao_nome] = parametro.default
+
+        if parametro.kind is not parametro.POSITIONAL_ONLY and not barra and any(
+            p.kind is p.POSITIONAL_ONLY for p in parametros.values()
+        ):
+            definicao.append("/")
+            barra = True
+        if parametro.kind is parametro.KEYWORD_ONLY and not asterisco:
+            definicao.append("*")
+            asterisco = True
+
+        if parametro.kind is parametro.VAR_POSITIONAL:
+            definicao.append(f"*{nome}")
+            chamada.append(f"*{nome}")
+            asterisco = True
+            if tipo is not None:
+                checagens.append(
+                    f"    for {prefixo}x in {nome}:\n"
+                    f"        if not {prefixo}isinstance({prefixo}x, {tipo_nome}):\n"
+                    f"            raise {prefixo}erro_arg({nome!r}, {prefixo}x, {tipo_nome})"
+                )
+            continue
+        if parametro.kind is parametro.VAR_KEYWORD:
+            definicao.append(f"**{nome}")
+            chamada.append(f"**{nome}")
+            if tipo is not None:
+                checagens.append(
+                    f"    for {prefixo}k, {prefixo}x in {nome}.items():\n"
+                    f"        if not {prefixo}isinstance({prefixo}x, {tipo_nome}):\n"
+                    f"            raise {prefixo}erro_arg({prefixo}k, {prefixo}x, {tipo_nome})"
+                )
+            continue
+
+        definicao.append(f"{nome}={padrao_nome}" if tem_padrao else nome)
+        chamada.append(f"{nome}={nome}" if parametro.kind is parametro.KEYWORD_ONLY else nome)
+        if tipo is not None:
+            # O valor padrão é aceito mesmo fora do tipo (ex: `x: int = None`).
+            condicao = f"not {prefixo}isinstance({nome}, {tipo_nome})"
+            if tem_padrao:
+                condicao = f"{nome} is not {padrao_nome} and {condicao}"
+            checagens.append(f"    if {condicao}:\n        raise {prefixo}erro_arg({nome!r}, {nome}, {tipo_nome})")
+    if not barra and any(p.kind is p.POSITIONAL_ONLY for p in parametros.values()):
+        definicao.append("/")
+
+    linhas = [f"def {prefixo}validado({', '.join(definicao)}):", *checagens]
+    chamar = f"{prefixo}func({', '.join(chamada)})"
+    if retorno is _AUSENTE:
+        linhas.append(f"    return {chamar}")
+    else:
+        namespace[f"{prefixo}retorno"] = retorno
+        linhas += [
+            f"    {prefixo}r = {chamar}",
+            f"    if not {prefixo}isinstance({prefixo}r, {prefixo}retorno):",
+            f"        raise {prefixo}erro_ret({prefixo}r, {prefixo}retorno)",
+            f"    return {prefixo}r",
+        ]
+    fonte = "\n".join(linhas) + "\n"
+    exec(compile(fonte, f"<validador de {func.__qualname__}>", "exec"), namespace)
+    wrapper = wraps(func)(namespace[f"{prefixo}validado"])
+    wrapper.fonte_validador = fonte
+    return wrapper
+
+
+def _tipos_por_posicao(func: Callable, tipos: Sequence[Any]) -> Dict[str, Any]:
+    """Associa tipos posicionais aos parâmetros, na ordem (como o `zip` do guia).
+
+    Tipos além dos parâmetros posicionais nomeados valem para `*args`.
+    """
+    resultado = {}
+    parametros = list(inspect.signature(func).parameters.values())
+    posicionais = [p for p in parametros if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+    for parametro, tipo in zip(posicionais, tipos):
+        resultado[parametro.name] = tipo
+    extras = tipos[len(posicionais):]
+    if extras:
+        variadico = next((p for p in parametros if p.kind is p.VAR_POSITIONAL), None)
+        if variadico is None:
+            raise TypeError(f"{func.__qualname__} recebe {len(posicionais)} argumentos posicionais, "
+                            f"mas {len(tipos)} tipos foram informados.")
+        resultado[variadico.name] = tuple(dict.fromkeys(extras)) if len(extras) > 1 else extras[0]
+    return resultado
+
+
+def validar_tipos(*tipos, **tipos_nomeados):
+    """Decorator que valida os tipos dos argumentos.
+
+    Exemplo:
+        @validar_tipos(int, int)          # por posição, como no guia
+        def multiplicar(a, b): ...
+
+        @validar_tipos(nome=str, idade=int)
+        def cadastrar(nome, idade=0): ...
+
+    Raises:
+        TypeError: Na chamada, se um argumento não for do tipo esperado.
+    """
+
+    def decorator(func):
+        if not VALIDACAO_ATIVA:
+            return func
+        return compilar_validador(func, {**_tipos_por_posicao(func, tipos), **tipos_nomeados})
+
+    return decorator
+
+
+def esperar_tipo(tipo_esperado):
+    """Decorator que valida o tipo do resultado.
+
+    Raises:
+        TypeError: Na chamada, se o resultado não for do tipo esperado.
+    """
+
+    def decorator(func):
+        if not VALIDACAO_ATIVA:
+            return func
+        return compilar_validador(func, retorno=tipo_esperado)
+
+    return decorator
+
+
+def _anotacoes(func: Callable) -> Dict[str, Any]:
+    """As anotações resolvidas; as em texto que não resolvem ficam de fora."""
+    try:
+        return typing.get_type_hints(func)
+    except NameError:
+        # Ex: um método anotado com a própria classe, que ainda não existe
+        # enquanto o corpo da classe executa. Resolve uma a uma.
+        resolvidas = {}
+        for nome, anotacao in getattr(func, "__annotations__", {}).items():
+            if isinstance(anotacao, str):
+                try:
+                    anotacao = eval(anotacao, getattr(func, "__globals__", {}))
+                except Exception:
+                    continue
+            resolvidas[nome] = anotacao
+        return resolvidas
+
+
+def validar_anotacoes(func: Callable) -> Callable:
+    """Decorator que valida parâmetros e retorno a partir das anotações.
+
+    Anotações que `isinstance` não entende (ex: `Callable[[int], int]`) são
+    ignoradas; veja `tipo_verificavel`. Anotações em texto que não podem ser
+    resolvidas na decoração (referências adiante) também.
+    """
+    if not VALIDACAO_ATIVA:
+        return func
+    anotacoes = _anotacoes(func)
+    retorno = anotacoes.pop("return", inspect.Parameter.empty)
+    tipos = {nome: tipo_verificavel(anotacao) for nome, anotacao in anotacoes.items()}
+    tipo_retorno = tipo_verificavel(retorno)
+    return compilar_validador(func, tipos, _AUSENTE if tipo_retorno is None else tipo_retorno)
+
+
+if __name__ == "__main__":
+    print("--- Validação de tipos compilada ---")
+
+    @validar_tipos(int, int)
+    def multiplicar(a, b):
+        return a * b
+
+    print(f"1. Validação por posição: {multiplicar(5, 4)}")
+    try:
+        multiplicar(5, b="4")
+    except TypeError as e:
+        print(f"   Argumento nomeado também é verificado: {e}")
+
+    @validar_anotacoes
+    def saudacao(nome: str, vezes: Optional[int] = None) -> str:
+        return ("Olá, " + nome) * (vezes or 1)
+
+    print(f"2. Pelas anotações: {saudacao('Ana')}")
+    print("   Código gerado:")
+    print("   " + saudacao.fonte_validador.replace("\n", "\n   ").rstrip())
+
+    @esperar_tipo(int)
+    def somar_inteiros(a, b):
+        return a + b
+
+    try:
+        somar_inteiros(1.5, 2)
+    except TypeError as e:
+        print(f"3. Retorno verificado: {e}")
+
+    definir_validacao(False)
+
+    @validar_tipos(int)
+    def dobro(x):
+        return x * 2
+
+    print(f"4. Com a validação desligada, a função volta sem wrapper: {not hasattr(dobro, '__wrapped__')}")
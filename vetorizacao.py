@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+"""
+Vetorização automática de funções numéricas escalares.
+
+Funções como `somar`, `area_circulo`, `eh_maior_de_idade`,
+`calcular_preco_final`, `potencia` e `calcular_volume` (em
+`funcoes_guide.py`) recebem um número por vez. Chamá-las num laço Python
+sobre milhões de linhas custa uma chamada de função por elemento.
+
+`@vetorizar` mantém o comportamento escalar e passa a aceitar também
+listas, tuplas, `array.array` e arrays do NumPy, em qualquer argumento
+(os escalares são repetidos para todos os elementos):
+
+- Arrays do NumPy vão para um kernel de arrays: um registrado à mão
+  (`@funcao.registrar_kernel`) ou, quando o corpo da função é só
+  `return <expressão aritmética>` dos parâmetros, a própria função
+  (operadores do NumPy fazem o trabalho).
+- Listas, tuplas e `array.array` (e ndarrays sem kernel) passam por um laço
+  compilado: para expressões aritméticas, uma list comprehension com a
+  expressão escrita em linha (sem chamada de função por elemento); nos
+  outros casos, `map`. Assim os resultados são exatamente os da função
+  escalar: inteiros sem limite, `ZeroDivisionError`, potências negativas.
+  Converter para ndarray mudaria a semântica (estouro de int64, `inf` em
+  vez de erro).
+
+O resultado tem o tipo do primeiro argumento vetorial: lista, tupla,
+`array.array` ou `ndarray`. Para `array.array`, o código sai dos valores
+calculados, não da entrada: "b" para booleanos, "q" para inteiros que cabem
+em 64 bits, "d" para floats. Um `array('q')` pode então voltar como
+`array('d')` (em `potencia` com expoente negativo, por exemplo). Se os
+valores não couberem em nenhum código sem perder exatidão (inteiros além de
+64 bits, ou além de 2**53 misturados com floats) ou não forem números, o
+resultado é uma lista.
+"""
+
+import array
+import ast
+import inspect
+import itertools
+import textwrap
+from functools import wraps
+from typing import Callable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # O NumPy é opcional: sem ele, laços compilados.
+    np = None
+
+TIPOS_VETOR = (list, tuple, array.array) + ((np.ndarray,) if np is not None else ())
+
+# Nós permitidos numa expressão "aritmética simples".
+_NOS_ARITMETICOS = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.USub, ast.UAdd, ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+def expressao_aritmetica(func: Callable) -> Optional[ast.expr]:
+    """A expressão do `return` se o corpo de `func` for só `return <expressão aritmética>`.
+
+    A expressão só pode usar os parâmetros, constantes numéricas, operadores
+    aritméticos e uma comparação simples (sem encadear: `a < b < c` não vale
+    para arrays). Caso contrário, retorna None.
+    """
+    try:
+        fonte = textwrap.dedent(inspect.getsource(func))
+    except (OSError, TypeError):
+        return None
+    definicao = ast.parse(fonte).body[0]
+    if not isinstance(definicao, ast.FunctionDef):
+        return None
+    corpo = [no for no in definicao.body if not (isinstance(no, ast.Expr) and isinstance(no.value, ast.Constant))]
+    if len(corpo) != 1 or not isinstance(corpo[0], ast.Return) or corpo[0].value is None:
+        return None
+    expressao = corpo[0].value
+    parametros = set(inspect.signature(func).parameters)
+    for no in ast.walk(ast.Expression(expressao)):
+        if not isinstance(no, _NOS_ARITMETICOS):
+            return None
+        if isinstance(no, ast.Name) and no.id not in parametros:
+            return None
+        if isinstance(no, ast.Constant) and type(no.value) not in (int, float, bool):
+            return None
+        if isinstance(no, ast.Compare) and len(no.ops) != 1:
+            return None
+    return expressao
+
+
+def _compilar_laco(nomes: list, vetoriais: tuple, expressao: ast.expr) -> Callable:
+    """Uma list comprehension com `expressao` em linha, iterando os parâmetros vetoriais."""
+    iterados = [nome for nome, vetorial in zip(nomes, vetoriais) if vetorial]
+    if len(iterados) == 1:
+        alvo, fonte_iter = iterados[0], iterados[0]
+    else:
+        alvo, fonte_iter = f"({', '.join(iterados)},)", f"zip({', '.join(iterados)})"
+    fonte = f"def laco({', '.join(nomes)}):\n    return [{ast.unparse(expressao)} for {alvo} in {fonte_iter}]\n"
+    namespace = {}
+    exec(compile(fonte, "<vetorizar>", "exec"), namespace)
+    return namespace["laco"]
+
+
+# Faixas em que `array.array` guarda um inteiro sem perder nada.
+_LIMITE_Q = 1 << 63
+_LIMITE_D = 1 << 53
+
+
+def _codigo_de_tipo(valores: list) -> Optional[str]:
+    """Código de `array.array` que guarda os valores exatamente, ou None."""
+    tipos = set(map(type, valores))
+    if not tipos:
+        return "d"
+    if tipos <= {bool}:
+        return "b"
+    if tipos <= {int, float, bool}:
+        inteiros = valores if float not in tipos else [v for v in valores if type(v) is not float]
+        if inteiros:
+            menor, maior = min(inteiros), max(inteiros)
+            if float not in tipos:
+                return "q" if -_LIMITE_Q <= menor and maior < _LIMITE_Q else None
+            if not (-_LIMITE_D <= menor and maior <= _LIMITE_D):
+                return None
+        return "d"
+    return None
+
+
+def _como(modelo, valores):
+    """Converte `valores` (lista ou ndarray) para o tipo do argumento `modelo`."""
+    if np is not None and isinstance(modelo, np.ndarray):
+        return np.asarray(valores)
+    if np is not None and isinstance(valores, np.ndarray):
+        if isinstance(modelo, array.array):
+            codigo = {"b": "b", "i": "q", "u": "q", "f": "d"}.get(valores.dtype.kind, "d")
+            return array.array(codigo, valores.astype(codigo).tobytes())
+        valores = valores.tolist()
+    if isinstance(modelo, array.array):
+        codigo = _codigo_de_tipo(valores)
+        return valores if codigo is None else array.array(codigo, valores)
+    if isinstance(modelo, tuple):
+        return tuple(valores)
+    return valores
+
+
+def vetorizar(func: Optional[Callable] = None, *, kernel: Optional[Callable] = None, derivar: bool = True):
+    """Faz uma função escalar aceitar também sequências e arrays.
+
+    Pode ser usado como `@vetorizar` ou `@vetorizar(kernel=...)`.
+
+    Args:
+        kernel (Callable | None): Versão para arrays do NumPy, com os mesmos
+            parâmetros. Só é usada quando algum argumento é um ndarray.
+            Também pode ser registrada depois, com `@funcao.registrar_kernel`.
+        derivar (bool): Se a função for uma expressão aritmética simples, usa
+            a própria função como kernel e gera o laço sem chamadas.
+
+    Raises:
+        TypeError: Na decoração, se a função tiver `*args`, `**kwargs` ou
+            parâmetros só nomeados/só posicionais.
+        ValueError: Na chamada, se as sequências tiverem tamanhos diferentes.
+    """
+
+    def decorator(f):
+        assinatura = inspect.signature(f)
+        if any(p.kind is not p.POSITIONAL_OR_KEYWORD for p in assinatura.parameters.values()):
+            raise TypeError(f"{f.__qualname__}: `vetorizar` só aceita parâmetros comuns (sem *, ** ou /).")
+        nomes = list(assinatura.parameters)
+        expressao = expressao_aritmetica(f) if derivar else None
+        kernels = [kernel if kernel is not None else (f if expressao is not None else None)]
+        lacos = {}
+
+        def aplicar(args, kwargs):
+            ligados = assinatura.bind(*args, **kwargs)
+            ligados.apply_defaults()
+            valores = [ligados.arguments[nome] for nome in nomes]
+            vetoriais = tuple(isinstance(v, TIPOS_VETOR) for v in valores)
+            tamanhos = {len(v) for v, vetorial in zip(valores, vetoriais) if vetorial}
+            if len(tamanhos) > 1:
+                raise ValueError(f"{f.__qualname__}: sequências de tamanhos diferentes {sorted(tamanhos)}.")
+            modelo = next(v for v, vetorial in zip(valores, vetoriais) if vetorial)
+
+            if kernels[0] is not None and np is not None and any(
+                isinstance(v, np.ndarray) for v, vetorial in zip(valores, vetoriais) if vetorial
+            ):
+                arrays = [np.asarray(v) if vetorial else v for v, vetorial in zip(valores, vetoriais)]
+                return _como(modelo, kernels[0](*arrays))
+            if expressao is not None:
+                laco = lacos.get(vetoriais)
+                if laco is None:
+                    laco = lacos[vetoriais] = _compilar_laco(nomes, vetoriais, expressao)
+                return _como(modelo, laco(*valores))
+            (tamanho,) = tamanhos
+            colunas = [v if vetorial else itertools.repeat(v, tamanho) for v, vetorial in zip(valores, vetoriais)]
+            return _como(modelo, list(map(f, *colunas)))
+
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            for valor in args:
+                if isinstance(valor, TIPOS_VETOR):
+                    return aplicar(args, kwargs)
+            if kwargs:
+                for valor in kwargs.values():
+                    if isinstance(valor, TIPOS_VETOR):
+                        return aplicar(args, kwargs)
+            return f(*args, **kwargs)
+
+        def registrar_kernel(k: Callable) -> Callable:
+            """Decorator: registra `k` como a versão para arrays do NumPy."""
+            kernels[0] = k
+            wrapper.kernel = k
+            return k
+
+        wrapper.kernel = kernels[0]
+        wrapper.registrar_kernel = registrar_kernel
+        wrapper.expressao = ast.unparse(expressao) if expressao is not None else None
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+if __name__ == "__main__":
+    print("--- Vetorização ---")
+    print(f"NumPy disponível: {np is not None}")
+
+    @vetorizar
+    def area_circulo(raio):
+        return 3.14159 * (raio ** 2)
+
+    @vetorizar
+    def calcular_preco_final(preco, desconto=0.10):
+        return preco * (1 - desconto)
+
+    @vetorizar
+    def eh_maior_de_idade(idade):
+        return idade >= 18
+
+    print(f"1. Escalar continua igual: {area_circulo(10):.2f}")
+    print(f"2. Lista: {area_circulo([1, 2, 3])}")
+    print(f"   Expressão derivada: {area_circulo.expressao}")
+    print(f"3. Escalar repetido: {calcular_preco_final([100, 200], desconto=0.5)}")
+    print(f"4. array.array: {eh_maior_de_idade(array.array('q', [10, 18, 30]))}")
+
+    @vetorizar
+    def classificar(idade):
+        if idade < 18:
+            return "menor"
+        return "adulto"
+
+    print(f"5. Sem expressão simples, laço com map: {classificar((12, 40))}")